@@ -0,0 +1,138 @@
+"""
+This module contains the original A* search (with linear scans over the open and closed lists), which is kept as the
+reference baseline of the micro-benchmark of logic.astar. It compares both searches on the maze of the example.
+
+Usage: python -m benchmarks.astar_reference [--number NUMBER]
+"""
+from __future__ import annotations
+
+import argparse
+import heapq
+from warnings import warn
+
+from logic import astar as current
+
+
+class Node:
+    """
+    A node class for A* Pathfinding
+    """
+
+    def __init__(self, parent: Node | None = None, position: tuple[int, int] = (0, 0)) -> None:
+        """
+        Constructs a node object.
+
+        :param parent: The parent node.
+        :param position: The position of the node.
+        """
+        self.parent = parent
+        self.position = position
+
+        self.g = 0
+        self.h = 0
+        self.f = 0
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Defines equal comparator between nodes.
+
+        :param other: Another node.
+        :return: True if the node equal to the other node, False otherwise.
+        """
+        return isinstance(other, Node) and self.position == other.position
+
+    __hash__ = None  # type: ignore  # mutable
+
+    def __lt__(self, other: Node) -> bool:
+        """
+        Defining less than for purposes of heap queue
+
+        :param other: Another node.
+        :return: True if the node is smaller than the other node, False otherwise.
+        """
+        return self.f < other.f
+
+
+def return_path(current_node: Node) -> list[tuple[int, int]]:
+    """
+    Returns the path as a list of tuples (in reverse order)
+
+    :param current_node: The current node
+    :return: The found path as a list
+    """
+    path = []
+    node = current_node  # type: Node | None
+    while node is not None:
+        path.append(node.position)
+        node = node.parent
+    return path[::-1]  # Return reversed path
+
+
+def astar(maze: list[list[int]], start: tuple[int, int], end: tuple[int, int]) -> list[tuple[int, int]] | None:
+    """
+    Returns a list of tuples as a path from the given start to the given end in the given maze
+
+    :param maze: A list of lists, containing 0s and 1s, representing the maze
+    :param start: The start node of the path
+    :param end: The desired end node
+    :return: The found path (or None)
+    """
+    start_node = Node(None, start)
+    end_node = Node(None, end)
+    open_list = [start_node]
+    closed_list = []  # type: list[Node]
+
+    outer_iterations = 0
+    max_iterations = len(maze[0]) * len(maze) // 2
+    current_node = start_node
+
+    while len(open_list) > 0:
+        outer_iterations += 1
+        if outer_iterations > max_iterations:
+            warn("giving up on pathfinding too many iterations")
+            return return_path(current_node)
+
+        current_node = heapq.heappop(open_list)
+        closed_list.append(current_node)
+        if current_node == end_node:
+            return return_path(current_node)
+
+        for new_position in ((0, -1), (0, 1), (-1, 0), (1, 0)):
+            node_position = (
+                (current_node.position[0] + new_position[0]) % len(maze),
+                (current_node.position[1] + new_position[1]) % len(maze[0]),
+            )
+            if maze[node_position[0]][node_position[1]] != 0:
+                continue
+            child = Node(current_node, node_position)
+
+            # Child is on the closed list
+            if len([closed_child for closed_child in closed_list if closed_child == child]) > 0:
+                continue
+
+            child.g = current_node.g + 1
+            dx = child.position[0] - end_node.position[0]
+            dx = min(abs(dx), abs(len(maze[0]) + dx), abs(len(maze[0]) - dx))
+            dy = child.position[1] - end_node.position[1]
+            dy = min(abs(dy), abs(len(maze) + dy), abs(len(maze) - dy))
+            child.h = abs(dx) + abs(dy)
+            child.f = child.g + child.h
+
+            # Child is already in the open list
+            if len([node for node in open_list if child.position == node.position and child.g > node.g]) > 0:
+                continue
+            heapq.heappush(open_list, child)
+
+    warn("Couldn't get a path to destination")
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the A* search with the original implementation.")
+    parser.add_argument("--number", type=int, default=100, help="the number of runs of the benchmark searches")
+    args = parser.parse_args()
+
+    baseline = current.benchmark(args.number, astar)
+    result = current.benchmark(args.number)
+    print(f"reference: {baseline:.1f} us per search")
+    print(f"current: {result:.1f} us per search ({baseline / result:.1f}x faster)")
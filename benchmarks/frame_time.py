@@ -0,0 +1,273 @@
+"""
+This module contains an end-to-end benchmark of the frame time of the game. The real game loop (main.Session) is run
+with a dummy video driver, scripted input and an uncapped frame rate on fixed seeded games, with the path highlights
+and the matrix window turned on and off. The results can be written to a JSON file and compared with an earlier run.
+
+Usage: python -m benchmarks.frame_time [--output results.json] [--baseline previous.json]
+"""
+import argparse
+import gc
+import importlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+from benchmarks.pathfinding import get_metadata
+from logic.controller import RandomController
+from logic.timer import TICKS_PER_SECOND
+
+# The measured configurations: whether the paths are highlighted and whether the matrix window is open
+CONFIGURATIONS = {
+    "plain": (False, False),
+    "highlights": (True, False),
+    "window": (False, True),
+    "highlights+window": (True, True),
+}
+
+
+class BenchmarkDone(Exception):
+    """A custom exception used to stop the game loop after the measured number of frames"""
+
+
+class BenchmarkClock:
+    """
+    A class to represent an uncapped frame clock. Every frame advances the game by exactly one tick (independent of
+    the real frame time), hence every run of a seeded game is identical. The start time of every frame is recorded.
+    """
+
+    def __init__(self, frames: int, on_frame: Any = None) -> None:
+        """
+        Constructs a benchmark clock.
+
+        :param frames: The number of measured frames (the game loop is stopped afterwards).
+        :param on_frame: A function called at the start of every frame (e.g. to measure the memory of the frame).
+        """
+        self.frames = frames
+        self.on_frame = on_frame
+        self.durations = []  # type: list[int]  # ns
+        self._last = None  # type: int | None
+
+    def tick(self, framerate: int = 0) -> float:
+        """
+        Completes a frame (without waiting).
+
+        :param framerate: The frame rate of the game loop (0 when the game loop is (re)started).
+        :return: The simulated duration of the frame in milliseconds.
+        """
+        now = time.perf_counter_ns()
+        if framerate and self._last is not None:
+            self.durations.append(now - self._last)
+            if len(self.durations) >= self.frames:
+                raise BenchmarkDone()
+            if self.on_frame is not None:
+                self.on_frame()
+        self._last = now
+        return 1000 / TICKS_PER_SECOND
+
+    def get_fps(self) -> float:
+        """
+        Gets the average frame rate of the measured frames.
+
+        :return: The number of frames per second.
+        """
+        return len(self.durations) / (sum(self.durations) / 1e9) if self.durations else 0.0
+
+
+def play(clock: BenchmarkClock, seed: int, highlights: bool, window: bool, level_path: str | None = None) -> None:
+    """
+    Plays seeded games (the next game starts with the next seed) until the clock stops the game loop.
+
+    :param clock: The benchmark clock.
+    :param seed: The seed of the first game and of its random player.
+    :param highlights: Whether to highlight the paths of the ghosts.
+    :param window: Whether to show the matrix window.
+    :param level_path: The path of the level file (None to play the default level).
+    :return: Nothing.
+    """
+    main = importlib.import_module("main")
+    while True:
+        params = main.get_params(level_path=level_path)
+        params.update({"seed": seed, "controller": RandomController(seed=seed), "frame_clock": clock})
+        session = main.Session(params)
+        session.checkboxes["path_highlights"] = highlights
+        if window:
+            params["window"], params["renderer"] = main.create_window(session.game.matrix.data)
+            params["toggle"] = True
+        try:
+            scene = session.play()
+            while scene == "life_lost":
+                session.next_life()
+                scene = session.play()
+        except BenchmarkDone:
+            return
+        finally:
+            session.close()
+        seed += 1
+
+
+def get_percentiles(values: list[int] | list[float], scale: float = 1.0) -> dict[str, float]:
+    """
+    Gets the distribution of a list of values.
+
+    :param values: The values.
+    :param scale: The factor converting a value into the reported unit.
+    :return: The mean, the median, the 95th and 99th percentiles and the maximum.
+    """
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {
+        "mean": sum(ordered) / len(ordered) * scale,
+        "p50": ordered[round(0.5 * last)] * scale,
+        "p95": ordered[round(0.95 * last)] * scale,
+        "p99": ordered[round(0.99 * last)] * scale,
+        "max": ordered[last] * scale,
+    }
+
+
+def get_peak_rss() -> float | None:
+    """
+    Gets the peak resident set size of the process (not available on Windows).
+
+    :return: The peak RSS in MB (or None).
+    """
+    if sys.platform == "win32":
+        return None
+    resource = importlib.import_module("resource")
+    scale = 1 if sys.platform == "darwin" else 1024  # bytes on macOS, kB elsewhere
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6  # type: float
+    return peak_rss
+
+
+def run_configuration(
+    frames: int, seed: int, highlights: bool, window: bool, level_path: str | None = None
+) -> dict[str, Any]:
+    """
+    Measures a configuration: the frame times are measured first, the memory in a second (slower) run.
+
+    :param frames: The number of measured frames.
+    :param seed: The seed of the first game.
+    :param highlights: Whether to highlight the paths of the ghosts.
+    :param window: Whether to show the matrix window.
+    :param level_path: The path of the level file (None to play the default level).
+    :return: The distributions of the frame time (ms) and of the memory allocated per frame (bytes), the number of
+             garbage collections and the peak RSS of the process so far (MB).
+    """
+    collections = [0]
+
+    def count_collections(phase: str, _: dict[str, int]) -> None:
+        if phase == "start":
+            collections[0] += 1
+
+    clock = BenchmarkClock(frames)
+    gc.callbacks.append(count_collections)
+    try:
+        play(clock, seed, highlights, window, level_path)
+    finally:
+        gc.callbacks.remove(count_collections)
+    frame_times = clock.durations
+
+    # The peak memory allocated during every frame (on top of the memory at the start of the frame)
+    allocations = []  # type: list[int]
+    frame_start = [0]
+
+    def measure_frame() -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        allocations.append(peak - frame_start[0])
+        tracemalloc.reset_peak()
+        frame_start[0] = current
+
+    tracemalloc.start()
+    try:
+        play(BenchmarkClock(frames, measure_frame), seed, highlights, window, level_path)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "frames": len(frame_times),
+        "fps": len(frame_times) / (sum(frame_times) / 1e9),
+        "frame_time_ms": get_percentiles(frame_times, 1e-6),
+        "allocated_bytes_per_frame": get_percentiles(allocations[1:]),
+        "gc_collections": collections[0],
+        "peak_rss_mb": get_peak_rss(),
+    }
+
+
+def run_benchmark(
+    configurations: list[str], frames: int = 3000, seed: int = 0, warmup: int = 300, level_path: str | None = None
+) -> dict[str, Any]:
+    """
+    Runs the benchmark.
+
+    :param configurations: The names of the measured configurations (see CONFIGURATIONS).
+    :param frames: The number of measured frames of every configuration.
+    :param seed: The seed of the first game.
+    :param warmup: The number of frames played before the measurements (e.g. to fill the caches of the game).
+    :param level_path: The path of the level file (None to play the default level).
+    :return: The metadata and the results of every configuration.
+    """
+    if warmup:
+        play(BenchmarkClock(warmup), seed, True, True, level_path)
+    results = []
+    for name in configurations:
+        highlights, window = CONFIGURATIONS[name]
+        results.append({"configuration": name, **run_configuration(frames, seed, highlights, window, level_path)})
+    return {
+        "benchmark": "frame_time",
+        "parameters": {"frames": frames, "seed": seed, "warmup": warmup, "level": level_path},
+        "metadata": get_metadata(),
+        "results": results,
+    }
+
+
+def print_results(report: dict[str, Any], baseline: dict[str, Any] | None = None) -> None:
+    """
+    Prints the results as a table (and the change of the median frame time relative to a baseline).
+
+    :param report: The report created by run_benchmark.
+    :param baseline: An earlier report (or None).
+    :return: Nothing.
+    """
+    previous = {r["configuration"]: r for r in baseline["results"]} if baseline else {}
+    print(f"{'configuration':18} {'fps':>7} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'max ms':>7} {'kB/frame':>8}")
+    for result in report["results"]:
+        frame_time, allocated = result["frame_time_ms"], result["allocated_bytes_per_frame"]
+        line = (
+            f"{result['configuration']:18} {result['fps']:7.0f} {frame_time['p50']:7.3f} {frame_time['p95']:7.3f} "
+            f"{frame_time['p99']:7.3f} {frame_time['max']:7.3f} {allocated['p50'] / 1000:8.1f}"
+        )
+        if result["configuration"] in previous:
+            change = frame_time["p50"] / previous[result["configuration"]]["frame_time_ms"]["p50"] - 1
+            line += f" {change:+7.1%}"
+        print(line)
+    peak_rss = report["results"][-1]["peak_rss_mb"] if report["results"] else None
+    print(f"peak RSS: {peak_rss:.1f} MB" if peak_rss is not None else "peak RSS: not available")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the frame time of the game.")
+    parser.add_argument(
+        "--configurations", nargs="+", choices=CONFIGURATIONS.keys(), default=list(CONFIGURATIONS), help="the setups"
+    )
+    parser.add_argument("--frames", type=int, default=3000, help="the number of measured frames of every setup")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the first game")
+    parser.add_argument("--warmup", type=int, default=300, help="the number of frames played before measuring")
+    parser.add_argument("--output", help="write the results to a JSON file")
+    parser.add_argument("--baseline", help="compare the results with an earlier JSON file")
+    parser.add_argument("--window", action="store_true", help="use the real video driver instead of a dummy one")
+    parser.add_argument("--level", help="the path of a level file (e.g. a large generated level)")
+    args = parser.parse_args()
+
+    if not args.window:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"  # must be set before the game (and its display) is initialised
+    benchmark_report = run_benchmark(args.configurations, args.frames, args.seed, args.warmup, args.level)
+    baseline_report = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline_report = json.load(file)
+    print_results(benchmark_report, baseline_report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(benchmark_report, file, indent=2)
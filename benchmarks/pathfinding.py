@@ -0,0 +1,350 @@
+"""
+This module contains a reproducible benchmark of the path finding of the ghosts. Every solver (the A* search on the
+grid, the path table and the flow fields, which answer most queries of the ghosts, and the junction graph, which the
+game only searches for mazes with blocked cells or more than MAX_CELLS cells) is run on the same sets of queries:
+all pairs of cells, pairs crossing the tunnel, starts inside the ghost house, unreachable targets and the queries of
+every ghost recorded in a seeded game. The results can be written to a JSON file and compared with an earlier run.
+
+Usage: python -m benchmarks.pathfinding [--output results.json] [--baseline previous.json]
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+import warnings
+from collections.abc import Callable
+from typing import Any
+
+from characters.enemy import Enemy, get_maze, swap
+from level.grid import Grid
+from logic.astar import astar
+from logic.controller import RandomController
+from logic.flow_field import get_flow_field
+from logic.game import Game
+from logic.junction_graph import get_junction_graph
+from logic.maze import Maze
+from logic.path_table import MAX_CELLS, get_path_table
+from logic.profiler import PROFILER
+
+# A path finding query: the maze (overlay) and the start and end (row, column) cells
+Query = tuple[Maze, tuple[int, int], tuple[int, int]]
+Path = list[tuple[int, int]] | None
+
+
+def solve_astar(maze: Maze, start: tuple[int, int], end: tuple[int, int]) -> Path:
+    """
+    Searches a path with A* on the grid.
+
+    :param maze: The maze (overlay).
+    :param start: The start (row, column) cell.
+    :param end: The end (row, column) cell.
+    :return: The path (or None).
+    """
+    path = astar(maze, start, end)  # type: Path
+    return path
+
+
+def solve_path_table(maze: Maze, start: tuple[int, int], end: tuple[int, int]) -> Path:
+    """
+    Looks up a path in the (cached) all-pairs path table of the maze (as the game does for most queries).
+    Like in the game, mazes with blocked cells (or too many cells for a table) are searched on the junction graph.
+
+    :param maze: The maze (overlay).
+    :param start: The start (row, column) cell.
+    :param end: The end (row, column) cell.
+    :return: The path (or None).
+    """
+    if maze.blocked or maze.rows * maze.cols > MAX_CELLS:
+        return solve_junction_graph(maze, start, end)
+    return get_path_table(maze).get_path(start, end)
+
+
+def solve_flow_field(maze: Maze, start: tuple[int, int], end: tuple[int, int]) -> Path:
+    """
+    Descends the flow field of the maze towards the end (as the game does for ghosts chasing the player).
+    The field is only rebuilt when the end differs from the previous query on the same maze. Like in the game, mazes
+    with blocked cells (or too many cells) are searched on the junction graph.
+
+    :param maze: The maze (overlay).
+    :param start: The start (row, column) cell.
+    :param end: The end (row, column) cell.
+    :return: The path (or None).
+    """
+    if maze.blocked or maze.rows * maze.cols > MAX_CELLS:
+        return solve_junction_graph(maze, start, end)
+    return get_flow_field(maze, end).get_path(start)
+
+
+def solve_junction_graph(maze: Maze, start: tuple[int, int], end: tuple[int, int]) -> Path:
+    """
+    Searches a path on the junction graph of the maze (as the game does for mazes with blocked cells or more than
+    MAX_CELLS cells).
+
+    :param maze: The maze (overlay).
+    :param start: The start (row, column) cell.
+    :param end: The end (row, column) cell.
+    :return: The path (or None).
+    """
+    return get_junction_graph(maze).get_path(start, end, maze.blocked)
+
+
+SOLVERS = {
+    "astar": solve_astar,
+    "path_table": solve_path_table,
+    "flow_field": solve_flow_field,
+    "junction_graph": solve_junction_graph,
+}  # type: dict[str, Callable[[Maze, tuple[int, int], tuple[int, int]], Path]]
+
+
+def get_cells(maze: Maze, walkable: bool = True) -> list[tuple[int, int]]:
+    """
+    Gets the walkable (or wall) cells of a maze.
+
+    :param maze: The maze.
+    :param walkable: Whether to get the walkable cells or the walls.
+    :return: The (row, column) cells in row-major order.
+    """
+    return [(i, j) for i in range(maze.rows) for j in range(maze.cols) if maze.is_wall(i, j) != walkable]
+
+
+def get_tunnel_cells(maze: Maze, row: int, columns: range) -> list[tuple[int, int]]:
+    """
+    Gets the cells of a tunnel, which are connected to its border opening (without passing a wall).
+
+    :param maze: The maze.
+    :param row: The row of the tunnel.
+    :param columns: The columns from the border opening inwards.
+    :return: The (row, column) cells.
+    """
+    cells = []
+    for j in columns:
+        if maze.is_wall(row, j):
+            break
+        cells.append((row, j))
+    return cells
+
+
+def record_ghost_queries(seed: int, games: int, ticks: int) -> dict[str, list[Query]]:
+    """
+    Plays seeded games with a random player and records the distinct path finding queries of every ghost
+    (i.e. the targets chosen by the move pattern of the ghost, see Enemy.move_enemy).
+
+    :param seed: The seed of the first game (and of its random player).
+    :param games: The number of games.
+    :param ticks: The maximum number of ticks of a game.
+    :return: The queries of every move pattern (the name of the ghost or 'feared').
+    """
+    queries = {}  # type: dict[str, dict[Query, None]]  # ordered sets
+
+    def record(game: Game, enemy: Enemy) -> None:
+        get_path = enemy.get_path
+
+        def recording_get_path(
+            maze: Maze, player_position: tuple[int, int], use_flow_field: bool = False
+        ) -> list[tuple[int, int]] | None:
+            pattern = "feared" if game.fear_state else enemy.name
+            query = (maze, swap(*enemy.get_current_cell()), swap(*player_position))
+            queries.setdefault(pattern, {})[query] = None
+            return get_path(maze, player_position, use_flow_field)
+
+        setattr(enemy, "get_path", recording_get_path)
+
+    for game_seed in range(seed, seed + games):
+        game = Game(seed=game_seed)
+        controller = RandomController(seed=game_seed)
+        for enemy in game.enemies.values():
+            record(game, enemy)
+        for _ in range(ticks):
+            state = game.step(controller.get_direction())
+            if state == "life_lost":
+                game.new_life()
+            elif state != "playing":
+                break
+    return {pattern: list(pattern_queries) for pattern, pattern_queries in queries.items()}
+
+
+def get_cases(step: int = 1, seed: int = 0, games: int = 4, ticks: int = 20_000) -> dict[str, list[Query]]:
+    """
+    Creates the query sets of the benchmark.
+
+    :param step: Only every n-th pair of cells of the 'all_pairs' case is used (1 to use all pairs).
+    :param seed: The seed of the first game whose ghost queries are recorded.
+    :param games: The number of recorded games.
+    :param ticks: The maximum number of ticks of a recorded game.
+    :return: The queries of every case.
+    """
+    grid = Grid()
+    maze = grid.maze
+    cells = get_cells(maze)
+    pairs = [(maze, start, end) for start in cells for end in cells if start != end]
+
+    # The cells of the tunnels up to 4 cells away from their border openings (the shortest paths wrap around)
+    tunnel_rows = sorted({int(i) for i, j in grid.level.tunnels if j == 0})
+    left = [cell for i in tunnel_rows for cell in get_tunnel_cells(maze, i, range(4))]
+    right = [cell for i in tunnel_rows for cell in get_tunnel_cells(maze, i, range(maze.cols - 1, maze.cols - 5, -1))]
+
+    # Starts inside the ghost house (its cells are opened), targets behind walls or surrounded by blocked cells
+    house = [(get_maze(grid, swap(*start)), start, end) for start in grid.level.ghost_house for end in cells]
+    walls = get_cells(maze, walkable=False)
+    starts = cells[:: len(cells) // 8]
+    unreachable = [(maze, start, end) for start in starts for end in walls[:: len(walls) // 32]]
+    enclosed = (10, 4)  # a junction of the tunnel row whose neighbours are blocked
+    blocked = maze.overlay(blocked=((9, 4), (10, 3), (10, 5), (11, 4)))
+    unreachable += [(blocked, start, enclosed) for start in starts if not blocked.is_wall(*start)]
+
+    cases = {
+        "all_pairs": pairs[::step],
+        "tunnel": [(maze, start, end) for start in left for end in right],
+        "ghost_house": house,
+        "unreachable": unreachable,
+    }
+    for pattern, queries in sorted(record_ghost_queries(seed, games, ticks).items()):
+        cases[f"ghost_{pattern}"] = queries
+    return cases
+
+
+def run_case(
+    solver: Callable[[Maze, tuple[int, int], tuple[int, int]], Path],
+    queries: list[Query],
+    repeat: int = 3,
+    memory_sample: int = 200,
+) -> dict[str, Any]:
+    """
+    Measures a solver on a set of queries.
+
+    :param solver: The path finding function.
+    :param queries: The queries.
+    :param repeat: The number of timed runs (the fastest one is reported).
+    :param memory_sample: The number of queries whose peak memory is measured.
+    :return: The number of searches, the time per search, the throughput, the number of found paths and the average
+             node expansions and peak memory (in bytes) per search.
+    """
+    # Node expansions (and a warm-up run, which builds the cached graphs of the mazes)
+    PROFILER.toggle()
+    found = sum(solver(*query) is not None for query in queries)
+    expansions = PROFILER.counters.get("astar expansions", 0)
+    PROFILER.toggle()
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for query in queries:
+            solver(*query)
+        durations.append(time.perf_counter() - start)
+    duration = min(durations)
+
+    # Peak memory of single searches
+    sample = queries[:: max(1, len(queries) // memory_sample)]
+    memory = 0
+    tracemalloc.start()
+    for query in sample:
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        solver(*query)
+        memory += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+
+    return {
+        "searches": len(queries),
+        "found": found,
+        "us_per_search": duration / len(queries) * 1e6,
+        "searches_per_second": len(queries) / duration,
+        "expansions_per_search": expansions / len(queries),
+        "bytes_per_search": memory / len(sample),
+    }
+
+
+def get_metadata() -> dict[str, Any]:
+    """
+    Gets the environment of a benchmark run.
+
+    :return: The commit, the python version, the platform and the time of the run.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, check=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def run_benchmark(
+    solvers: list[str], step: int = 1, repeat: int = 3, seed: int = 0, games: int = 4, ticks: int = 20_000
+) -> dict[str, Any]:
+    """
+    Runs the benchmark.
+
+    :param solvers: The names of the measured solvers (see SOLVERS).
+    :param step: Only every n-th pair of cells of the 'all_pairs' case is used.
+    :param repeat: The number of timed runs of every case.
+    :param seed: The seed of the first game whose ghost queries are recorded.
+    :param games: The number of recorded games.
+    :param ticks: The maximum number of ticks of a recorded game.
+    :return: The metadata and the results of every case and solver.
+    """
+    cases = get_cases(step, seed, games, ticks)
+    results = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # unreachable targets are expected
+        for case, queries in cases.items():
+            for solver in solvers:
+                results.append({"case": case, "solver": solver, **run_case(SOLVERS[solver], queries, repeat)})
+    return {
+        "benchmark": "pathfinding",
+        "parameters": {"step": step, "repeat": repeat, "seed": seed, "games": games, "ticks": ticks},
+        "metadata": get_metadata(),
+        "results": results,
+    }
+
+
+def print_results(report: dict[str, Any], baseline: dict[str, Any] | None = None) -> None:
+    """
+    Prints the results as a table (and the change of the time per search relative to a baseline).
+
+    :param report: The report created by run_benchmark.
+    :param baseline: An earlier report (or None).
+    :return: Nothing.
+    """
+    previous = {(r["case"], r["solver"]): r for r in baseline["results"]} if baseline else {}
+    print(f"{'case':16} {'solver':15} {'searches':>8} {'us/search':>10} {'search/s':>10} {'expanded':>9} {'bytes':>8}")
+    for result in report["results"]:
+        line = (
+            f"{result['case']:16} {result['solver']:15} {result['searches']:8d} {result['us_per_search']:10.2f} "
+            f"{result['searches_per_second']:10.0f} {result['expansions_per_search']:9.1f} "
+            f"{result['bytes_per_search']:8.0f}"
+        )
+        if (result["case"], result["solver"]) in previous:
+            change = result["us_per_search"] / previous[result["case"], result["solver"]]["us_per_search"] - 1
+            line += f" {change:+7.1%}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the path finding of the ghosts.")
+    parser.add_argument("--solvers", nargs="+", choices=SOLVERS.keys(), default=list(SOLVERS), help="the solvers")
+    parser.add_argument("--step", type=int, default=1, help="use every n-th pair of cells of the all pairs case")
+    parser.add_argument("--repeat", type=int, default=3, help="the number of timed runs of every case")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the first game recording the ghost queries")
+    parser.add_argument("--games", type=int, default=4, help="the number of games recording the ghost queries")
+    parser.add_argument("--ticks", type=int, default=20_000, help="the maximum number of ticks of a game")
+    parser.add_argument("--output", help="write the results to a JSON file")
+    parser.add_argument("--baseline", help="compare the results with an earlier JSON file")
+    args = parser.parse_args()
+
+    benchmark_report = run_benchmark(args.solvers, args.step, args.repeat, args.seed, args.games, args.ticks)
+    baseline_report = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline_report = json.load(file)
+    print_results(benchmark_report, baseline_report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(benchmark_report, file, indent=2)
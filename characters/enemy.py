@@ -1,19 +1,20 @@
 """
 This module contains an implementation of an enemy object.
 """
-import copy
 import math
 import sys
 from typing import Any, cast
 
-import numpy as np
 import pygame
 
 from characters.player import Player
-from level.cell import Cell
 from level.grid import Grid
-from level.menu import game_over
-from logic.astar import astar
+from level.path_overlay import PathOverlay
+from logic.flow_field import get_flow_field
+from logic.junction_graph import get_junction_graph
+from logic.maze import Maze
+from logic.path_table import MAX_CELLS, get_path_table
+from logic.profiler import PROFILER
 from logic.timer import Timer
 
 
@@ -28,22 +29,20 @@ def swap(a: int, b: int) -> tuple[int, int]:
     return b, a
 
 
-def get_maze(grid_walls: list[list[int]], pos: tuple[int, int]) -> list[list[int]]:
+def get_maze(grid: Grid, pos: tuple[int, int], blocked: tuple[tuple[int, int], ...] = ()) -> Maze:
     """
     Get the maze depending on the position
 
-    :param grid_walls: The grid of the game
+    :param grid: The grid of the game
     :param pos: The current position of the enemy
-    :return: The updated maze
+    :param blocked: The (row, column) positions of additional cells which the enemy must not cross
+    :return: The maze overlay (the walls of the grid are not copied)
     """
-    ghost_house = [(9, 9), (10, 8), (10, 9), (10, 10)]
-    maze = copy.deepcopy(grid_walls)
+    ghost_house = grid.level.ghost_house
     # When the ghost is in his home
-    if swap(*pos) in ghost_house:
-        for room in ghost_house:
-            maze[room[0]][room[1]] = 0
+    opened = ghost_house if swap(*pos) in ghost_house else ()
 
-    return maze
+    return grid.maze.overlay(opened, blocked)
 
 
 class Enemy(pygame.sprite.Sprite):
@@ -51,7 +50,9 @@ class Enemy(pygame.sprite.Sprite):
     A class representing an enemy (NPC)
     """
 
-    def __init__(self, x: int, y: int, name: str, colour: tuple[int, int, int]) -> None:
+    def __init__(
+        self, x: int, y: int, name: str, colour: tuple[int, int, int], size: tuple[int, int] = (22, 19)
+    ) -> None:
         """
         Constructs an enemy object
 
@@ -59,12 +60,20 @@ class Enemy(pygame.sprite.Sprite):
         :param y: The vertical position
         :param name: The name of the ghost
         :param colour: The colour of the ghost
+        :param size: The number of rows and columns of the grid
         """
         super().__init__()
         self.name = name
+        self.rows, self.cols = size
         self.col = colour
         self._is_feared = 0
         self.path = []  # type: list[tuple[int, int]]
+        self._path_colour = colour
+
+        # The last computed path together with its key (start cell, target cell, maze overlay and move pattern)
+        self._path_key = None  # type: tuple[tuple[int, int], tuple[int, int], Maze, str] | None
+        self._cached_path = None  # type: list[tuple[int, int]] | None
+        self._move_pattern = ""
 
         self.surf = pygame.Surface((18, 18))
         self.surf.fill((0, 0, 0))
@@ -90,18 +99,101 @@ class Enemy(pygame.sprite.Sprite):
         self.pos = pygame.math.Vector2((x, y))
         pygame.draw.circle(self.surf, self.col, (18 // 2, 18 // 2), 9)
         pygame.draw.rect(self.surf, self.col, pygame.Rect(0, 9, 18, 9))
+        self.invalidate_path()
+
+    def get_state(self) -> tuple[Any, ...]:
+        """
+        Get the state of the enemy (e.g. to save a game state)
+
+        :return: The position, velocity, fear state and score, the move pattern, the current path, the cached path and
+                 its key (with the opened and blocked cells instead of the maze)
+        """
+        key = None
+        if self._path_key is not None:
+            start, target, maze, pattern = self._path_key
+            key = (start, target, maze.opened, maze.blocked, pattern)
+        return (
+            (self.pos.x, self.pos.y, self.vel.x, self.vel.y, self._is_feared, self.score),
+            self._move_pattern,
+            tuple(self.path),
+            tuple(self._cached_path) if self._cached_path is not None else None,
+            key,
+        )
+
+    def set_state(self, state: tuple[Any, ...], maze: Maze) -> None:
+        """
+        Set the state of the enemy
+
+        :param state: The state returned by get_state
+        :param maze: The maze of the game (the maze of the cached path is an overlay of it)
+        :return: Nothing
+        """
+        values, self._move_pattern, path, cached_path, key = state
+        x, y, vel_x, vel_y, is_feared, score = values
+        self._is_feared, self.score = int(is_feared), int(score)
+        self.path = list(path)
+        self._cached_path = list(cached_path) if cached_path is not None else None
+        if key is not None:
+            # Reuse the current maze overlay if it has the same opened and blocked cells
+            if self._path_key is None or (self._path_key[2].opened, self._path_key[2].blocked) != key[2:4]:
+                maze = maze.overlay(key[2], key[3])
+            else:
+                maze = self._path_key[2]
+            self._path_key = (key[0], key[1], maze, key[4])
+        else:
+            self._path_key = None
+        self.pos.update(x, y)
+        self.vel.update(vel_x, vel_y)
+        self.rect.midbottom = cast(tuple[int, int], self.pos + pygame.math.Vector2(0, 10))
+
+    def invalidate_path(self) -> None:
+        """
+        Discard the cached path, so that the next call of get_path computes a new one
+
+        :return: Nothing
+        """
+        self._path_key = None
+        self._cached_path = None
 
-    def get_path(self, grid: list[list[int]], player_position: tuple[int, int]) -> list[tuple[int, int]] | None:
+    def get_path(
+        self, maze: Maze, player_position: tuple[int, int], use_flow_field: bool = False
+    ) -> list[tuple[int, int]] | None:
         """
         Get a path from the current position to the target position
 
-        :param grid: The grid of the game
+        :param maze: The maze (overlay) of the game
         :param player_position: The target position
+        :param use_flow_field: Whether to descend the flow field shared by all enemies chasing the same target
         :return: A path from the current to the target position
         """
         i, j = swap(*self.get_current_cell())
         x, y = swap(*player_position)
-        return astar(grid, (i, j), (x, y))  # type: ignore
+
+        # Reuse the cached path while the target and the maze are unchanged
+        if self._path_key is not None and self._path_key[1:] == ((x, y), maze, self._move_pattern):
+            if self._path_key[0] == (i, j):
+                return self._cached_path
+            # The enemy moved on to the next cell of its path (every sub path of a shortest path is a shortest path)
+            if self._cached_path and len(self._cached_path) > 1 and self._cached_path[1] == (i, j):
+                self._path_key = ((i, j), (x, y), maze, self._move_pattern)
+                self._cached_path = self._cached_path[1:]
+                return self._cached_path
+
+        # Blocked cells change every frame, hence only mazes without them have a flow field (or path table).
+        # Large mazes are too expensive to flood for every target. Everything else is searched on the junction graph.
+        with PROFILER.scope("get_path"):
+            if maze.blocked or maze.rows * maze.cols > MAX_CELLS:
+                path = get_junction_graph(maze).get_path((i, j), (x, y), maze.blocked)
+            elif use_flow_field:
+                path = get_flow_field(maze, (x, y)).get_path((i, j))
+            else:
+                path = get_path_table(maze).get_path((i, j), (x, y))
+        if PROFILER.active:  # avoid formatting the counter name in the hot path
+            PROFILER.count(f"{self.name} path length", len(path) if path else 0)
+
+        self._path_key = ((i, j), (x, y), maze, self._move_pattern)
+        self._cached_path = path
+        return path
 
     def get_current_cell(self) -> tuple[int, int]:
         """
@@ -109,7 +201,7 @@ class Enemy(pygame.sprite.Sprite):
 
         :return: The indices of the current cell
         """
-        return int((self.pos.x - 1) / 20) % 19, int((self.pos.y - 1) / 20) % 22
+        return int((self.pos.x - 1) / 20) % self.cols, int((self.pos.y - 1) / 20) % self.rows
 
     def move(self, y: int, x: int, speed: int, width: int, timer: Timer, enemy: str) -> None:
         """
@@ -130,9 +222,8 @@ class Enemy(pygame.sprite.Sprite):
             return
         direction = pygame.math.Vector2(self.pos - target).normalize()
 
-        # If the enemy is feared, only move it every second hundredth of a second (to reduce its speed)
-        val = int(np.modf(timer.get_elapsed_time())[0] * 100 % 10)
-        if enemy == "feared" and val % 2 == 0:
+        # If the enemy is feared, only move it every second tick (to reduce its speed)
+        if enemy == "feared" and timer.get_elapsed_ticks() % 2 == 0:
             return
 
         if direction == [1, 0]:
@@ -158,30 +249,27 @@ class Enemy(pygame.sprite.Sprite):
 
     def move_enemy(
         self,
-        cells: list[list[Cell]],
         grid: Grid,
         player: Player,
         params: dict,
         enemy: str = "blinky",
-        highlight_path: bool = True,
         position: tuple[int, int] = (-1, -1),
-    ) -> None:
+    ) -> bool:
         """
         Move the enemy
 
-        :param cells: The matrix of Cell objects
         :param grid: The grid of the game
         :param player: The player object
         :param params: Various game parameters
         :param enemy: The name of the ghost (or feared)
-        :param highlight_path: Boolean flag to show or hide the path of enemies
         :param position: The position of a second enemy
-        :return: Nothing
+        :return: Whether the enemy caught the player or not
         """
-        surface = pygame.Surface((5, 5))
-        surface.fill((0, 0, 0))
-        color = (0, 0, 0)
-        thickness = 1
+        # A new move pattern (e.g. becoming feared) invalidates the cached path
+        if enemy != self._move_pattern:
+            self._move_pattern = enemy
+            self.invalidate_path()
+
         if self._is_feared == 0 and enemy == "feared":
             self._is_feared = 1
         elif enemy != "feared":
@@ -189,13 +277,6 @@ class Enemy(pygame.sprite.Sprite):
             pygame.draw.circle(self.surf, self.col, (18 // 2, 18 // 2), 9)
             pygame.draw.rect(self.surf, self.col, pygame.Rect(0, 9, 18, 9))
 
-        # Update enemy target
-        for pos_y, pos_x in self.path:  # Clear old path
-            pygame.draw.line(cells[pos_y][pos_x].surf, color, (6, 6), (6, 15), thickness)
-            pygame.draw.line(cells[pos_y][pos_x].surf, color, (6, 15), (15, 15), thickness)
-            pygame.draw.line(cells[pos_y][pos_x].surf, color, (6, 6), (15, 6), thickness)
-            pygame.draw.line(cells[pos_y][pos_x].surf, color, (15, 6), (15, 15), thickness)
-
         # Set the colour of the new highlighted path
         color = self.col
 
@@ -206,8 +287,8 @@ class Enemy(pygame.sprite.Sprite):
 
                 possible_targets = []  # type: list[list[int]]
                 level = 1
-                target_i = min(21, max(0, int((target.y - 10) / 20)))
-                target_j = min(18, max(0, int((target.x - 10) / 20)))
+                target_i = min(self.rows - 1, max(0, int((target.y - 10) / 20)))
+                target_j = min(self.cols - 1, max(0, int((target.x - 10) / 20)))
                 while not possible_targets:
                     possible_targets = grid.get_adjacent_cells(target_j, target_i, n=level, is_not_wall=True)
                     level += 1
@@ -218,7 +299,7 @@ class Enemy(pygame.sprite.Sprite):
                     if distance < min_distance[1]:
                         min_distance = (index, distance)
 
-                maze = get_maze(grid.walls, self.get_current_cell())
+                maze = get_maze(grid, self.get_current_cell())
                 path = self.get_path(
                     maze, cast(tuple[int, int], tuple(possible_targets[min_distance[0]]))
                 )  # Get new path
@@ -227,46 +308,47 @@ class Enemy(pygame.sprite.Sprite):
                 grid_cell = grid.get_cell_in_front(*player.get_current_cell(), player.get_direction(), 2)
                 x, y = grid_cell
 
-                maze = get_maze(grid.walls, self.get_current_cell())
                 player_pos_x, player_pos_y = player.get_current_cell()
-                if (x, y) != (player_pos_x, player_pos_y):
-                    maze[player_pos_y][player_pos_x] = 1
+                blocked = ((player_pos_y, player_pos_x),) if (x, y) != (player_pos_x, player_pos_y) else ()
+                maze = get_maze(grid, self.get_current_cell(), blocked)
 
                 path = self.get_path(maze, grid_cell)  # Get new path
 
             case "blinky":
-                maze = get_maze(grid.walls, self.get_current_cell())
-                path = self.get_path(maze, player.get_current_cell())  # Get new path
+                maze = get_maze(grid, self.get_current_cell())
+                path = self.get_path(maze, player.get_current_cell(), use_flow_field=True)  # Get new path
                 color = (200, 50, 50)  # use a slightly less intensive colour
 
             case "clyde":
-                maze = get_maze(grid.walls, self.get_current_cell())
+                maze = get_maze(grid, self.get_current_cell())
                 # If the distance between clyde and player is <= 5.5 grid cells,
                 # then go to bottom left corner (does not work with the portal).
                 if (
                     math.sqrt(math.pow(player.pos.x - self.pos.x, 2) + math.pow(player.pos.y - self.pos.y, 2))
                     <= 5.5 * 20
                 ):
-                    path = self.get_path(maze, (1, 20))  # Get new path
+                    path = self.get_path(maze, swap(*grid.level.corner))  # Get new path
                 else:
-                    path = self.get_path(maze, player.get_current_cell())  # Get new path
+                    path = self.get_path(maze, player.get_current_cell(), use_flow_field=True)  # Get new path
 
             case "feared":
                 if self.pos != self.home:
-                    colour = (0, 127, 255) if int(pygame.time.get_ticks() / 400) % 2 == 0 else (255, 255, 255)
+                    colour = (
+                        (0, 127, 255) if int(params["timer"].get_elapsed_time() / 0.4) % 2 == 0 else (255, 255, 255)
+                    )
                     pygame.draw.circle(self.surf, colour, (18 // 2, 18 // 2), 9)
                     pygame.draw.rect(self.surf, colour, pygame.Rect(0, 9, 18, 9))
 
                 if self._is_feared == 3:
-                    return  # wait for fear timer to be over
+                    return False  # wait for fear timer to be over
                 if self._is_feared < 2 or swap(*self.get_current_cell()) == self.path[-1]:
                     self._is_feared = 2
                     # Get new path to a random position
                     random_pos = grid.get_random_position()
-                    maze = get_maze(grid.walls, self.get_current_cell())
+                    maze = get_maze(grid, self.get_current_cell())
                     path = self.get_path(maze, swap(*random_pos))
                 elif self.path:
-                    maze = get_maze(grid.walls, self.get_current_cell())
+                    maze = get_maze(grid, self.get_current_cell())
                     new_path = self.get_path(maze, swap(*self.path[-1]))
                     if new_path and len(new_path) >= len(self.path):
                         path = self.path
@@ -280,12 +362,7 @@ class Enemy(pygame.sprite.Sprite):
             case _:
                 sys.exit("Enemy move pattern not found.")
 
-        if highlight_path and path:
-            for pos_y, pos_x in path:  # Highlight new path
-                pygame.draw.line(cells[pos_y][pos_x].surf, color, (6, 6), (6, 15), thickness)
-                pygame.draw.line(cells[pos_y][pos_x].surf, color, (6, 15), (15, 15), thickness)
-                pygame.draw.line(cells[pos_y][pos_x].surf, color, (6, 6), (15, 6), thickness)
-                pygame.draw.line(cells[pos_y][pos_x].surf, color, (15, 6), (15, 15), thickness)
+        self._path_colour = color
 
         # Collision
         if player.get_current_cell() == self.get_current_cell():
@@ -293,16 +370,9 @@ class Enemy(pygame.sprite.Sprite):
                 self._is_feared = 3  # ghost was eaten while being feared
                 self._reset_position()  # return to home
                 self.score += 100
-                return
+                return False
 
-            # DISCLAIMER: This is NOT clean code!
-            from main import run  # pylint: disable=import-outside-toplevel
-
-            params["lives"] = params["lives"] - 1
-            if params["lives"] == 0:
-                game_over(params["score"] - 420)
-            else:
-                run(params)
+            return True
 
         def tuple_difference(t1: tuple[int, int], t2: tuple[Any, ...], add: bool = False) -> tuple[Any, ...]:
             """
@@ -317,7 +387,7 @@ class Enemy(pygame.sprite.Sprite):
 
         # Do not move the enemy if no path has been found
         if not path:
-            return
+            return False
 
         speed, width = params["speed"], params["width"]
         speed = int(speed * 0.5)
@@ -338,3 +408,14 @@ class Enemy(pygame.sprite.Sprite):
             self.move(*path[0], speed, width, params["timer"], enemy)
 
         self.path = path
+        return False
+
+    def highlight_path(self, overlay: PathOverlay, highlight_path: bool = True) -> None:
+        """
+        Highlight the current path of the enemy on the path overlay (replacing the previously highlighted path)
+
+        :param overlay: The path overlay of the renderer
+        :param highlight_path: Boolean flag to show or hide the path of enemies
+        :return: Nothing
+        """
+        overlay.set_path(self.name, self.path if highlight_path else (), self._path_colour)
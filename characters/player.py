@@ -1,15 +1,36 @@
 """
 This module contains an implementation of a player object.
 """
+from functools import lru_cache
 from typing import Any, cast
 
 import pygame
-from pygame.locals import K_DOWN, K_LEFT, K_RIGHT, K_UP
 
 from level.cell import Cell
 from level.field import Field
 from level.grid import Grid
-from level.menu import game_over, update_score
+from logic.dot import PELLET
+
+
+@lru_cache(maxsize=5)
+def get_player_surface(facing: int) -> pygame.Surface:
+    """
+    Gets the (shared) player sprite facing the given direction.
+
+    :param facing: The direction the player is facing (-1 for the initial direction, i.e. left).
+    :return: The surface of the player.
+    """
+    surf = pygame.Surface((30, 30))
+    surf.fill((0, 0, 0))
+    surf.set_colorkey((0, 0, 0))
+    pygame.draw.circle(surf, (255, 255, 0), (30 // 2, 30 // 2), 7.5)
+    pygame.draw.polygon(surf, (0, 0, 0), [(0, 7), (0, 20), (15, 14)])
+    if facing != -1:
+        # The same rotation as a direction change from the initial direction (see Player.move_player)
+        dir_change = facing + 1
+        angle = (90 * dir_change) if dir_change % 2 == 0 else (90 * dir_change) + 180
+        surf = pygame.transform.rotate(surf, angle)
+    return surf
 
 
 class Player(pygame.sprite.Sprite):
@@ -17,22 +38,45 @@ class Player(pygame.sprite.Sprite):
     A class to represent a player.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, start: tuple[int, int] = (16, 9), size: tuple[int, int] = (22, 19)) -> None:
         """
         Constructs a player object.
+
+        :param start: The (row, column) cell at which the player starts.
+        :param size: The number of rows and columns of the grid.
         """
         super().__init__()
-        self.surf = pygame.Surface((30, 30))
-        self.surf.fill((0, 0, 0))
-        self.surf.set_colorkey((0, 0, 0))
-        pygame.draw.circle(self.surf, (255, 255, 0), (30 // 2, 30 // 2), 7.5)
-        pygame.draw.polygon(self.surf, (0, 0, 0), [(0, 7), (0, 20), (15, 14)])
+        self.surf = get_player_surface(-1)
         self.rect = self.surf.get_rect()
+        self.rows, self.cols = size
 
-        self.pos = pygame.math.Vector2((190, 345))
+        self.pos = pygame.math.Vector2((start[1] * 20 + 10, start[0] * 20 + 25))
         self.vel = pygame.math.Vector2(0, 0)
         self.dir = -1  # type: int
 
+    def get_state(self) -> tuple[float, float, float, float, int]:
+        """
+        Gets the state of the player (e.g. to save a game state).
+
+        :return: The position, the velocity and the requested direction.
+        """
+        return self.pos.x, self.pos.y, self.vel.x, self.vel.y, self.dir
+
+    def set_state(self, state: tuple[float, float, float, float, int], facing: int) -> None:
+        """
+        Sets the state of the player.
+
+        :param state: The state returned by get_state.
+        :param facing: The direction the player is facing (i.e. the current moving direction of the game).
+        :return: Nothing.
+        """
+        x, y, vel_x, vel_y, direction = state
+        self.dir = int(direction)
+        self.pos.update(x, y)
+        self.vel.update(vel_x, vel_y)
+        self.surf = get_player_surface(facing)
+        self.rect.midbottom = cast(tuple[int, int], self.pos)
+
     def move(self, direction: int, speed: float, width: int) -> None:
         """
         Update the player's position.
@@ -77,25 +121,19 @@ class Player(pygame.sprite.Sprite):
 
         :return: The position.
         """
-        return int(self.pos.x / 20) % 19, int((self.pos.y - 15) / 20) % 22
+        return int(self.pos.x / 20) % self.cols, int((self.pos.y - 15) / 20) % self.rows
 
-    def set_direction(self, pressed_keys: Any, next_move: bool, old_direction: int) -> tuple[bool, int]:
+    def set_direction(self, direction: int, next_move: bool, old_direction: int) -> tuple[bool, int]:
         """
         Sets the players moving direction.
 
-        :param pressed_keys: Sequence of boolean values representing the state of every key on the keyboard.
+        :param direction: The requested direction (-1 if no direction is requested).
         :param next_move: Whether a new direction has been requested by the user.
         :param old_direction: The old moving direction of the player.
         :return: A boolean indicating whether a new direction is requested or not and the old moving direction.
         """
-        if pressed_keys[K_LEFT]:
-            self.dir = 3
-        if pressed_keys[K_RIGHT]:
-            self.dir = 1
-        if pressed_keys[K_UP]:
-            self.dir = 0
-        if pressed_keys[K_DOWN]:
-            self.dir = 2
+        if direction != -1:
+            self.dir = direction
         if self.dir != old_direction:
             return True, self.dir
 
@@ -128,11 +166,41 @@ class Player(pygame.sprite.Sprite):
 
         if not (j == previous_cell[0] and i == previous_cell[1]):
             cells[previous_cell[0]][previous_cell[1]].surf.fill(previous_cell[2])
+            cells[previous_cell[0]][previous_cell[1]].dirty = True
             col = (0, 0, 255) if grid.is_wall(j, i) else (0, 0, 0)
             previous_cell = (j, i, col)
 
         return i, j, previous_cell, cells
 
+    def highlight_next_cell(self, cells: list[list[Cell]], old_field: Field, grid: Grid, i: int, j: int) -> Field:
+        """
+        Highlight the next cell for which the player is headed.
+
+        :param cells: The matrix of Cell objects.
+        :param old_field: The previously highlighted field.
+        :param grid: The grid matrix of the game.
+        :param i: The horizontal index of the player's cell.
+        :param j: The vertical index of the player's cell.
+        :return: The newly highlighted field.
+        """
+        x_new, y_new = grid.get_next_cell((i, j), self.get_direction())
+        colour = (0, 0, 255) if (grid.is_wall(y_new, x_new) and (y_new, x_new) != grid.level.door) else (0, 0, 0)
+        new_field = Field(x_new, y_new, colour)
+
+        cells[y_new][x_new].surf.fill((0, 255, 0))
+        surface = pygame.Surface((17, 17))
+        surface.fill(colour)
+        cells[y_new][x_new].surf.blit(surface, (1, 1))
+        cells[y_new][x_new].dirty = True
+
+        # Overwrite the last highlighted cell (remove highlighted border)
+        if new_field.coordinates != old_field.coordinates:
+            x, y = old_field.coordinates
+            cells[y][x].surf.fill(old_field.colour)
+            cells[y][x].dirty = True
+
+        return new_field
+
     def move_player(
         self,
         next_move: bool,
@@ -140,41 +208,24 @@ class Player(pygame.sprite.Sprite):
         grid: Grid,
         i: int,
         j: int,
-        cells: list[list[Cell]],
-        old_field: Field,
+        direction: int,
         params: dict[str, Any],
-    ) -> tuple[bool, int, Field, bool]:
+    ) -> tuple[bool, int, bool]:
         """
         Move the player.
 
         :param next_move: Whether an input for a new direction has been pressed or not.
         :param old_direction: The player's current moving direction.
         :param grid: The grid matrix of the game.
-        :param i: The vertical index.
-        :param j: The horizontal index.
-        :param cells: The matrix of Cell objects.
-        :param old_field: The previous field object.
+        :param i: The horizontal index of the player's cell.
+        :param j: The vertical index of the player's cell.
+        :param direction: The direction requested by the controller (-1 if no direction is requested).
         :param params: Various game parameters.
-        :return: Updated player movement variables.
+        :return: Updated player movement variables and whether a pellet has been eaten.
         """
         # Player movement
-        pressed_key = pygame.key.get_pressed()
-        next_move, new_direction = self.set_direction(pressed_key, next_move, old_direction)
-
-        # Highlight the next cell for which the player is headed
+        next_move, new_direction = self.set_direction(direction, next_move, old_direction)
         x_new, y_new = grid.get_next_cell((i, j), self.get_direction())
-        colour = (0, 0, 255) if (grid.is_wall(y_new, x_new) and (y_new, x_new) != (9, 9)) else (0, 0, 0)
-        new_field = Field(x_new, y_new, colour)
-
-        cells[y_new][x_new].surf.fill((0, 255, 0))
-        surface = pygame.Surface((17, 17))
-        surface.fill(colour)
-        cells[y_new][x_new].surf.blit(surface, (1, 1))
-
-        # Overwrite the last highlighted cell (remove highlighted border)
-        if new_field.coordinates != old_field.coordinates:
-            x, y = old_field.coordinates
-            cells[y][x].surf.fill(old_field.colour)
 
         x_old, y_old = grid.get_next_cell((i, j), old_direction)  # keep the old direction
 
@@ -218,15 +269,9 @@ class Player(pygame.sprite.Sprite):
 
         # Eat dot
         fear_state = False
-        if self.get_current_cell() in params["dots"]:
-            dot = params["dots"].pop(self.get_current_cell(), None)
-            if dot.is_pellet:
-                fear_state = True
-
-        # Game over when all dots are eaten
-        if not params["dots"]:
-            game_over(update_score(params["score"], params["timer"]))
+        if params["dots"].eat(self.get_current_cell()) == PELLET:
+            fear_state = True
 
         # if pygame.sprite.spritecollideany(player, all_sprites):
         #     player.stop()
-        return next_move, old_direction, new_field, fear_state
+        return next_move, old_direction, fear_state
@@ -9,15 +9,40 @@ class Cell(pygame.sprite.Sprite):
     A class to represent a sprite of a cell
     """
 
-    def __init__(self, x: int, y: int, colour: tuple[int, int, int]):
+    def __init__(self, x: int, y: int, colour: tuple[int, int, int], dirty_cells: set["Cell"] | None = None):
         """
         Constructs a cell sprite.
 
         :param x: The x-coordinate of the cell.
         :param y: The y-coordinate of the cell.
         :param colour: The colour of the cell/sprite.
+        :param dirty_cells: The set of changed cells (shared by all cells of a matrix).
         """
         super().__init__()
         self.surf = pygame.Surface((19, 19))
         self.surf.fill(colour)
         self.rect = self.surf.get_rect(center=(x, y))
+        self.dirty_cells = dirty_cells if dirty_cells is not None else set()
+        self.dirty = True
+
+    @property
+    def dirty(self) -> bool:
+        """
+        Checks whether the surface has changed since it has been drawn.
+
+        :return: True if the cell has changed, False otherwise.
+        """
+        return self in self.dirty_cells
+
+    @dirty.setter
+    def dirty(self, dirty: bool) -> None:
+        """
+        Flags the cell as changed (or as drawn).
+
+        :param dirty: Whether the surface has changed since it has been drawn.
+        :return: Nothing.
+        """
+        if dirty:
+            self.dirty_cells.add(self)
+        else:
+            self.dirty_cells.discard(self)
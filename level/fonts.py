@@ -0,0 +1,42 @@
+"""
+This module contains a registry of the loaded fonts and a cache of rendered text surfaces.
+"""
+import os
+from functools import lru_cache
+
+import pygame
+
+FONT_PATH = os.path.join("resources", "PixeloidSans.ttf")
+
+
+@lru_cache(maxsize=None)
+def get_font(size: int, path: str = FONT_PATH) -> pygame.font.Font:
+    """
+    Gets the font of the given size. Every font file is only parsed once per size.
+
+    :param size: The font size.
+    :param path: The path of the font file.
+    :return: The font.
+    """
+    return pygame.font.Font(path, size)
+
+
+@lru_cache(maxsize=256)
+def render_text(
+    text: str,
+    size: int,
+    colour: tuple[int, int, int],
+    background: tuple[int, int, int] | None = None,
+    path: str = FONT_PATH,
+) -> pygame.Surface:
+    """
+    Gets the (cached) surface of a rendered text. The surface is shared, hence it must not be modified.
+
+    :param text: The text.
+    :param size: The font size.
+    :param colour: The colour of the text.
+    :param background: The background colour of the text (None for a transparent background).
+    :param path: The path of the font file.
+    :return: The rendered text.
+    """
+    return get_font(size, path).render(text, True, colour, background)
@@ -6,7 +6,9 @@ import random
 from enum import Enum
 
 from level.cell import Cell
-from logic.dot import Dot
+from level.level_file import Level, load_level
+from logic.dot import DotLayer
+from logic.maze import Maze
 
 
 class Direction(Enum):
@@ -25,34 +27,29 @@ class Grid:
     A class to represent a grid.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, rng: random.Random | None = None, level: Level | None = None) -> None:
         """
         Constructs a grid object (2D matrix).
+
+        :param rng: The random number generator used for random positions (a new one if it is not given).
+        :param level: The level of the grid (the default level if it is not given).
+        """
+        self.rng = rng if rng is not None else random.Random()
+        self.level = level if level is not None else load_level()
+        self.rows, self.cols = self.level.shape
+        self.walls = self.level.walls.tolist()
+        self._maze = None  # type: Maze | None
+
+    @property
+    def maze(self) -> Maze:
         """
-        self.walls = [
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 0, 1],
-            [1, 0, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 0, 1],
-            [1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1],
-            [1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1],
-            [1, 1, 1, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 1, 1, 1],
-            [1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1],
-            [0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0],
-            [1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1],
-            [1, 1, 1, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 1, 1, 1],
-            [1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 0, 1],
-            [1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 1],
-            [1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1],
-            [1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 1],
-            [1, 0, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-        ]
+        Get the (immutable) maze of the walls, which is used for path finding.
+
+        :return: The maze.
+        """
+        if self._maze is None:
+            self._maze = Maze(self.walls)
+        return self._maze
 
     def init_map(self) -> list[list[Cell]]:
         """
@@ -60,37 +57,30 @@ class Grid:
 
         :return: A matrix of cell objects.
         """
-        home = [(9, 9), (8, 10), (9, 10), (10, 10)]
+        home = set(self.level.ghost_house)
+        dirty_cells = set()  # type: set[Cell]
         cells = []
-        for j in range(22):
+        for j in range(self.rows):
             grid_row = []
-            for i in range(19):
+            for i in range(self.cols):
                 if self.walls[j][i]:
-                    if (i, j) in home:
-                        grid_row.append(Cell(i * 20 + 10, j * 20 + 10, (0, 0, 0)))
+                    if (j, i) in home:
+                        grid_row.append(Cell(i * 20 + 10, j * 20 + 10, (0, 0, 0), dirty_cells))
                     else:
-                        grid_row.append(Cell(i * 20 + 10, j * 20 + 10, (0, 0, 255)))
+                        grid_row.append(Cell(i * 20 + 10, j * 20 + 10, (0, 0, 255), dirty_cells))
                 else:
-                    grid_row.append(Cell(i * 20 + 10, j * 20 + 10, (0, 0, 0)))
+                    grid_row.append(Cell(i * 20 + 10, j * 20 + 10, (0, 0, 0), dirty_cells))
             cells.append(grid_row)
 
         return cells
 
-    def init_dots(self, pellets: list[tuple[int, int]]) -> dict[tuple[int, int], Dot]:
+    def init_dots(self) -> DotLayer:
         """
-        Initialises the dots (and pellets) on the grid.
+        Initialises the dots (and pellets) of the level on the grid.
 
-        :param pellets: A list of coordinates of the large dots.
-        :return: A dictionary of dot objects.
+        :return: The dot layer.
         """
-        dots = {}
-        for j in range(22):
-            for i in range(19):
-                if not self.walls[j][i]:
-                    is_pellet = (i, j) in pellets
-                    dots[(i, j)] = Dot(i * 20 + 10, j * 20 + 10, is_pellet)
-
-        return dots
+        return DotLayer(self.level.dots)
 
     def is_wall(self, i: int, j: int) -> bool:
         """
@@ -194,11 +184,11 @@ class Grid:
         :return: A tuple of indexes corresponding to a random cell
         """
 
-        i = random.randint(0, len(self.walls) - 1)
+        i = self.rng.randint(0, len(self.walls) - 1)
         while sum(self.walls[i]) == len(self.walls[0]):
-            i = random.randint(0, len(self.walls) - 1)
+            i = self.rng.randint(0, len(self.walls) - 1)
 
-        j = random.randint(0, len(self.walls[i]) - 1)
+        j = self.rng.randint(0, len(self.walls[i]) - 1)
         while self.walls[i][j] == 1:
             j = (j + 1) % len(self.walls[i])
 
@@ -0,0 +1,325 @@
+"""
+This module contains the level files: a plain text format of mazes of any size, its parser, a cache of the parsed
+levels (in a compiled binary form) and a generator of large random levels.
+
+Every line of a level file is a row of the maze and every character a cell:
+
+- '#' a wall, '.' a dot, 'o' a pellet and '_' a corridor without a dot,
+- 'P' the start of the player (a corridor with a dot),
+- 'H' a cell of the ghost house and 'b', 'p', 'i' and 'c' the starts of blinky, pinky, inky and clyde inside it.
+
+Lines starting with ';' are comments.
+
+Usage: python -m level.level_file LEVEL [--generate ROWS COLS] [--seed SEED]
+"""
+import argparse
+import hashlib
+import os
+import random
+import zipfile
+from functools import lru_cache
+
+import numpy as np
+
+from logic.dot import DOT, EMPTY, PELLET
+from logic.game_state import ENEMY_NAMES
+
+DEFAULT_LEVEL = os.path.join("resources", "levels", "classic.txt")
+CACHE_VERSION = 1  # invalidates the cached levels if the compiled form changes
+
+WALL, DOT_SYMBOL, PELLET_SYMBOL, CORRIDOR, PLAYER, HOUSE = "#", ".", "o", "_", "P", "H"
+GHOST_SYMBOLS = {"blinky": "b", "pinky": "p", "inky": "i", "clyde": "c"}
+SYMBOLS = WALL + DOT_SYMBOL + PELLET_SYMBOL + CORRIDOR + PLAYER + HOUSE + "".join(GHOST_SYMBOLS.values())
+
+# The arrays of the compiled form of a level
+ARRAYS = ("walls", "dots", "house", "starts", "junctions", "tunnels")
+
+
+class LevelError(Exception):
+    """A custom exception used to report invalid level files"""
+
+
+def _codes(symbols: str) -> list[int]:
+    """
+    Gets the character codes of the given symbols.
+
+    :param symbols: The symbols.
+    :return: The list of codes.
+    """
+    return [ord(symbol) for symbol in symbols]
+
+
+class Level:
+    """
+    A class to represent a parsed level. The arrays are read-only, hence a level can be shared by all games.
+    Besides the walls, the dots and the start positions, the junctions and the tunnels of the maze are precomputed.
+    """
+
+    def __init__(
+        self,
+        walls: np.ndarray,
+        dots: np.ndarray,
+        house: np.ndarray,
+        starts: np.ndarray,
+        junctions: np.ndarray | None = None,
+        tunnels: np.ndarray | None = None,
+    ) -> None:
+        """
+        Constructs a level object.
+
+        :param walls: The walls of the maze (1 for walls and cells of the ghost house, 0 for corridors).
+        :param dots: The initial dot layer (EMPTY, DOT or PELLET for every cell).
+        :param house: The cells of the ghost house (as a boolean mask).
+        :param starts: The start (row, column) cells of the player and of every ghost (in the order of ENEMY_NAMES).
+        :param junctions: The walkable cells which are not part of a corridor (computed if not given).
+        :param tunnels: The (row, column) border cells connected to the opposite border (computed if not given).
+        """
+        self.walls = np.asarray(walls, dtype=np.uint8)
+        self.dots = np.asarray(dots, dtype=np.uint8)
+        self.house = np.asarray(house, dtype=bool)
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.rows, self.cols = self.walls.shape  # type: int, int
+
+        walkable = self.walls == 0
+        if junctions is None:
+            # The number of walkable neighbours (wrapping around the borders like the path finding)
+            neighbours = sum(np.roll(walkable, shift, axis) for shift in (-1, 1) for axis in (0, 1))
+            junctions = walkable & (neighbours != 2)
+        self.junctions = np.asarray(junctions, dtype=bool)
+        if tunnels is None:
+            rows = np.flatnonzero(walkable[:, 0] & walkable[:, -1])
+            cols = np.flatnonzero(walkable[0, :] & walkable[-1, :])
+            ends = [(int(row), col) for row in rows for col in (0, self.cols - 1)]
+            ends += [(row, int(col)) for col in cols for row in (0, self.rows - 1)]
+            tunnels = np.array(ends, dtype=np.int64)
+        self.tunnels = np.asarray(tunnels, dtype=np.int64).reshape(-1, 2)
+        for name in ARRAYS:
+            getattr(self, name).flags.writeable = False
+
+        # Identifies the level independent of its file (e.g. to check that a replay is played on its level)
+        digest = hashlib.sha256(np.array(self.walls.shape, dtype="<u4").tobytes())
+        for array in (self.walls, self.dots, self.house, self.starts.astype("<i8")):
+            digest.update(array.tobytes())
+        self.digest = digest.digest()[:8]
+
+        self.player_start = (int(self.starts[0, 0]), int(self.starts[0, 1]))
+        self.ghost_starts = {
+            name: (int(row), int(col)) for name, (row, col) in zip(ENEMY_NAMES, self.starts[1:])
+        }  # type: dict[str, tuple[int, int]]
+        self.ghost_house = tuple((int(row), int(col)) for row, col in np.argwhere(self.house))
+        self.door = self.ghost_house[0]  # the top cell of the ghost house
+        # The bottom left walkable cell (the target of clyde)
+        row = int(np.flatnonzero(walkable.any(axis=1))[-1])
+        self.corner = (row, int(np.flatnonzero(walkable[row])[0]))
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """
+        Gets the dimensions of the maze.
+
+        :return: The number of rows and columns.
+        """
+        return self.rows, self.cols
+
+    def get_arrays(self) -> dict[str, np.ndarray]:
+        """
+        Gets the compiled form of the level (e.g. to cache it).
+
+        :return: The arrays of the level (see ARRAYS).
+        """
+        return {name: getattr(self, name) for name in ARRAYS}
+
+
+def parse_level(text: str) -> Level:
+    """
+    Parses the text of a level file.
+
+    :param text: The text.
+    :return: The level.
+    """
+    lines = [line for line in text.splitlines() if not line.startswith(";")]
+    while lines and not lines[-1]:
+        lines.pop()
+    if not lines:
+        raise LevelError("The level is empty.")
+    cols = len(lines[0])
+    for number, line in enumerate(lines):
+        if len(line) != cols:
+            raise LevelError(f"Row {number} has {len(line)} instead of {cols} cells.")
+    try:
+        tiles = np.frombuffer("".join(lines).encode("ascii"), dtype=np.uint8).reshape(len(lines), cols)
+    except UnicodeEncodeError as error:
+        raise LevelError("The level contains unknown symbols.") from error
+    unknown = np.argwhere(~np.isin(tiles, _codes(SYMBOLS)))
+    if len(unknown):
+        row, col = unknown[0]
+        raise LevelError(f"Unknown symbol {chr(tiles[row, col])!r} at row {row}, column {col}.")
+
+    starts = []
+    for symbol in PLAYER + "".join(GHOST_SYMBOLS[name] for name in ENEMY_NAMES):
+        cells = np.argwhere(tiles == ord(symbol))
+        if len(cells) != 1:
+            raise LevelError(f"The level must contain exactly one {symbol!r} (found {len(cells)}).")
+        starts.append(cells[0])
+
+    house = np.isin(tiles, _codes(HOUSE + "".join(GHOST_SYMBOLS.values())))
+    walls = house | (tiles == ord(WALL))
+    dots = np.where(np.isin(tiles, _codes(DOT_SYMBOL + PLAYER)), DOT, EMPTY)
+    dots[tiles == ord(PELLET_SYMBOL)] = PELLET
+    return Level(walls, dots, house, np.array(starts))
+
+
+def get_cache_path(path: str) -> str:
+    """
+    Gets the path of the compiled form of a level file (next to the compiled python modules).
+
+    :param path: The path of the level file.
+    :return: The path of the cache file.
+    """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, "__pycache__", f"{name}.npz")
+
+
+@lru_cache(maxsize=8)
+def _load_level(path: str, mtime_ns: int, size: int) -> Level:
+    """
+    Loads a level from its cache file or parses (and caches) it if the level file has changed.
+
+    :param path: The absolute path of the level file.
+    :param mtime_ns: The modification time of the level file (in ns).
+    :param size: The size of the level file (in bytes).
+    :return: The level.
+    """
+    cache_path = get_cache_path(path)
+    stamp = np.array([CACHE_VERSION, mtime_ns, size], dtype=np.int64)
+    try:
+        with np.load(cache_path) as arrays:
+            if np.array_equal(arrays["stamp"], stamp):
+                return Level(**{name: arrays[name] for name in ARRAYS})
+    except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+        pass  # no (valid) cache file
+
+    with open(path, encoding="utf-8") as file:
+        level = parse_level(file.read())
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp"  # other processes never read a partial file
+        with open(temporary_path, "wb") as file:
+            np.savez_compressed(file, stamp=stamp, **level.get_arrays())  # type: ignore
+        os.replace(temporary_path, cache_path)
+    except OSError:
+        pass  # e.g. a read-only directory (the level is parsed again next time)
+    return level
+
+
+def load_level(path: str = DEFAULT_LEVEL) -> Level:
+    """
+    Loads a level file. The parsed level is cached in memory and in a cache file until the level file changes.
+
+    :param path: The path of the level file.
+    :return: The level.
+    """
+    stat = os.stat(path)
+    return _load_level(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+
+def _get_closest(tiles: np.ndarray, symbol: str, target: tuple[float, float], min_row: int = 0) -> tuple[int, int]:
+    """
+    Gets the cell with the given symbol which is the closest one to a target position.
+
+    :param tiles: The character codes of the cells.
+    :param symbol: The symbol.
+    :param target: The (row, column) target position.
+    :param min_row: The first row which is searched.
+    :return: The (row, column) cell.
+    """
+    cells = np.argwhere(tiles[min_row:] == ord(symbol)) + (min_row, 0)
+    row, col = cells[((cells - target) ** 2).sum(axis=1).argmin()]
+    return int(row), int(col)
+
+
+def generate_level(rows: int, cols: int, seed: int | None = None, braid: float = 0.5) -> str:
+    """
+    Generates the text of a random level (e.g. to stress test the game on large mazes). The corridors form a maze
+    without dead ends (with a given probability), the ghost house is in the centre and a tunnel crosses the maze.
+
+    :param rows: The number of rows.
+    :param cols: The number of columns.
+    :param seed: The seed of the random number generator.
+    :param braid: The probability of removing a dead end.
+    :return: The text of the level file.
+    """
+    if rows < 15 or cols < 15:
+        raise ValueError("A level must have at least 15 rows and 15 columns.")
+    rng = random.Random(seed)
+    tiles = np.full((rows, cols), ord(WALL), dtype=np.uint8)
+    height, width = (rows - 1) // 2, (cols - 1) // 2  # the cells with odd indexes are the nodes of the maze
+    steps = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+    # A perfect maze (depth-first search)
+    visited = np.zeros((height, width), dtype=bool)
+    stack = [(rng.randrange(height), rng.randrange(width))]
+    visited[stack[0]] = True
+    tiles[2 * stack[0][0] + 1, 2 * stack[0][1] + 1] = ord(DOT_SYMBOL)
+    while stack:
+        row, col = stack[-1]
+        unvisited = [
+            (row + dr, col + dc)
+            for dr, dc in steps
+            if 0 <= row + dr < height and 0 <= col + dc < width and not visited[row + dr, col + dc]
+        ]
+        if not unvisited:
+            stack.pop()
+            continue
+        next_row, next_col = rng.choice(unvisited)
+        visited[next_row, next_col] = True
+        tiles[row + next_row + 1, col + next_col + 1] = ord(DOT_SYMBOL)
+        tiles[2 * next_row + 1, 2 * next_col + 1] = ord(DOT_SYMBOL)
+        stack.append((next_row, next_col))
+
+    # Remove dead ends (by opening a wall towards a neighbouring node)
+    for row in range(1, 2 * height, 2):
+        for col in range(1, 2 * width, 2):
+            walls = [(dr, dc) for dr, dc in steps if tiles[row + dr, col + dc] == ord(WALL)]
+            candidates = [
+                (dr, dc) for dr, dc in walls if 0 < row + 2 * dr < 2 * height and 0 < col + 2 * dc < 2 * width
+            ]
+            if len(walls) == 3 and candidates and rng.random() < braid:
+                dr, dc = rng.choice(candidates)
+                tiles[row + dr, col + dc] = ord(DOT_SYMBOL)
+
+    # The ghost house inside a ring corridor (every corridor crossing the ring stays connected to it)
+    top, left = rows // 2 - 3, cols // 2 - 3
+    tiles[top : top + 6, left : left + 7] = ord(DOT_SYMBOL)
+    tiles[top + 1 : top + 5, left + 1 : left + 6] = ord(WALL)
+    tiles[top + 1, left + 3] = ord(DOT_SYMBOL)  # the entrance above the door
+    tiles[top + 2, left + 3] = ord(GHOST_SYMBOLS["blinky"])
+    tiles[top + 3, left + 2 : left + 5] = _codes("".join(GHOST_SYMBOLS[name] for name in ("inky", "pinky", "clyde")))
+
+    # A tunnel connecting the left and the right border
+    tunnel = (rows // 4) | 1
+    tiles[tunnel, [0, cols - 2, cols - 1]] = ord(DOT_SYMBOL)
+
+    for corner in ((1, 1), (1, cols - 2), (rows - 2, 1), (rows - 2, cols - 2)):
+        tiles[_get_closest(tiles, DOT_SYMBOL, corner)] = ord(PELLET_SYMBOL)
+    tiles[_get_closest(tiles, DOT_SYMBOL, (top + 8, cols // 2), min_row=top + 6)] = ord(PLAYER)
+
+    header = f"; A generated level ({rows}x{cols}, seed {seed})\n"
+    return header + "\n".join(row.tobytes().decode("ascii") for row in tiles) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check (or generate) a level file.")
+    parser.add_argument("level", nargs="?", default=DEFAULT_LEVEL, help="the path of the level file")
+    parser.add_argument("--generate", nargs=2, type=int, metavar=("ROWS", "COLS"), help="write a random level")
+    parser.add_argument("--seed", type=int, help="the seed of the generated level")
+    args = parser.parse_args()
+
+    if args.generate:
+        with open(args.level, "w", encoding="utf-8") as level_file:
+            level_file.write(generate_level(args.generate[0], args.generate[1], args.seed))
+    checked_level = load_level(args.level)
+    print(
+        f"{checked_level.rows}x{checked_level.cols} cells, {np.count_nonzero(checked_level.dots)} dots, "
+        f"{np.count_nonzero(checked_level.junctions)} junctions, {len(checked_level.tunnels) // 2} tunnels"
+    )
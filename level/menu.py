@@ -10,6 +10,7 @@ import yaml
 from pygame.locals import K_ESCAPE  # pylint: disable = no-name-in-module
 from pygame.locals import KEYDOWN, QUIT
 
+from level.fonts import get_font, render_text
 from logic import checkbox
 from logic.input_box import InputBox
 from logic.timer import Timer
@@ -58,9 +59,7 @@ def print_text(
     :return: Nothing or the text rectangle
     """
 
-    file_path = "resources\\PixeloidSans.ttf"
-    font = pygame.font.Font(file_path, font_size)
-    txt = font.render(text, True, colour)
+    txt = render_text(text, font_size, colour)
     # text.set_alpha(200)
     text_rect = txt.get_rect(center=(x_pos, y_pos)) if pos == "center" else txt.get_rect(topleft=(x_pos, y_pos))
     # text_rect.center = (x_pos, y_pos)
@@ -74,7 +73,7 @@ def paused(
     width: int,
     height: int,
     checkboxes: dict[str, bool],
-) -> dict[str, bool]:
+) -> tuple[dict[str, bool], bool]:
     """
     Pauses the game (opens the pause menu).
 
@@ -83,7 +82,7 @@ def paused(
     :param width: The width of the game window.
     :param height: The height of the game window.
     :param checkboxes: A dict of checkboxes with their toggle status.
-    :return: The updated dictionary of checkboxes with their status.
+    :return: The updated dictionary of checkboxes with their status and whether to return to the main menu.
     """
     background = display.copy()
     s = pygame.Surface((width, height))  # the size of your rect
@@ -91,8 +90,7 @@ def paused(
     s.fill((50, 50, 50))  # this fills the entire surface
 
     # Checkbox
-    file_path = "resources\\PixeloidSans.ttf"
-    font = pygame.font.Font(file_path, 18)
+    font = get_font(18)
     chckbx = checkbox.CheckBox(
         display,
         (display.get_width() * 0.3),
@@ -104,6 +102,7 @@ def paused(
     )
 
     pause = True
+    exit_game = False
     while pause:
         # Darken pause background
         display.blit(background, (0, 0))
@@ -180,9 +179,7 @@ def paused(
                                 pause = False
                             case "exit":
                                 pause = False
-                                from main import main_menu  # pylint: disable = import-outside-toplevel
-
-                                main_menu()
+                                exit_game = True
                             case "quit":
                                 pygame.quit()
                                 sys.exit()
@@ -201,8 +198,7 @@ def paused(
                     message = "Close the application"
                 case _:
                     message = "Something went wrong"
-            hover_surface = font.render(message, True, pygame.Color(255, 255, 255), pygame.Color(34, 34, 34))
-            return hover_surface
+            return render_text(message, 18, (255, 255, 255), (34, 34, 34))
 
         # Display info text when hovering over buttons
         mouse_x, mouse_y = pygame.mouse.get_pos()
@@ -218,20 +214,23 @@ def paused(
         clock.tick(15)
 
     checkboxes["path_highlights"] = chckbx.checked
-    return checkboxes
+    return checkboxes, exit_game
 
 
-def draw_hud(display: pygame.Surface, nr_of_lives: int, score: int) -> None:
+def draw_hud(display: pygame.Surface, nr_of_lives: int, score: int, top: int = 440) -> None:
     """
     Draws the HUD at the bottom of the main window.
 
     :param display: The surface.
     :param nr_of_lives: The number of lives left.
     :param score: The current score of the player.
+    :param top: The vertical position of the HUD (below the maze).
     :return: Nothing.
     """
+    width = display.get_width()
+
     # Life text
-    print_text(display, "Lives:", 16, (222, 222, 222), 35, 455)
+    print_text(display, "Lives:", 16, (222, 222, 222), 35, top + 15)
 
     # Life icons
     life = pygame.Surface((30, 30))
@@ -245,22 +244,20 @@ def draw_hud(display: pygame.Surface, nr_of_lives: int, score: int) -> None:
             life,
             (
                 rect[0] + 60 + i * 20,
-                rect[1] + 440,
+                rect[1] + top,
                 rect[2] + 60 + i * 20,
-                rect[3] + 470,
+                rect[3] + top + 30,
             ),
         )
 
     # Copyright
-    file_path = "resources\\PixeloidSans.ttf"
-    smallfont = pygame.font.Font(file_path, 10)
-    text = smallfont.render("© 2023", True, (222, 222, 222))
+    text = render_text("© 2023", 10, (222, 222, 222))
     text_rect = text.get_rect()
-    text_rect.center = (180, 455)
+    text_rect.center = (width // 2 - 10, top + 15)
     display.blit(text, text_rect)
 
     # Score text
-    print_text(display, "Score:", 16, (222, 222, 222), 270, 455)
+    print_text(display, "Score:", 16, (222, 222, 222), width - 110, top + 15)
 
     # Current score
     score = score % 1600000
@@ -269,19 +266,7 @@ def draw_hud(display: pygame.Surface, nr_of_lives: int, score: int) -> None:
         score_str = chr(int(score_str[:2]) + 55) + score_str[2:]
     else:
         score_str = str(score).zfill(6)
-    print_text(display, f"{score_str}", 16, (222, 222, 222), 340, 455)
-
-
-def draw_surface(display: pygame.Surface, surfaces: pygame.sprite.Group) -> None:
-    """
-    Draws all surfaces of the given group on the main display surface.
-
-    :param display: The surface of the main display.
-    :param surfaces: A group of sprites.
-    :return: Nothing.
-    """
-    for surf in surfaces:
-        display.blit(surf.surf, surf.rect)
+    print_text(display, f"{score_str}", 16, (222, 222, 222), width - 40, top + 15)
 
 
 def update_score(score: int, timer: Timer) -> int:
@@ -308,8 +293,9 @@ def update_score(score: int, timer: Timer) -> int:
 
 def game_over(score: int) -> None:
     """
-    Shows the game over screen
+    Shows the game over screen (until the player has entered a name and continues to the main menu)
 
+    :param score: The final score of the player.
     :return: Nothing.
     """
     clock = pygame.time.Clock()
@@ -354,10 +340,7 @@ def game_over(score: int) -> None:
                         # Append player score to high scores
                         with open("resources/high_scores.yaml", "a", encoding="utf-8") as f:
                             f.write(f"- name: {user_name}\n  value: {score}\n")
-
-                        from main import main_menu  # pylint: disable = import-outside-toplevel
-
-                        main_menu()
+                        return
 
         surf.fill((50, 50, 50))  # this fills the entire surface
 
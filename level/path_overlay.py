@@ -0,0 +1,98 @@
+"""
+This module contains the path overlay, a layer on top of the cells which shows the highlighted paths of the enemies.
+"""
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+
+import pygame
+
+
+@lru_cache(maxsize=8)
+def get_path_stamp(colour: tuple[int, int, int]) -> pygame.Surface:
+    """
+    Gets the (shared) surface of a highlighted cell, which is stamped onto the background of the level.
+
+    :param colour: The colour of the path.
+    :return: The surface of the outline (of the size of a cell).
+    """
+    surf = pygame.Surface((19, 19))
+    surf.fill((0, 0, 0))
+    surf.set_colorkey((0, 0, 0))
+    pygame.draw.line(surf, colour, (6, 6), (6, 15))
+    pygame.draw.line(surf, colour, (6, 15), (15, 15))
+    pygame.draw.line(surf, colour, (6, 6), (15, 6))
+    pygame.draw.line(surf, colour, (15, 6), (15, 15))
+    return surf
+
+
+class PathOverlay:
+    """
+    A class to represent the highlighted paths of the enemies. The cell tiles are not modified: the renderer stamps
+    the outlines onto the background instead. Since only the cells which have been added to or removed from a path
+    are marked as changed, an unchanged path costs nothing to render.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructs an empty path overlay.
+        """
+        self._paths = {}  # type: dict[str, set[tuple[int, int]]]  # the (row, column) cells of every path
+        self._colours = {}  # type: dict[str, tuple[int, int, int]]
+        self._changed = set()  # type: set[tuple[int, int]]
+
+    def set_path(self, name: str, path: Iterable[tuple[int, int]], colour: tuple[int, int, int]) -> None:
+        """
+        Replaces the highlighted path of an enemy.
+
+        :param name: The name of the enemy.
+        :param path: The (row, column) cells of the path (empty to remove the highlight).
+        :param colour: The colour of the path.
+        :return: Nothing.
+        """
+        cells = set(path)
+        old_cells = self._paths.get(name, set())
+        if colour != self._colours.get(name):
+            self._changed |= old_cells | cells
+        else:
+            self._changed |= old_cells ^ cells
+        self._paths[name] = cells
+        self._colours[name] = colour
+
+    def clear(self) -> None:
+        """
+        Removes all highlighted paths.
+
+        :return: Nothing.
+        """
+        for cells in self._paths.values():
+            self._changed |= cells
+        self._paths = {}
+        self._colours = {}
+
+    def get_cells(self) -> set[tuple[int, int]]:
+        """
+        Gets the highlighted cells.
+
+        :return: The (row, column) cells of all paths.
+        """
+        return set().union(*self._paths.values())
+
+    def get_stamps(self, cell: tuple[int, int]) -> Iterator[pygame.Surface]:
+        """
+        Gets the outlines of a cell (the path of the last enemy is drawn on top).
+
+        :param cell: The (row, column) index of the cell.
+        :return: The stamp of every path through the cell.
+        """
+        for name, cells in self._paths.items():
+            if cell in cells:
+                yield get_path_stamp(self._colours[name])
+
+    def pop_changed(self) -> set[tuple[int, int]]:
+        """
+        Gets (and resets) the cells whose highlight has changed since the last call.
+
+        :return: The (row, column) cells.
+        """
+        changed, self._changed = self._changed, set()
+        return changed
@@ -0,0 +1,264 @@
+"""
+This module contains a renderer, which only redraws the changed (dirty) parts of the main display.
+"""
+from typing import Any
+
+import numpy as np
+import pygame
+
+from level.cell import Cell
+from level.fonts import render_text
+from level.menu import draw_hud
+from level.path_overlay import PathOverlay
+from logic.dot import DotLayer, get_dot_rect, get_dot_surface
+
+HUD_HEIGHT = 30
+
+
+def get_interpolated_rect(character: Any, previous_position: pygame.math.Vector2, alpha: float) -> pygame.Rect:
+    """
+    Gets the rectangle of a character between its previous and current position (to render smoothly between two
+    game ticks).
+
+    :param character: A sprite with a position.
+    :param previous_position: The position of the character before the last game tick.
+    :param alpha: The fraction of the next game tick which has already elapsed (between 0 and 1).
+    :return: The rectangle at which to draw the character.
+    """
+    rect = character.rect  # type: pygame.Rect
+    offset = (previous_position - character.pos) * (1 - alpha)
+    # Do not interpolate jumps (e.g. warping through the tunnel or returning to the home position)
+    if offset.length() > 20:
+        return rect.copy()
+    return rect.move(round(offset.x), round(offset.y))
+
+
+def render_profiler_overlay(stats: dict[str, tuple[float, float, float]]) -> pygame.Surface:
+    """
+    Renders a (semi-transparent) table of profiler statistics.
+
+    :param stats: The median, the 95th percentile and the maximum time per frame (in ms) of every scope.
+    :return: The surface of the table.
+    """
+    rows = [("scope", "p50", "p95", "max")] + [
+        (name, f"{p50:.2f}", f"{p95:.2f}", f"{maximum:.2f}") for name, (p50, p95, maximum) in stats.items()
+    ]
+    surf = pygame.Surface((190, 12 * len(rows) + 6))
+    surf.set_alpha(200)
+    surf.fill((0, 0, 0))
+    for j, row in enumerate(rows):
+        colour = (255, 255, 0) if j == 0 else (255, 255, 255)
+        for i, text in enumerate(row):
+            txt = render_text(text, 10, colour)
+            if i == 0:
+                surf.blit(txt, (4, 3 + 12 * j))
+            else:
+                surf.blit(txt, txt.get_rect(topright=(70 + 40 * i, 3 + 12 * j)))
+    return surf
+
+
+class Renderer:
+    """
+    A class to represent the renderer of the main display.
+    The cells (i.e. the maze walls), the highlighted paths and the dots are baked into a single background surface.
+    Every frame only the rectangles of changed cells and paths, eaten dots, moving characters and the HUD are restored
+    from the background and redrawn.
+    """
+
+    def __init__(self, display: pygame.Surface, cells: list[list[Cell]], dots: DotLayer, door: dict) -> None:
+        """
+        Constructs a renderer object.
+
+        :param display: The surface of the main display.
+        :param cells: The matrix of Cell objects.
+        :param dots: The remaining dots.
+        :param door: The surface and rectangle of the ghost house door.
+        """
+        self.display = display
+        self.cells = cells
+        self.dots = dots
+        self.door = door
+        self.background = pygame.Surface(display.get_size())
+        self.path_overlay = PathOverlay()
+        self.blits = 0  # the number of blits of the last frame
+
+        self._rows, self._cols = len(cells), len(cells[0])
+        self._dirty_cells = cells[0][0].dirty_cells  # the changed cells (shared by all cells of the matrix)
+        self._hud_rect = pygame.Rect(0, self._rows * 20, display.get_width(), HUD_HEIGHT)
+        self._dots = dots.cells.copy()  # the dots on the background
+        self._character_rects = {}  # type: dict[Any, pygame.Rect]
+        self._hud = (-1, -1)
+        self._full_redraw = True
+        self._invalid_rects = []  # type: list[pygame.Rect]
+
+    def invalidate(self) -> None:
+        """
+        Redraw the whole display in the next frame (e.g. after it has been covered by a menu).
+
+        :return: Nothing.
+        """
+        self._full_redraw = True
+
+    def invalidate_rect(self, rect: pygame.Rect) -> None:
+        """
+        Redraw a part of the maze in the next frame (e.g. after an overlay has been drawn onto it).
+
+        :param rect: The rectangle of the display.
+        :return: Nothing.
+        """
+        self._invalid_rects.append(pygame.Rect(rect))
+
+    def _stamp_dot(self, i: int, j: int) -> None:
+        """
+        Draws the dot (or pellet) of a cell onto the background surface.
+
+        :param i: The horizontal index (column) of the cell.
+        :param j: The vertical index (row) of the cell.
+        :return: Nothing.
+        """
+        self.background.blit(get_dot_surface(self.dots.is_pellet((i, j))), get_dot_rect((i, j)))
+        self.blits += 1
+
+    def _bake_background(self) -> None:
+        """
+        Draws all cells, all highlighted paths and all remaining dots onto the background surface.
+
+        :return: Nothing.
+        """
+        self.background.fill((0, 0, 0))
+        for row in self.cells:
+            for cell in row:
+                self.background.blit(cell.surf, cell.rect)
+        self._dirty_cells.clear()
+        self.blits += self._rows * self._cols
+        self.path_overlay.pop_changed()
+        for j, i in self.path_overlay.get_cells():
+            for stamp in self.path_overlay.get_stamps((j, i)):
+                self.background.blit(stamp, self.cells[j][i].rect)
+                self.blits += 1
+        for i, j in self.dots:
+            self._stamp_dot(i, j)
+        self._dots = self.dots.cells.copy()
+
+    def _bake_region(self, rect: pygame.Rect) -> None:
+        """
+        Redraws a rectangle of the background surface (the overlapping cells, paths and dots).
+
+        :param rect: The rectangle.
+        :return: Nothing.
+        """
+        self.background.set_clip(rect)
+        self.background.fill((0, 0, 0), rect)
+
+        # Dots are larger than a cell, hence the neighbouring cells are included as well
+        columns = range(max(rect.left // 20 - 1, 0), min((rect.right - 1) // 20 + 2, self._cols))
+        rows = range(max(rect.top // 20 - 1, 0), min((rect.bottom - 1) // 20 + 2, self._rows))
+        for j in rows:
+            for i in columns:
+                cell = self.cells[j][i]
+                if rect.colliderect(cell.rect):
+                    self.background.blit(cell.surf, cell.rect)
+                    self.blits += 1
+                    for stamp in self.path_overlay.get_stamps((j, i)):
+                        self.background.blit(stamp, cell.rect)
+                        self.blits += 1
+        for j in rows:
+            for i in columns:
+                if self._dots[j, i] and rect.colliderect(get_dot_rect((i, j))):
+                    self._stamp_dot(i, j)
+        self.background.set_clip(None)
+
+    def _update_background(self, rects: list[pygame.Rect]) -> None:
+        """
+        Redraws the changed cells and paths and the eaten dots on the background surface.
+
+        :param rects: The list of dirty rectangles, to which the changed rectangles are added.
+        :return: Nothing.
+        """
+        # Only the flagged cells are visited (not every cell of the matrix)
+        changed = [cell.rect for cell in self._dirty_cells]
+        self._dirty_cells.clear()
+        changed.extend(self.cells[j][i].rect for j, i in self.path_overlay.pop_changed())
+
+        for j, i in np.argwhere(self._dots != self.dots.cells):
+            self._dots[j, i] = self.dots.cells[j, i]
+            changed.append(get_dot_rect((int(i), int(j))))
+
+        for rect in changed:
+            self._bake_region(rect)
+        rects.extend(changed)
+
+    def _draw_region(self, rect: pygame.Rect, characters: dict[Any, pygame.Rect]) -> None:
+        """
+        Restores a rectangle of the display from the background and redraws everything overlapping it.
+
+        :param rect: The dirty rectangle.
+        :param characters: The rectangle at which every character is drawn.
+        :return: Nothing.
+        """
+        self.display.set_clip(rect)
+        self.display.blit(self.background, rect, rect)
+        self.blits += 1
+
+        for character, character_rect in characters.items():
+            if rect.colliderect(character_rect):
+                self.display.blit(character.surf, character_rect)
+                self.blits += 1
+
+        if rect.colliderect(self.door["rectangle"]):
+            self.display.blit(self.door["surface"], self.door["rectangle"])
+            self.blits += 1
+        self.display.set_clip(None)
+
+    def render(
+        self,
+        characters: pygame.sprite.Group,
+        previous_positions: dict[pygame.sprite.Sprite, pygame.math.Vector2],
+        alpha: float,
+        lives: int,
+        score: int,
+    ) -> list[pygame.Rect]:
+        """
+        Draws the current frame.
+
+        :param characters: A group of sprites with a position.
+        :param previous_positions: The position of every character before the last game tick.
+        :param alpha: The fraction of the next game tick which has already elapsed (between 0 and 1).
+        :param lives: The remaining lives of the player.
+        :param score: The current score.
+        :return: The rectangles of the display which have changed.
+        """
+        self.blits = 0
+        rects = []  # type: list[pygame.Rect]
+        if self._full_redraw:
+            self._bake_background()
+        else:
+            self._update_background(rects)
+        rects += self._invalid_rects
+        self._invalid_rects = []
+
+        # Moving characters (their previous and their new rectangle)
+        character_rects = {
+            character: get_interpolated_rect(character, previous_positions.get(character, character.pos), alpha)
+            for character in characters
+        }
+        for character, character_rect in character_rects.items():
+            old_rect = self._character_rects.get(character)
+            rects.append(character_rect.union(old_rect) if old_rect else character_rect)
+        self._character_rects = character_rects
+
+        if self._full_redraw:
+            rects = [self.display.get_rect()]
+        for rect in rects:
+            self._draw_region(rect, character_rects)
+
+        # HUD
+        if self._full_redraw or self._hud != (lives, score):
+            self._hud = (lives, score)
+            self.display.fill((0, 0, 0), self._hud_rect)
+            draw_hud(self.display, lives, score, self._hud_rect.top)
+            self.blits += lives + 3
+            rects.append(self._hud_rect)
+
+        self._full_redraw = False
+        return rects
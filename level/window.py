@@ -1,67 +1,112 @@
 """
 This module contains functions which enable the creation of a second window.
 """
-from collections.abc import Iterable
+import math
 
 import numpy
 import pygame
 from pygame._sdl2 import Renderer  # WARNING: Module still in development
 from pygame._sdl2 import Texture, Window
 
+from level.fonts import render_text
 
-def change_surface(window_size: Iterable[int], renderer: Renderer, matrix: numpy.ndarray) -> None:
-    """
-    Updates the surface of the second window.
+COLOUR_DICT = {
+    0: (0, 0, 0),  # corridor
+    1: (0, 0, 255),  # wall
+    2: (69, 69, 69),  # dot
+    3: (34, 139, 34),  # pellet
+    4: (255, 0, 0),  # ghost
+    5: (255, 105, 180),  # feared ghost
+    6: (255, 69, 0),  # player
+}
 
-    :param window_size: The size of the secondary window.
-    :param renderer: The renderer.
-    :param matrix: The matrix of the main game window.
-    :return: Nothing.
+
+class MatrixView:
+    """
+    A class to represent the view of the game matrix in the second window.
+    The glyphs of all values are rendered once into an atlas texture. The matrix is drawn onto a persistent target
+    texture, where only the cells whose value has changed since the last update are redrawn.
     """
-    window_size = tuple(window_size)
-    surf = pygame.Surface(window_size)
-    surf.fill((255, 255, 255))
-
-    w = window_size[0] / 19
-    h = window_size[1] / 22
-
-    file_path = "resources\\PixeloidSans.ttf"
-    font = pygame.font.Font(file_path, 8)
-    colour_dict = {
-        0: (0, 0, 0),  # corridor
-        1: (0, 0, 255),  # wall
-        2: (69, 69, 69),  # dot
-        3: (34, 139, 34),  # pellet
-        4: (255, 0, 0),  # ghost
-        5: (255, 105, 180),  # feared ghost
-        6: (255, 69, 0),  # player
-    }
-
-    for i in range(19):
-        for j in range(22):
-            number = int(matrix[j][i])
-            t = font.render(f"{number}", True, colour_dict[number])
-            tr = t.get_rect()
-            tr.center = (int(w * i + w / 2), int(h * j + h / 2))
-            surf.blit(t, tr)
-
-    tex = Texture.from_surface(renderer, surf)
-    renderer.clear()
-    tex.draw()
-    renderer.present()
-    del tex
-
-
-def create_window(matrix: numpy.ndarray) -> tuple[Window, Renderer]:
+
+    def __init__(self, window: Window, rows: int = 22, cols: int = 19) -> None:
+        """
+        Constructs a matrix view object.
+
+        :param window: The second window.
+        :param rows: The number of rows of the matrix.
+        :param cols: The number of columns of the matrix.
+        """
+        self.renderer = Renderer(window)
+        self.size = tuple(window.size)
+        self.rows, self.cols = rows, cols
+        self._cell_width = self.size[0] / cols
+        self._cell_height = self.size[1] / rows
+        self._glyph_size = math.ceil(self._cell_width), math.ceil(self._cell_height)
+
+        # Glyph atlas (a row of cells with the centred glyph of every value)
+        atlas = pygame.Surface((self._glyph_size[0] * len(COLOUR_DICT), self._glyph_size[1]))
+        atlas.fill((255, 255, 255))
+        for number, colour in COLOUR_DICT.items():
+            glyph = render_text(f"{number}", 8, colour)
+            atlas.blit(glyph, glyph.get_rect(center=((number + 0.5) * self._glyph_size[0], self._glyph_size[1] / 2)))
+        self._atlas = Texture.from_surface(self.renderer, atlas)
+        self._target = Texture(self.renderer, self.size, target=True)
+        self._matrix = None  # type: numpy.ndarray | None
+
+    def _draw_cell(self, j: int, i: int, number: int) -> None:
+        """
+        Draws the glyph of a value onto a cell of the target texture.
+
+        :param j: The vertical index (row) of the cell.
+        :param i: The horizontal index (column) of the cell.
+        :param number: The value of the cell.
+        :return: Nothing.
+        """
+        x, y = int(self._cell_width * i), int(self._cell_height * j)
+        width = int(self._cell_width * (i + 1)) - x
+        height = int(self._cell_height * (j + 1)) - y
+        src_x = number * self._glyph_size[0] + (self._glyph_size[0] - width) // 2
+        src_y = (self._glyph_size[1] - height) // 2
+        self._atlas.draw(srcrect=(src_x, src_y, width, height), dstrect=(x, y, width, height))
+
+    def update(self, matrix: numpy.ndarray) -> None:
+        """
+        Redraws the changed cells of the matrix and presents the second window.
+
+        :param matrix: The matrix of the main game window.
+        :return: Nothing.
+        """
+        if self._matrix is None or self._matrix.shape != matrix.shape:
+            changed = numpy.argwhere(numpy.ones(matrix.shape, dtype=bool))  # first update (redraw all cells)
+        elif numpy.array_equal(self._matrix, matrix):
+            return
+        else:
+            changed = numpy.argwhere(self._matrix != matrix)
+
+        self.renderer.target = self._target
+        for j, i in changed:
+            self._draw_cell(j, i, int(matrix[j, i]))
+        self.renderer.target = None
+        self._matrix = numpy.copy(matrix)
+
+        self.renderer.clear()
+        self._target.draw()
+        self.renderer.present()
+
+
+def create_window(matrix: numpy.ndarray) -> tuple[Window, MatrixView]:
     """
     Creates a second window.
 
     :param matrix: The matrix of the main game window.
-    :return: The second window instance and its renderer.
+    :return: The second window instance and its matrix view.
     """
     win = Window("2nd window", size=(256, 256), always_on_top=True)
-    win.opacity = 1.0  # 0.8
-    renderer = Renderer(win)
-    change_surface(win.size, renderer, matrix)
+    try:
+        win.opacity = 1.0  # 0.8
+    except RuntimeError:  # not supported by every video driver (e.g. the dummy driver of the benchmarks)
+        pass
+    view = MatrixView(win, *matrix.shape)
+    view.update(matrix)
 
-    return win, renderer
+    return win, view
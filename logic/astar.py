@@ -7,56 +7,72 @@ Original code from: https://gist.github.com/ryancollingwood/32446307e976a11a1185
 # as found at https://medium.com/@nicholas.w.swift/easy-a-star-pathfinding-7e6689c7f7b2
 
 import heapq
+import math
+import timeit
+from collections.abc import Callable
 from warnings import warn
 
-from logic.node import Node
+from logic.maze import Maze
+from logic.profiler import PROFILER
 
 
-def return_path(current_node: Node) -> list[tuple[int, int]]:
+def return_path(parents: list[int], index: int, cols: int) -> list[tuple[int, int]]:
     """
     Returns the path as a list of tuples (in reverse order)
 
-    :param current_node: The current node
+    :param parents: The index of the parent of every cell (-1 for the start cell)
+    :param index: The index of the current cell
+    :param cols: The number of columns of the maze
     :return: The found path as a list
     """
     path = []
-    current = current_node
-    while current is not None:
-        path.append(current.position)
-        current = current.parent
+    current = index
+    while current != -1:
+        path.append(divmod(current, cols))
+        current = parents[current]
     return path[::-1]  # Return reversed path
 
 
 def astar(
-    maze: list[list[int]], start: tuple[int, int], end: tuple[int, int], allow_diagonal_movement: bool = False
+    maze: list[list[int]] | Maze,
+    start: tuple[int, int],
+    end: tuple[int, int],
+    allow_diagonal_movement: bool = False,
 ) -> list[tuple[int, int]] | None:
     """
     Returns a list of tuples as a path from the given start to the given end in the given maze
 
-    :param maze: A list of lists, containing 0s and 1s, representing the maze
+    :param maze: A list of lists, containing 0s and 1s, representing the maze (or a maze overlay)
     :param start: The start node of the path
     :param end: The desired end node
     :param allow_diagonal_movement: Whether diagonal movement in the maze is allowed or not
     :return:
     """
-
-    # Create start and end node
-    start_node = Node(None, start)
-    start_node.g = start_node.h = start_node.f = 0
-    end_node = Node(None, end)
-    end_node.g = end_node.h = end_node.f = 0
-
-    # Initialize both open and closed list
-    open_list = []
-    closed_list = []
-
-    # Heapify the open_list and Add the start node
-    heapq.heapify(open_list)
-    heapq.heappush(open_list, start_node)
+    # Cells are addressed by their flat index (row * cols + col)
+    if isinstance(maze, Maze):
+        rows, cols = maze.rows, maze.cols
+        walkable, opened, blocked = maze.get_walkable()
+    else:
+        rows, cols = len(maze), len(maze[0])
+        walkable, opened, blocked = [cell == 0 for row in maze for cell in row], frozenset(), frozenset()
+    size = rows * cols
+
+    start_index = (start[0] % rows) * cols + start[1] % cols
+    end_row, end_col = end[0] % rows, end[1] % cols
+    end_index = end_row * cols + end_col
+
+    # Closed set (visited bitmap), best known g value and parent of every cell
+    closed = bytearray(size)
+    best_g = [math.inf] * size
+    parents = [-1] * size
+    best_g[start_index] = 0
+
+    # The open list is a heap of (f, h, g, index) tuples, outdated entries are skipped when popped
+    open_list = [(0, 0, 0, start_index)]
 
     # Adding a stop condition
     outer_iterations = 0
-    max_iterations = len(maze[0]) * len(maze) // 2
+    max_iterations = size // 2
 
     # what squares do we search
     adjacent_squares = (
@@ -77,95 +93,65 @@ def astar(
             (1, 1),
         )
 
+    current_index = start_index
+
     # Loop until you find the end
-    while len(open_list) > 0:
-        outer_iterations += 1
+    while open_list:
+        _, _, g, index = heapq.heappop(open_list)
+        if closed[index] or g > best_g[index]:
+            continue  # outdated heap entry
 
+        outer_iterations += 1
         if outer_iterations > max_iterations:
             # if we hit this point return the path such as it is
             # it will not contain the destination
             warn("giving up on pathfinding too many iterations")
-            return return_path(current_node)  # pylint: disable = used-before-assignment
+            PROFILER.count("astar expansions", outer_iterations - 1)
+            return return_path(parents, current_index, cols)
 
         # Get the current node
-        current_node = heapq.heappop(open_list)
-        closed_list.append(current_node)
+        current_index = index
+        closed[index] = 1
 
         # Found the goal
-        if current_node == end_node:
-            return return_path(current_node)
-
-        # Generate children
-        children = []
-
-        for new_position in adjacent_squares:  # Adjacent squares
-            # Get node position
-            node_position = (
-                (current_node.position[0] + new_position[0]) % len(maze),
-                (current_node.position[1] + new_position[1]) % len(maze[0]),
-            )
-
-            # Make sure within range
-            # if node_position[0] > (len(maze) - 1) or node_position[0] < 0 or node_position[1] > (
-            #         len(maze[len(maze) - 1]) - 1) or node_position[1] < 0:
-            #     continue
-
-            # Make sure walkable terrain
-            if maze[node_position[0]][node_position[1]] != 0:
+        if index == end_index:
+            PROFILER.count("astar expansions", outer_iterations)
+            return return_path(parents, index, cols)
+
+        row, col = divmod(index, cols)
+        child_g = g + 1
+        for d_row, d_col in adjacent_squares:  # Adjacent squares
+            child_row, child_col = (row + d_row) % rows, (col + d_col) % cols
+            child = child_row * cols + child_col
+
+            # Make sure walkable terrain, not closed yet and not already reached on a shorter path
+            if closed[child] or child_g >= best_g[child]:
                 continue
-
-            # Create new node
-            new_node = Node(current_node, node_position)
-
-            # Append
-            children.append(new_node)
-
-        # Loop through children
-        for child in children:
-            # Child is on the closed list
-            if len([closed_child for closed_child in closed_list if closed_child == child]) > 0:
+            if not (walkable[child] or child in opened) or child in blocked:
                 continue
+            best_g[child] = child_g
+            parents[child] = index
 
-            # Create the f, g, and h values
-            child.g = current_node.g + 1
-            # child.h = ((child.position[0] - end_node.position[0]) ** 2) + \
-            #           ((child.position[1] - end_node.position[1]) ** 2)
-            dx = child.position[0] - end_node.position[0]
-            dx = min(abs(dx), abs(len(maze[0]) + dx), abs(len(maze[0]) - dx))
-            dy = child.position[1] - end_node.position[1]
-            dy = min(abs(dy), abs(len(maze) + dy), abs(len(maze) - dy))
-            child.h = abs(dx) + abs(dy)
-            # child.h = dx**2 + dy **2
-            child.f = child.g + child.h
-
-            # Child is already in the open list
-            if (
-                len(
-                    [
-                        open_node
-                        for open_node in open_list
-                        if child.position == open_node.position and child.g > open_node.g
-                    ]
-                )
-                > 0
-            ):
-                continue
+            # Manhattan distance (taking the wraparound at the borders into account)
+            dy = abs(child_row - end_row)
+            dx = abs(child_col - end_col)
+            h = min(dy, rows - dy) + min(dx, cols - dx)
 
             # Add the child to the open list
-            heapq.heappush(open_list, child)
+            heapq.heappush(open_list, (child_g + h, h, child_g, child))
 
     warn("Couldn't get a path to destination")
+    PROFILER.count("astar expansions", outer_iterations)
     return None
 
 
-def example(print_maze=True) -> None:
+def get_example_maze() -> list[list[int]]:
     """
-    Example of the A* algorithm
+    Returns the maze used by the example of the A* algorithm
 
-    :param print_maze: Whether to print the maze or not
-    :return: Nothing
+    :return: A list of lists, containing 0s and 1s, representing the maze
     """
-    maze = [
+    return [
         [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
         [1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1],
         [1, 0, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 0, 1],
@@ -190,6 +176,15 @@ def example(print_maze=True) -> None:
         [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
     ]
 
+
+def example(print_maze=True) -> None:
+    """
+    Example of the A* algorithm
+
+    :param print_maze: Whether to print the maze or not
+    :return: Nothing
+    """
+    maze = get_example_maze()
     start = (10, 18)  # (8, 9)
     end = (20, 1)  # (20, 17)
 
@@ -213,5 +208,23 @@ def example(print_maze=True) -> None:
     print(path)
 
 
+def benchmark(number: int = 1000, search: Callable = None) -> float:
+    """
+    Micro-benchmark of the A* algorithm on the maze of the example
+    (see benchmarks.astar_reference for a comparison with the original implementation)
+
+    :param number: The number of searches
+    :param search: The benchmarked search (by default, astar)
+    :return: The average duration of a search in microseconds
+    """
+    search = search or astar
+    maze = get_example_maze()
+    searches = [((10, 18), (20, 1)), ((1, 1), (20, 17)), ((4, 9), (16, 9))]
+
+    duration = timeit.timeit(lambda: [search(maze, start, end) for start, end in searches], number=number)
+    return duration / (number * len(searches)) * 1e6
+
+
 if __name__ == "__main__":
     example()
+    print(f"{benchmark():.1f} us per search")
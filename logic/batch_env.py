@@ -0,0 +1,317 @@
+"""
+This module contains a batched game engine, which advances many independent games at once with NumPy.
+"""
+import time
+from typing import Any
+
+import numpy as np
+
+from characters.enemy import get_maze, swap
+from level.grid import Grid
+from level.level_file import Level
+from logic.dot import PELLET
+from logic.env import N_ACTIONS, NOOP
+from logic.flow_field import get_neighbours
+from logic.game import FEAR_DURATION
+from logic.game_matrix import FEARED_GHOST, GHOST, PLAYER
+from logic.path_table import MAX_CELLS, get_path_table
+from logic.timer import TICKS_PER_SECOND
+
+CLYDE_RADIUS = 5.5  # cells
+
+# The number of ticks to cross a cell (the player moves 2 px per tick, ghosts 1 px and feared ghosts every other tick)
+PLAYER_TICKS = 10
+GHOST_TICKS = 20
+FEARED_GHOST_TICKS = 40
+
+
+class BatchEnv:
+    """
+    A class to represent N independent games, which are stored as arrays (struct of arrays) and stepped together.
+    The rules follow the game on the level of cells: characters move from cell to cell at the speed of the game,
+    the ghosts steer by the next-hop table of the maze (blinky, pinky, inky and clyde keep their targets) and feared
+    ghosts wander randomly. Finished games are reset automatically.
+    """
+
+    def __init__(self, n: int, frame_skip: int = 1, seed: int | None = None, level: Level | None = None) -> None:
+        """
+        Constructs a batch of games.
+
+        :param n: The number of games.
+        :param frame_skip: The number of game ticks for which every action is repeated.
+        :param seed: The seed of the random number generator of the batch.
+        :param level: The level of the games (the default level if it is not given).
+        """
+        self.n = n
+        self.frame_skip = frame_skip
+
+        grid = Grid(level=level)
+        level = grid.level
+        self.rows, self.cols = level.shape
+        size = self.rows * self.cols
+        if size > MAX_CELLS:
+            raise ValueError(f"The level has {size} cells, but the next-hop table supports at most {MAX_CELLS} cells.")
+        self._table = get_path_table(get_maze(grid, swap(*level.door)))  # with an open ghost house
+        self._walls = np.array(grid.walls, dtype=np.uint8).ravel()
+        self._walkable = self._walls == 0
+        self._in_house = np.zeros(size, dtype=bool)
+        self._in_house[[r * self.cols + c for r, c in level.ghost_house]] = True
+        self._ghost_walkable = self._walkable | self._in_house
+        # The neighbours of every cell in the order of the directions (up, right, down, left)
+        self._neighbours = np.array(get_neighbours(self.rows, self.cols))[:, [2, 1, 3, 0]]
+        self._dots_template = grid.init_dots().cells.ravel()
+
+        # The closest walkable cell of every cell (a target of inky can be inside a wall)
+        coordinates = np.stack(np.divmod(np.arange(size), self.cols), axis=1)
+        walkable_cells = np.flatnonzero(self._walkable)
+        distances = ((coordinates[:, None, :] - coordinates[None, walkable_cells, :]) ** 2).sum(axis=2)
+        self._closest_walkable = walkable_cells[distances.argmin(axis=1)]
+
+        self._start = level.player_start[0] * self.cols + level.player_start[1]
+        self._homes = np.array([r * self.cols + c for r, c in level.ghost_starts.values()])
+        self._corner = level.corner[0] * self.cols + level.corner[1]
+        self._rows_index = np.arange(n)
+
+        # Game state
+        self.dots = np.zeros((n, size), dtype=np.uint8)
+        self.player_cell = np.zeros(n, dtype=np.int64)
+        self.player_dir = np.zeros(n, dtype=np.int64)
+        self.player_next = np.zeros(n, dtype=np.int64)  # the requested direction
+        self.player_wait = np.zeros(n, dtype=np.int64)  # ticks until the next cell is reached
+        self.ghost_cell = np.zeros((n, 4), dtype=np.int64)
+        self.ghost_wait = np.zeros((n, 4), dtype=np.int64)
+        self.ghost_eaten = np.zeros((n, 4), dtype=bool)
+        self.release = np.zeros((n, 4), dtype=np.int64)  # release tick of every ghost
+        self.fear = np.zeros(n, dtype=np.int64)  # remaining ticks of fear
+        self.lives = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.won = np.zeros(n, dtype=bool)
+
+        self._rng = np.random.default_rng(seed)
+
+    def reset(self, seed: int | None = None) -> np.ndarray:
+        """
+        Starts new games in all slots of the batch.
+
+        :param seed: The seed of the random number generator (equal seeds and actions lead to equal games).
+        :return: The observations of all games.
+        """
+        if seed is not None:
+            self._rng = np.random.default_rng(seed)
+        self._reset_games(np.ones(self.n, dtype=bool))
+        return self.get_observations()
+
+    def _reset_games(self, mask: np.ndarray) -> None:
+        """
+        Starts new games in the selected slots.
+
+        :param mask: The selected games.
+        :return: Nothing.
+        """
+        self.dots[mask] = self._dots_template
+        self.lives[mask] = 3
+        self.score[mask] = 0
+        self.ticks[mask] = 0
+        self.fear[mask] = 0
+        self.done[mask] = False
+        self.won[mask] = False
+        self._reset_positions(mask)
+
+    def _reset_positions(self, mask: np.ndarray) -> None:
+        """
+        Places the characters of the selected games at their start positions (at the beginning of a life).
+
+        :param mask: The selected games.
+        :return: Nothing.
+        """
+        count = int(mask.sum())
+        self.player_cell[mask] = self._start
+        self.player_dir[mask] = -1
+        self.player_next[mask] = -1
+        self.player_wait[mask] = 0
+        self.ghost_cell[mask] = self._homes
+        self.ghost_wait[mask] = 0
+        self.ghost_eaten[mask] = False
+        self.fear[mask] = 0
+        # Every ghost is released after a distinct random number of seconds (0 to 9)
+        seconds = np.sort(self._rng.random((count, 10)).argsort(axis=1)[:, :4], axis=1)
+        self.release[mask] = self.ticks[mask, None] + seconds * TICKS_PER_SECOND
+
+    def _get_targets(self) -> np.ndarray:
+        """
+        Gets the target cell of every ghost (blinky: the player, pinky: two cells in front of the player, inky: the
+        player mirrored at blinky, clyde: the player or his corner if he is close to the player).
+
+        :return: The flat indexes of the targets.
+        """
+        player = self.player_cell
+        direction = np.maximum(self.player_dir, 0)
+        moving = self.player_dir >= 0
+
+        # Pinky
+        front = player
+        for _ in range(2):
+            ahead = self._neighbours[front, direction]
+            front = np.where(moving & self._walkable[ahead], ahead, front)
+
+        # Inky
+        player_row, player_col = np.divmod(player, self.cols)
+        blinky_row, blinky_col = np.divmod(self.ghost_cell[:, 0], self.cols)
+        inky_row = np.clip(2 * player_row - blinky_row, 0, self.rows - 1)
+        inky_col = np.clip(2 * player_col - blinky_col, 0, self.cols - 1)
+        inky = self._closest_walkable[inky_row * self.cols + inky_col]
+
+        # Clyde
+        clyde_row, clyde_col = np.divmod(self.ghost_cell[:, 3], self.cols)
+        close = (clyde_row - player_row) ** 2 + (clyde_col - player_col) ** 2 <= CLYDE_RADIUS**2
+        clyde = np.where(close, self._corner, player)
+
+        return np.stack([player, front, inky, clyde], axis=1)
+
+    def _tick(self, direction: np.ndarray) -> np.ndarray:
+        """
+        Advances all running games by a single tick.
+
+        :param direction: The requested direction of every game (-1 if no direction is requested).
+        :return: The reward (gain in score) of every game.
+        """
+        alive = ~self.done
+        rows = self._rows_index
+        score = self.score.copy()
+        self.ticks += alive
+        self.fear = np.where(alive, np.maximum(self.fear - 1, 0), self.fear)
+        self.ghost_eaten &= (self.fear > 0)[:, None]
+
+        # Move player (a requested direction is taken as soon as the next cell in that direction is free)
+        self.player_next = np.where(direction >= 0, direction, self.player_next)
+        at_cell = alive & (self.player_wait == 0)
+        neighbours = self._neighbours[self.player_cell]
+        turn = at_cell & (self.player_next >= 0)
+        turn &= self._walkable[neighbours[rows, np.maximum(self.player_next, 0)]]
+        self.player_dir = np.where(turn, self.player_next, self.player_dir)
+        self.player_next = np.where(turn, -1, self.player_next)
+        ahead = neighbours[rows, np.maximum(self.player_dir, 0)]
+        move = at_cell & (self.player_dir >= 0) & self._walkable[ahead]
+        previous_player = self.player_cell
+        self.player_cell = np.where(move, ahead, self.player_cell)
+        self.player_wait = np.where(move, PLAYER_TICKS - 1, np.maximum(self.player_wait - alive, 0))
+
+        # Eat dot
+        value = self.dots[rows, self.player_cell]
+        eat = move & (value > 0)
+        self.dots[rows[eat], self.player_cell[eat]] = 0
+        self.score += 100 * eat
+        self.fear = np.where(eat & (value == PELLET), FEAR_DURATION, self.fear)
+        feared = (self.fear > 0)[:, None]
+
+        # Move ghosts
+        released = self.ticks[:, None] > self.release
+        at_cell = alive[:, None] & released & (self.ghost_wait == 0) & ~self.ghost_eaten
+        chase = self._table.get_next_indexes(self.ghost_cell, self._get_targets())
+
+        ghost_neighbours = self._neighbours[self.ghost_cell]
+        allowed = self._ghost_walkable[ghost_neighbours]
+        allowed &= self._walkable[ghost_neighbours] | self._in_house[self.ghost_cell][..., None]
+        choice = np.where(allowed, self._rng.random(ghost_neighbours.shape), -1.0).argmax(axis=2)
+        wander = np.take_along_axis(ghost_neighbours, choice[..., None], axis=2)[..., 0]
+
+        target = np.where(feared, wander, chase)
+        move = at_cell & (target >= 0) & (target != self.ghost_cell)
+        previous_ghost = self.ghost_cell
+        self.ghost_cell = np.where(move, target, self.ghost_cell)
+        speed = np.where(feared, FEARED_GHOST_TICKS, GHOST_TICKS)
+        self.ghost_wait = np.where(move, speed - 1, np.maximum(self.ghost_wait - alive[:, None], 0))
+
+        # Collision (on the same cell or when crossing each other)
+        player = self.player_cell[:, None]
+        hit = (self.ghost_cell == player) | ((self.ghost_cell == previous_player[:, None]) & (previous_ghost == player))
+        hit &= alive[:, None] & released & ~self.ghost_eaten
+        eaten = hit & feared
+        self.ghost_eaten |= eaten
+        self.ghost_cell = np.where(eaten, self._homes, self.ghost_cell)
+        self.ghost_wait = np.where(eaten, 0, self.ghost_wait)
+        self.score += 100 * eaten.sum(axis=1)
+
+        caught = (hit & ~feared).any(axis=1)
+        self.lives -= caught
+        self.done |= caught & (self.lives == 0)
+        if caught.any():
+            self._reset_positions(caught & (self.lives > 0))
+
+        # Game over when all dots are eaten (with a bonus for a fast win)
+        won = alive & ~self.done & ~self.dots.any(axis=1)
+        seconds = self.ticks // TICKS_PER_SECOND
+        bonus = np.where(seconds < 30, 1100, np.where(seconds < 150, (120 - (seconds - 30)) * 5 + 500, 500))
+        self.score += won * bonus
+        self.won |= won
+        self.done |= won
+
+        rewards = self.score - score  # type: np.ndarray
+        return rewards
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        """
+        Applies an action to every game for the next frame_skip ticks. Finished games are reset afterwards.
+
+        :param actions: The action of every game (0: up, 1: right, 2: down, 3: left or NOOP).
+        :return: The observations, the rewards, whether the games have ended and the final score, number of ticks and
+                 outcome of every game (only valid for the ended games).
+        """
+        actions = np.asarray(actions)
+        direction = np.where(actions == NOOP, -1, actions)
+        rewards = np.zeros(self.n, dtype=np.int64)
+        for _ in range(self.frame_skip):
+            rewards += self._tick(direction)
+
+        dones = self.done.copy()
+        info = {"score": self.score.copy(), "ticks": self.ticks.copy(), "won": self.won.copy()}
+        if dones.any():
+            self._reset_games(dones)
+        return self.get_observations(), rewards, dones, info
+
+    def get_observations(self) -> np.ndarray:
+        """
+        Gets the game matrices of all games (with the encoding of the matrix window).
+
+        :return: An array of shape (n, rows, columns).
+        """
+        observations = self._walls + self.dots + (self.dots > 0)  # walls: 1, dots: 2, pellets: 3
+        observations[self._rows_index, self.player_cell] = PLAYER
+        ghosts = np.where((self.fear > 0)[:, None] & ~self.ghost_eaten, FEARED_GHOST, GHOST)
+        observations[self._rows_index[:, None], self.ghost_cell] = ghosts
+        return observations.reshape(self.n, self.rows, self.cols)
+
+
+if __name__ == "__main__":
+    # Play until the first games end: they are reset, while the other games of the batch play on
+    env = BatchEnv(64, frame_skip=4)
+    env.reset(seed=0)
+    rng = np.random.default_rng(0)
+    initial_dots = Grid().init_dots().cells.ravel()
+    ended = np.zeros(env.n, dtype=bool)
+    while not ended.any():
+        previous_ticks, previous_lives, previous_dots = env.ticks.copy(), env.lives.copy(), env.dots.copy()
+        _, _, ended, final = env.step(rng.integers(N_ACTIONS, size=env.n))
+    playing = ~ended
+    assert not env.done.any()
+    assert (env.ticks[ended] == 0).all() and (env.lives[ended] == 3).all() and (env.score[ended] == 0).all()
+    assert (env.dots[ended] == initial_dots).all()
+    assert (env.ticks[playing] == previous_ticks[playing] + env.frame_skip).all()
+    assert (env.lives[playing] <= previous_lives[playing]).all() and (env.dots[playing] <= previous_dots[playing]).all()
+    print(f"{int(ended.sum())} of {env.n} games ended after {final['ticks'][ended].max()} ticks and were reset")
+
+    for batch_size in (1, 100, 1000, 4000):
+        env = BatchEnv(batch_size)
+        env.reset(seed=0)
+        rng = np.random.default_rng(0)
+        random_actions = rng.integers(N_ACTIONS, size=(50, batch_size))
+        start_time = time.perf_counter()
+        games = 0
+        for step_actions in random_actions:
+            ended = env.step(step_actions)[2]
+            games += int(ended.sum())
+        elapsed = time.perf_counter() - start_time
+        rate = len(random_actions) * batch_size / elapsed
+        print(f"{batch_size:5d} games: {rate:10.0f} ticks per second ({games} finished)")
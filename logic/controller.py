@@ -0,0 +1,105 @@
+"""
+This module contains the controllers, which provide the input (i.e. the requested direction) of the player.
+"""
+import random
+
+import pygame
+from pygame.locals import K_DOWN, K_LEFT, K_RIGHT, K_UP
+
+
+class Controller:
+    """
+    A base class to represent an input source of the player. It never requests a new direction.
+    """
+
+    def get_direction(self) -> int:
+        """
+        Gets the direction requested for the next step of the game.
+
+        :return: The requested direction (0: up, 1: right, 2: down, 3: left) or -1 if no direction is requested.
+        """
+        return -1
+
+
+class KeyboardController(Controller):
+    """
+    A class to represent a controller reading the arrow keys of the keyboard.
+    """
+
+    def get_direction(self) -> int:
+        """
+        Gets the direction of the currently pressed arrow key.
+
+        :return: The requested direction or -1 if no arrow key is pressed.
+        """
+        pressed_keys = pygame.key.get_pressed()
+        direction = -1
+        if pressed_keys[K_LEFT]:
+            direction = 3
+        if pressed_keys[K_RIGHT]:
+            direction = 1
+        if pressed_keys[K_UP]:
+            direction = 0
+        if pressed_keys[K_DOWN]:
+            direction = 2
+        return direction
+
+
+class RandomController(Controller):
+    """
+    A class to represent a controller requesting a random direction every few steps.
+    """
+
+    def __init__(self, interval: int = 30, seed: int | None = None) -> None:
+        """
+        Constructs a random controller.
+
+        :param interval: The number of steps between two direction changes.
+        :param seed: The seed of the random number generator.
+        """
+        self.interval = interval
+        self._random = random.Random(seed)
+        self._steps = 0
+        self._direction = -1
+
+    def get_direction(self) -> int:
+        """
+        Gets the current random direction.
+
+        :return: The requested direction.
+        """
+        if self._steps % self.interval == 0:
+            self._direction = self._random.randint(0, 3)
+        self._steps += 1
+        return self._direction
+
+
+class ScriptedController(Controller):
+    """
+    A class to represent a controller replaying a fixed sequence of directions.
+    """
+
+    def __init__(self, directions: list[int], repeat: bool = True) -> None:
+        """
+        Constructs a scripted controller.
+
+        :param directions: The requested direction of every step.
+        :param repeat: Whether to start again from the beginning at the end of the sequence.
+        """
+        self.directions = directions
+        self.repeat = repeat
+        self._steps = 0
+
+    def get_direction(self) -> int:
+        """
+        Gets the direction of the current step.
+
+        :return: The requested direction or -1 at the end of a non-repeating sequence.
+        """
+        if self._steps >= len(self.directions):
+            if not self.repeat or not self.directions:
+                return -1
+            self._steps = 0
+        direction = self.directions[self._steps]
+        self._steps += 1
+        return direction
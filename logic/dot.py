@@ -1,28 +1,100 @@
 """
-This module contains an implementation of a dot object.
+This module contains an implementation of the dot layer (the dots and pellets of a level).
 """
+from collections.abc import Iterator
+from functools import lru_cache
+
+import numpy as np
 import pygame
 
+# The values of the dot layer
+EMPTY = 0
+DOT = 1
+PELLET = 2
+
+
+@lru_cache(maxsize=2)
+def get_dot_surface(is_pellet: bool = False) -> pygame.Surface:
+    """
+    Gets the (shared) surface of a dot, which is stamped onto the background of the level.
+
+    :param is_pellet: Whether the dot is a pellet (large dot) or not.
+    :return: The surface of the dot.
+    """
+    surf = pygame.Surface((30, 30))
+    surf.fill((0, 0, 0))
+    surf.set_colorkey((0, 0, 0))
+    radius = 2 if not is_pellet else 5
+    pygame.draw.circle(surf, (255, 255, 255), (30 // 2, 30 // 2), radius)
+    return surf
+
+
+def get_dot_rect(cell: tuple[int, int]) -> pygame.Rect:
+    """
+    Gets the rectangle of the dot surface of a cell.
+
+    :param cell: The (column, row) index of the cell.
+    :return: The rectangle.
+    """
+    i, j = cell
+    return get_dot_surface().get_rect(center=(i * 20 + 10 + 1.5, j * 20 + 10 + 1.5))
+
 
-class Dot(pygame.sprite.Sprite):
+class DotLayer:
     """
-    A class to represent a dot.
+    A class to represent the remaining dots of a level as a single array (one value per cell).
     """
 
-    def __init__(self, x: int, y: int, is_pellet: bool = False):
+    def __init__(self, layout: np.ndarray) -> None:
+        """
+        Constructs a dot layer with the initial dots of a level.
+
+        :param layout: The initial value (EMPTY, DOT or PELLET) of every cell.
+        """
+        self.cells = np.array(layout, dtype=np.uint8)
+        self.total = int(np.count_nonzero(self.cells))  # the initial number of dots (and pellets)
+
+    def __len__(self) -> int:
         """
-        Constructs a dot object.
+        Counts the remaining dots (and pellets).
 
-        :param x: The horizontal position.
-        :param y: The vertical position.
-        :param is_pellet: Whether the dot is a pellet (large dot) or not.
+        :return: The number of remaining dots.
         """
-        super().__init__()
-        self.surf = pygame.Surface((30, 30))
-        self.surf.fill((0, 0, 0))
-        self.surf.set_colorkey((0, 0, 0))
-        radius = 2 if not is_pellet else 5
-        pygame.draw.circle(self.surf, (255, 255, 255), (30 // 2, 30 // 2), radius)
-        self.rect = self.surf.get_rect(center=(x + 1.5, y + 1.5))
+        return int(np.count_nonzero(self.cells))
 
-        self.is_pellet = is_pellet
+    def __contains__(self, cell: tuple[int, int]) -> bool:
+        """
+        Checks whether there is a dot on the given cell.
+
+        :param cell: The (column, row) index of the cell.
+        :return: True if the cell has a dot (or pellet), False otherwise.
+        """
+        return bool(self.cells[cell[1], cell[0]])
+
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        """
+        Iterates over the cells of the remaining dots.
+
+        :return: An iterator of (column, row) indexes.
+        """
+        return ((int(i), int(j)) for j, i in np.argwhere(self.cells))
+
+    def is_pellet(self, cell: tuple[int, int]) -> bool:
+        """
+        Checks whether there is a pellet on the given cell.
+
+        :param cell: The (column, row) index of the cell.
+        :return: True if the cell has a pellet, False otherwise.
+        """
+        return bool(self.cells[cell[1], cell[0]] == PELLET)
+
+    def eat(self, cell: tuple[int, int]) -> int:
+        """
+        Removes the dot of the given cell.
+
+        :param cell: The (column, row) index of the cell.
+        :return: The value of the removed dot (EMPTY, DOT or PELLET).
+        """
+        value = int(self.cells[cell[1], cell[0]])
+        self.cells[cell[1], cell[0]] = EMPTY
+        return value
@@ -0,0 +1,106 @@
+"""
+This module contains a gym-style reinforcement learning environment around the game logic (without any window).
+"""
+import time
+from typing import Any
+
+import numpy as np
+
+from level.menu import update_score
+from logic.game import Game
+
+# The actions of an agent: the four directions (up, right, down, left) and keeping the current direction
+N_ACTIONS = 5
+NOOP = 4
+
+
+class PacmanEnv:
+    """
+    A class to represent the game as an environment with a reset()/step(action) interface.
+    The observation is the game matrix (the encoding of the matrix window) and the reward is the gain in score.
+    """
+
+    def __init__(self, frame_skip: int = 4, max_steps: int | None = None) -> None:
+        """
+        Constructs an environment object.
+
+        :param frame_skip: The number of game ticks for which every action is repeated.
+        :param max_steps: The maximum number of steps of an episode before it is truncated (None for no limit).
+        """
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.game = None  # type: Game | None
+        self._steps = 0
+
+    def _get_info(self, state: str) -> dict[str, Any]:
+        """
+        Gets additional information about the current game.
+
+        :param state: The state of the game after the last tick.
+        :return: The state, lives, score and number of remaining dots.
+        """
+        assert self.game is not None
+        return {
+            "state": state,
+            "lives": self.game.params["lives"],
+            "score": self.game.params["score"],
+            "dots": len(self.game.params["dots"]),
+        }
+
+    def reset(self, seed: int | None = None) -> tuple[np.ndarray, dict[str, Any]]:
+        """
+        Starts a new game.
+
+        :param seed: The seed of the game (equal seeds and actions lead to equal episodes).
+        :return: The first observation and additional information.
+        """
+        self.game = Game(seed=seed)
+        self._steps = 0
+        return self.game.matrix.data.copy(), self._get_info("playing")
+
+    def step(self, action: int) -> tuple[np.ndarray, float, bool, bool, dict[str, Any]]:
+        """
+        Applies an action for the next frame_skip game ticks.
+
+        :param action: The requested direction (0: up, 1: right, 2: down, 3: left) or NOOP.
+        :return: The observation, the reward, whether the game has ended, whether the episode has been truncated and
+                 additional information.
+        """
+        if self.game is None:
+            raise RuntimeError("The environment has to be reset before the first step.")
+
+        direction = -1 if action == NOOP else int(action)
+        reward = 0.0
+        state = "playing"
+        for _ in range(self.frame_skip):
+            score = self.game.params["score"]
+            state = self.game.step(direction)
+            if state == "won":
+                self.game.params["score"] = update_score(score, self.game.params["timer"])  # time bonus
+            reward += self.game.params["score"] - score
+
+            if state == "life_lost":
+                self.game.new_life()
+            elif state != "playing":
+                break
+
+        self._steps += 1
+        terminated = state in ("won", "game_over")
+        truncated = not terminated and self.max_steps is not None and self._steps >= self.max_steps
+        return self.game.matrix.data.copy(), reward, terminated, truncated, self._get_info(state)
+
+
+if __name__ == "__main__":
+    env = PacmanEnv()
+    rng = np.random.default_rng(0)
+    steps = 0
+    start_time = time.perf_counter()
+    for episode in range(5):
+        observation, info = env.reset(seed=episode)
+        done = False
+        while not done:
+            observation, _, is_terminated, is_truncated, info = env.step(int(rng.integers(N_ACTIONS)))
+            done = is_terminated or is_truncated
+            steps += 1
+        print(info)
+    print(f"{steps / (time.perf_counter() - start_time):.0f} steps per second")
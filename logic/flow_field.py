@@ -0,0 +1,136 @@
+"""
+This module contains a breadth-first search distance field ("flow field") towards a single target cell.
+"""
+from collections import deque
+from functools import lru_cache
+
+from logic.maze import Maze
+from logic.path_table import ADJACENT_SQUARES
+
+
+@lru_cache(maxsize=4)
+def get_neighbours(rows: int, cols: int) -> list[list[int]]:
+    """
+    Gets the flat indexes of the (wrapped) neighbours of every cell of a maze with the given dimensions.
+
+    :param rows: The number of rows.
+    :param cols: The number of columns.
+    :return: The neighbours of every cell (in the same order as used by the path table).
+    """
+    return [
+        [((index // cols + dy) % rows) * cols + (index % cols + dx) % cols for dy, dx in ADJACENT_SQUARES]
+        for index in range(rows * cols)
+    ]
+
+
+class FlowField:
+    """
+    A class to represent the distances of all cells of a maze to a single target cell.
+    Any number of enemies can descend the field towards the target without searching on their own.
+    """
+
+    def __init__(self, maze: Maze, target: tuple[int, int]) -> None:
+        """
+        Constructs a flow field by running a single (wrap-aware) breadth-first search from the target.
+
+        :param maze: The maze (including its overlay).
+        :param target: The target position (row, column).
+        """
+        self.maze = maze
+        self.target = (target[0] % maze.rows, target[1] % maze.cols)
+        rows, cols = maze.rows, maze.cols
+        walkable, opened, blocked = maze.get_walkable()
+
+        size = rows * cols
+        self._neighbours = get_neighbours(rows, cols)
+        self._expanded = [(walkable[index] or index in opened) and index not in blocked for index in range(size)]
+
+        target_index = self.target[0] * cols + self.target[1]
+        self._distance = [-1] * size
+        self._distance[target_index] = 0
+        if not self._expanded[target_index]:
+            return
+
+        queue = deque([target_index])
+        while queue:
+            index = queue.popleft()
+            distance = self._distance[index] + 1
+            for neighbour in self._neighbours[index]:
+                if self._distance[neighbour] == -1:
+                    self._distance[neighbour] = distance
+                    # Walls are only reached as a start, but never expanded
+                    if self._expanded[neighbour]:
+                        queue.append(neighbour)
+
+    def get_distance(self, start: tuple[int, int]) -> int:
+        """
+        Gets the length of the shortest path from the given cell to the target.
+
+        :param start: The start position (row, column).
+        :return: The number of steps, or -1 if the target is not reachable.
+        """
+        return self._distance[(start[0] % self.maze.rows) * self.maze.cols + start[1] % self.maze.cols]
+
+    def _descend(self, index: int) -> int:
+        """
+        Gets the first neighbour of a cell which is one step closer to the target.
+
+        :param index: The flat index of the cell.
+        :return: The flat index of the neighbour.
+        """
+        distance = self._distance[index] - 1
+        for neighbour in self._neighbours[index]:
+            if self._distance[neighbour] == distance and self._expanded[neighbour]:
+                return neighbour
+        raise ValueError(f"Cell {divmod(index, self.maze.cols)} is not connected to the target.")
+
+    def get_next_cell(self, start: tuple[int, int]) -> tuple[int, int] | None:
+        """
+        Gets the next cell on a shortest path from the given cell towards the target.
+
+        :param start: The start position (row, column).
+        :return: The next cell, the start itself if it is the target, or None if the target is not reachable.
+        """
+        index = (start[0] % self.maze.rows) * self.maze.cols + start[1] % self.maze.cols
+        if self._distance[index] <= 0:
+            return start if self._distance[index] == 0 else None
+        return divmod(self._descend(index), self.maze.cols)
+
+    def get_path(self, start: tuple[int, int]) -> list[tuple[int, int]] | None:
+        """
+        Returns a list of tuples as a shortest path from the given cell to the target (both included).
+
+        :param start: The start position (row, column).
+        :return: The path, or None if the target is not reachable.
+        """
+        index = (start[0] % self.maze.rows) * self.maze.cols + start[1] % self.maze.cols
+        if self._distance[index] < 0:
+            return None
+
+        path = [start]
+        while self._distance[index] > 0:
+            index = self._descend(index)
+            path.append(divmod(index, self.maze.cols))
+        return path
+
+
+# The most recent flow field of every maze (overlay)
+_flow_fields = {}  # type: dict[Maze, FlowField]
+
+
+def get_flow_field(maze: Maze, target: tuple[int, int]) -> FlowField:
+    """
+    Gets the shared flow field of the given maze towards the target.
+    The field is only recomputed when the target has changed (e.g. the player entered another cell).
+
+    :param maze: The maze (including its overlay).
+    :param target: The target position (row, column).
+    :return: The flow field.
+    """
+    flow_field = _flow_fields.get(maze)
+    if flow_field is None or flow_field.target != (target[0] % maze.rows, target[1] % maze.cols):
+        if len(_flow_fields) >= 8:
+            _flow_fields.clear()
+        flow_field = FlowField(maze, target)
+        _flow_fields[maze] = flow_field
+    return flow_field
@@ -0,0 +1,355 @@
+"""
+This module contains the game logic (player movement, ghost AI, dots, timers and scoring),
+which is independent of rendering and user input. It can be stepped headless, without a display.
+"""
+import random
+import time
+from typing import Any
+
+import numpy as np
+
+from characters.enemy import Enemy, get_maze, swap
+from characters.player import Player
+from level.grid import Grid
+from level.level_file import Level, load_level
+from logic import game_state, timer
+from logic.controller import Controller, RandomController
+from logic.game_matrix import FEARED_GHOST, GHOST, PLAYER, GameMatrix
+from logic.game_state import ENEMY_NAMES, PATTERNS, GameState
+from logic.path_table import MAX_CELLS, get_path_table
+from logic.profiler import PROFILER
+
+SPEED = 2  # The game breaks if the speed is not an integer.
+FEAR_DURATION = 5 * timer.TICKS_PER_SECOND  # ticks
+GHOST_COLOURS = {"blinky": (255, 0, 0), "pinky": (255, 105, 180), "inky": (0, 255, 255), "clyde": (250, 185, 85)}
+
+
+def get_move_pattern(enemy: str, is_feared: bool) -> str:
+    """
+    Returns the string name of the enemy if the enemy is not feared. Otherwise, 'feared' will be returned
+
+    :param enemy: The name of the enemy.
+    :param is_feared: Whether the enemy is currently feared or not.
+    :return: The name of the enemy or 'feared'.
+    """
+    return enemy if not is_feared else "feared"
+
+
+def new_params(level: Level | None = None) -> dict[str, Any]:
+    """
+    Creates the parameters of a new game.
+
+    :param level: The level of the game (the default level if it is not given).
+    :return: A dictionary of game parameters.
+    """
+    level = level if level is not None else load_level()
+    return {
+        "level": level,
+        "width": level.cols * 20,
+        "height": level.rows * 20,
+        "speed": SPEED,
+        "lives": 3,
+        "score": 0,
+        "timer": -1,
+    }
+
+
+class Game:
+    """
+    A class to represent the state of a game.
+    The parameters (lives, score, remaining dots and the game timer) are carried over to the next life.
+    """
+
+    def __init__(
+        self, params: dict[str, Any] | None = None, seed: int | None = None, patterns: dict[str, str] | None = None
+    ) -> None:
+        """
+        Constructs a game object.
+
+        :param params: A dictionary of game parameters (a new game is started if it is empty).
+        :param seed: The seed of the random number generator of a new game (the next lives continue its sequence).
+        :param patterns: The move pattern of every ghost of a new game (by default, every ghost uses its own pattern).
+        """
+        self.params = params if params else new_params()
+        if "rng" not in self.params.keys():
+            self.params["rng"] = random.Random(seed)
+        self.rng = self.params["rng"]  # type: random.Random
+        if "patterns" not in self.params.keys():
+            self.params["patterns"] = patterns if patterns else {}
+        self.patterns = self.params["patterns"]  # type: dict[str, str]
+
+        # Initialise Map
+        self.grid = Grid(self.rng, self.params["level"])
+        if "dots" not in self.params.keys():
+            self.params["dots"] = self.grid.init_dots()
+            self.params["max_points"] = (self.params["dots"].total - 1) * 100
+
+        # Precompute the shortest paths of the maze (with a closed and an open ghost house), unless it is too large
+        if self.grid.rows * self.grid.cols <= MAX_CELLS:
+            get_path_table(self.grid.maze)
+            get_path_table(get_maze(self.grid, swap(*self.grid.level.door)))
+
+        # Create the player and the ghosts
+        self.player, self.enemies = self._create_characters()
+
+        # Initialise variables
+        self.next_move = False
+        self.direction = -1
+        self.fear_state = False
+        self.caught_by = None  # type: str | None
+        if self.params["timer"] == -1:
+            # All game rules are expressed in ticks of the game clock, which only advances when the game is stepped
+            self.params["clock"] = timer.TickClock()
+            self.params["timer"] = timer.Timer(self.params["clock"])
+            self.params["timer"].start()
+        self.clock = self.params["clock"]  # type: timer.TickClock
+        self.fear_timer = timer.Timer(self.clock)
+        self.release_times = self._draw_release_times()
+        self.release_timer = timer.Timer(self.clock)
+        self.release_timer.start()
+
+        # The game state matrix (walls, dots and characters)
+        self.matrix = GameMatrix(self.grid.walls, self.params["dots"])
+        self._dot_count = len(self.params["dots"])
+        self._update_matrix()
+
+    def _create_characters(self) -> tuple[Player, dict[str, Enemy]]:
+        """
+        Creates the player and the ghosts at their start positions.
+
+        :return: The player and a dictionary of ghosts.
+        """
+        level = self.grid.level
+        enemies = {
+            enemy_name: Enemy(col * 20 + 10, row * 20 + 10, enemy_name, GHOST_COLOURS[enemy_name], level.shape)
+            for enemy_name, (row, col) in level.ghost_starts.items()
+        }
+        return Player(level.player_start, level.shape), enemies
+
+    def _draw_release_times(self) -> dict[str, int]:
+        """
+        Draws the release time of every ghost (distinct random seconds between 0 and 9).
+
+        :return: The release tick of every ghost (relative to the start of the life).
+        """
+        return {
+            enemy_name: seconds * timer.TICKS_PER_SECOND
+            for enemy_name, seconds in zip(ENEMY_NAMES, sorted(self.rng.sample(range(0, 10), 4)))
+        }
+
+    def new_life(self) -> None:
+        """
+        Starts the next life. The characters and the timers of a life are reset, whereas the level (grid, dots and
+        game matrix) is kept.
+
+        :return: Nothing.
+        """
+        self.player, self.enemies = self._create_characters()
+        self.next_move = False
+        self.direction = -1
+        self.fear_state = False
+        self.caught_by = None
+        self.fear_timer = timer.Timer(self.clock)
+        self.release_times = self._draw_release_times()
+        self.release_timer = timer.Timer(self.clock)
+        self.release_timer.start()
+        self._update_matrix()
+
+    def _update_matrix(self) -> None:
+        """
+        Writes the current cells of the player and the ghosts into the game matrix.
+
+        :return: Nothing.
+        """
+        self.matrix.move_character("player", self.player.get_current_cell(), PLAYER)
+        for enemy_name, enemy in self.enemies.items():
+            value = FEARED_GHOST if self.fear_state and enemy.pos != enemy.home else GHOST
+            self.matrix.move_character(enemy_name, enemy.get_current_cell(), value)
+
+    def snapshot(self) -> GameState:
+        """
+        Saves the state of the game (including the parameters carried over to the next life), e.g. to seek in a replay.
+
+        :return: The game state.
+        """
+        enemies = [self.enemies[enemy_name].get_state() for enemy_name in ENEMY_NAMES]
+        values = [
+            self.clock.get_ticks(),
+            self.params["lives"],
+            self.params["score"],
+            self.next_move,
+            self.direction,
+            self.fear_state,
+            ENEMY_NAMES.index(self.caught_by) if self.caught_by else -1,
+            *self.params["timer"].get_state(),
+            *self.fear_timer.get_state(),
+            *self.release_timer.get_state(),
+            *self.player.get_state(),
+        ]
+        for enemy_name, (enemy_values, pattern, *_) in zip(ENEMY_NAMES, enemies):
+            values += [*enemy_values, self.release_times[enemy_name], PATTERNS.index(pattern)]
+
+        return GameState(
+            np.array(values, dtype=np.float64),
+            self.params["dots"].cells.copy(),
+            self.rng.getstate(),
+            tuple(enemy[2] for enemy in enemies),
+            tuple(enemy[3] for enemy in enemies),
+            tuple(enemy[4] for enemy in enemies),
+        )
+
+    def restore(self, state: GameState) -> None:
+        """
+        Restores a saved state of the game.
+
+        :param state: The game state returned by snapshot.
+        :return: Nothing.
+        """
+        values = state.values.tolist()
+        self.clock.set_ticks(int(values[game_state.TICKS]))
+        self.rng.setstate(state.rng)
+        self.params["lives"] = int(values[game_state.LIVES])
+        self.params["score"] = int(values[game_state.SCORE])
+        dots_changed = not np.array_equal(self.params["dots"].cells, state.dots)
+        if dots_changed:
+            self.params["dots"].cells[:] = state.dots  # in place (the renderer shares the dot layer)
+        self.next_move = bool(values[game_state.NEXT_MOVE])
+        self.direction = int(values[game_state.DIRECTION])
+        self.fear_state = bool(values[game_state.FEAR_STATE])
+        caught_by = int(values[game_state.CAUGHT_BY])
+        self.caught_by = ENEMY_NAMES[caught_by] if caught_by >= 0 else None
+
+        timers = values[game_state.TIMERS : game_state.PLAYER]
+        for index, game_timer in enumerate((self.params["timer"], self.fear_timer, self.release_timer)):
+            running, started, elapsed = timers[3 * index : 3 * index + 3]
+            game_timer.set_state((bool(running), started, elapsed))
+        self.player.set_state(values[game_state.PLAYER : game_state.ENEMIES], self.direction)  # type: ignore
+
+        for index, enemy_name in enumerate(ENEMY_NAMES):
+            offset = game_state.ENEMIES + index * game_state.ENEMY_SIZE
+            enemy_values = values[offset : offset + game_state.ENEMY_SIZE]
+            self.release_times[enemy_name] = int(enemy_values[6])
+            enemy_state = (
+                enemy_values[:6],
+                PATTERNS[int(enemy_values[7])],
+                state.paths[index],
+                state.cached_paths[index],
+                state.path_keys[index],
+            )
+            self.enemies[enemy_name].set_state(enemy_state, self.grid.maze)
+
+        if dots_changed:
+            self._dot_count = len(self.params["dots"])
+            self.matrix.set_dots(self.params["dots"])
+        self._update_matrix()
+
+    def step(self, direction: int = -1) -> str:
+        """
+        Advances the game by a single tick.
+
+        :param direction: The direction requested by the controller (-1 if no direction is requested).
+        :return: The state of the game: 'playing', 'won', 'life_lost' or 'game_over'.
+        """
+        self.clock.tick()
+
+        # Move player
+        with PROFILER.scope("player"):
+            i, j = self.player.get_current_cell()
+            self.next_move, self.direction, fear_state = self.player.move_player(
+                self.next_move, self.direction, self.grid, i, j, direction, self.params
+            )
+
+            if len(self.params["dots"]) < self._dot_count:  # a dot has been eaten
+                self._dot_count = len(self.params["dots"])
+                self.matrix.remove_dot(self.player.get_current_cell())
+
+        # Game over when all dots are eaten
+        if not self.params["dots"]:
+            return "won"
+
+        # Fear timer
+        if fear_state:
+            self.fear_timer.start()
+
+        if self.fear_timer.get_elapsed_ticks() > FEAR_DURATION:
+            self.fear_timer.stop()
+        if self.fear_timer.is_running():
+            fear_state = True
+        self.fear_state = fear_state
+
+        # Move ghosts
+        for enemy_name, enemy in self.enemies.items():
+            if self.release_timer.get_elapsed_ticks() > self.release_times[enemy_name]:
+                pattern = self.patterns.get(enemy_name, enemy_name)
+                position = self.enemies["blinky"].pos if pattern == "inky" else None
+                with PROFILER.scope(enemy_name):
+                    caught = enemy.move_enemy(
+                        self.grid,
+                        self.player,
+                        self.params,
+                        get_move_pattern(pattern, fear_state),
+                        position,  # type: ignore
+                    )
+                if caught:
+                    self.caught_by = enemy_name
+                    self.params["lives"] = self.params["lives"] - 1
+                    return "game_over" if self.params["lives"] == 0 else "life_lost"
+
+        with PROFILER.scope("matrix"):
+            self._update_matrix()
+
+        # Update score
+        self.params["score"] = (
+            self.params["max_points"]
+            - len(self.params["dots"]) * 100
+            + sum(enemy.score for enemy in self.enemies.values())
+        )
+        return "playing"
+
+
+def simulate(
+    controller: Controller,
+    params: dict[str, Any] | None = None,
+    max_steps: int = 100_000,
+    seed: int | None = None,
+    patterns: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """
+    Plays a whole game headless (without a display or an event pump) as fast as possible.
+
+    :param controller: The input source of the player.
+    :param params: A dictionary of game parameters (a new game is started if it is empty).
+    :param max_steps: The maximum number of ticks before the game is aborted.
+    :param seed: The seed of the random number generator of the game.
+    :param patterns: The move pattern of every ghost (by default, every ghost uses its own pattern).
+    :return: The result of the game, including the ghost which caught the player in every lost life.
+    """
+    game = Game(params, seed, patterns)
+    state = "playing"
+    steps = 0
+    deaths = []
+    while steps < max_steps:
+        steps += 1
+        state = game.step(controller.get_direction())
+        if state in ("life_lost", "game_over"):
+            deaths.append(game.caught_by)
+        if state == "life_lost":
+            game.new_life()
+        elif state != "playing":
+            break
+
+    return {
+        "state": state,
+        "steps": steps,
+        "score": game.params["score"],
+        "lives": game.params["lives"],
+        "dots": len(game.params["dots"]),
+        "deaths": deaths,
+    }
+
+
+if __name__ == "__main__":
+    start_time = time.perf_counter()
+    for game_seed in range(5):
+        print(simulate(RandomController(seed=game_seed), max_steps=2000, seed=game_seed))
+    print(f"{5 / (time.perf_counter() - start_time) * 60:.1f} games per minute")
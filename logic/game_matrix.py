@@ -0,0 +1,123 @@
+"""
+This module contains the game matrix, an incrementally updated integer representation of the game state.
+"""
+from collections.abc import Callable
+
+import numpy as np
+
+from logic import dot
+from logic.dot import DotLayer
+
+# The values of the matrix
+CORRIDOR = 0
+WALL = 1
+DOT = 2
+PELLET = 3
+GHOST = 4
+FEARED_GHOST = 5
+PLAYER = 6
+
+
+class GameMatrix:
+    """
+    A class to represent the game state as a matrix of walls, dots and characters.
+    Eating a dot or moving a character only rewrites the affected cells. Every change increments the version of the
+    matrix and is reported to all subscribers, hence consumers never have to rebuild or compare the whole matrix.
+    """
+
+    def __init__(self, walls: list[list[int]], dots: DotLayer) -> None:
+        """
+        Constructs a game matrix object.
+
+        :param walls: A list of lists, containing 0s and 1s, representing the maze.
+        :param dots: The remaining dots.
+        """
+        self._base = np.array(walls, dtype=np.uint8)  # walls and dots
+        self._base[dots.cells == dot.DOT] = DOT
+        self._base[dots.cells == dot.PELLET] = PELLET
+        self.data = self._base.copy()
+        self.version = 0
+
+        # The cell and value of every character (later characters are drawn on top of earlier ones)
+        self._characters = {}  # type: dict[str, tuple[tuple[int, int], int]]
+        self._subscribers = []  # type: list[Callable[[int, int, int], None]]
+
+    def subscribe(self, callback: Callable[[int, int, int], None]) -> None:
+        """
+        Registers a callback, which is called with the row, the column and the new value of every changed cell.
+
+        :param callback: The callback.
+        :return: Nothing.
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[int, int, int], None]) -> None:
+        """
+        Removes a registered callback.
+
+        :param callback: The callback.
+        :return: Nothing.
+        """
+        self._subscribers.remove(callback)
+
+    def _refresh(self, cell: tuple[int, int]) -> None:
+        """
+        Recomputes the value of a single cell (the topmost character or else the wall or dot underneath).
+
+        :param cell: The (column, row) index of the cell.
+        :return: Nothing.
+        """
+        i, j = cell
+        value = int(self._base[j, i])
+        for character_cell, character_value in self._characters.values():
+            if character_cell == cell:
+                value = character_value
+
+        if self.data[j, i] != value:
+            self.data[j, i] = value
+            self.version += 1
+            for callback in self._subscribers:
+                callback(j, i, value)
+
+    def remove_dot(self, cell: tuple[int, int]) -> None:
+        """
+        Removes an eaten dot (or pellet).
+
+        :param cell: The (column, row) index of the cell.
+        :return: Nothing.
+        """
+        i, j = cell
+        self._base[j, i] = CORRIDOR
+        self._refresh(cell)
+
+    def set_dots(self, dots: DotLayer) -> None:
+        """
+        Rewrites the dots of all cells (e.g. after a saved game state has been restored).
+
+        :param dots: The remaining dots.
+        :return: Nothing.
+        """
+        base = np.where(self._base == WALL, WALL, CORRIDOR).astype(np.uint8)
+        base[dots.cells == dot.DOT] = DOT
+        base[dots.cells == dot.PELLET] = PELLET
+        for j, i in np.argwhere(base != self._base):
+            self._base[j, i] = base[j, i]
+            self._refresh((int(i), int(j)))
+
+    def move_character(self, name: str, cell: tuple[int, int], value: int) -> None:
+        """
+        Moves a character to the given cell.
+
+        :param name: The name of the character.
+        :param cell: The (column, row) index of the new cell.
+        :param value: The value of the character (e.g. player, ghost or feared ghost).
+        :return: Nothing.
+        """
+        old = self._characters.get(name)
+        if old == (cell, value):
+            return
+
+        self._characters[name] = (cell, value)
+        if old is not None and old[0] != cell:
+            self._refresh(old[0])
+        self._refresh(cell)
@@ -0,0 +1,229 @@
+"""
+This module contains a compact, pygame-free representation of the complete state of a game, which can be copied
+cheaply (e.g. by search-based bots or to seek in a replay) and serialised into a binary format.
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from typing import Any
+
+import numpy as np
+
+MAGIC = b"PMGS"
+VERSION = 2
+
+ENEMY_NAMES = ("blinky", "pinky", "inky", "clyde")
+PATTERNS = ("", "blinky", "pinky", "inky", "clyde", "feared")
+
+# The layout of the numeric values of a game state
+TICKS, LIVES, SCORE, NEXT_MOVE, DIRECTION, FEAR_STATE, CAUGHT_BY = range(7)
+TIMERS = 7  # game timer, fear timer and release timer (running, start time and elapsed time each)
+PLAYER = 16  # position, velocity and requested direction
+ENEMIES = 21  # position, velocity, fear state, score, release time and move pattern of every enemy
+ENEMY_SIZE = 8
+SIZE = ENEMIES + ENEMY_SIZE * len(ENEMY_NAMES)
+
+# A path key: the start and target (row, column) cells, the opened and blocked cells of the maze and the move pattern
+PathKey = tuple[tuple[int, int], tuple[int, int], frozenset[tuple[int, int]], frozenset[tuple[int, int]], str]
+Path = tuple[tuple[int, int], ...]
+
+_NONE = 0xFFFFFFFF  # the length of a missing path
+
+
+def _pack_cells(buffer: bytearray, cells: Any) -> None:
+    """
+    Appends a sequence of (row, column) cells (or None) to a buffer (two bytes per index, for levels of any size).
+
+    :param buffer: The output buffer.
+    :param cells: The cells.
+    :return: Nothing.
+    """
+    if cells is None:
+        buffer += struct.pack("<I", _NONE)
+        return
+    buffer += struct.pack("<I", len(cells))
+    buffer += np.asarray(cells, dtype="<u2").tobytes()
+
+
+def _unpack_cells(data: bytes, offset: int) -> tuple[Path | None, int]:
+    """
+    Reads a sequence of cells written by _pack_cells.
+
+    :param data: The input data.
+    :param offset: The position of the sequence.
+    :return: The cells (or None) and the position after them.
+    """
+    (length,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    if length == _NONE:
+        return None, offset
+    values = np.frombuffer(data, dtype="<u2", count=2 * length, offset=offset).tolist()
+    return tuple(zip(values[::2], values[1::2])), offset + 4 * length
+
+
+class GameState:
+    """
+    A class to represent the state of a game at a single tick (including the state carried over to the next life).
+    All numbers are stored in a single array and the dots in a second one, the remaining parts are immutable.
+    Hence, a copy only copies two small arrays. A state can be restored into any game of the same level.
+    """
+
+    __slots__ = ("values", "dots", "rng", "paths", "cached_paths", "path_keys")
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        dots: np.ndarray,
+        rng: tuple[Any, ...],
+        paths: tuple[Path, ...],
+        cached_paths: tuple[Path | None, ...],
+        path_keys: tuple[PathKey | None, ...],
+    ) -> None:
+        """
+        Constructs a game state.
+
+        :param values: The numeric values (see the layout above).
+        :param dots: The dot layer.
+        :param rng: The state of the random number generator of the game.
+        :param paths: The current path of every enemy.
+        :param cached_paths: The cached path of every enemy.
+        :param path_keys: The key of the cached path of every enemy.
+        """
+        self.values = values
+        self.dots = dots
+        self.rng = rng
+        self.paths = paths
+        self.cached_paths = cached_paths
+        self.path_keys = path_keys
+
+    @property
+    def ticks(self) -> int:
+        """
+        Gets the number of ticks of the game clock.
+
+        :return: The number of ticks.
+        """
+        return int(self.values[TICKS])
+
+    @property
+    def lives(self) -> int:
+        """
+        Gets the remaining lives.
+
+        :return: The number of lives.
+        """
+        return int(self.values[LIVES])
+
+    @property
+    def score(self) -> int:
+        """
+        Gets the score.
+
+        :return: The score.
+        """
+        return int(self.values[SCORE])
+
+    def copy(self) -> GameState:
+        """
+        Copies the game state (the immutable parts are shared).
+
+        :return: The copy.
+        """
+        return GameState(self.values.copy(), self.dots.copy(), self.rng, self.paths, self.cached_paths, self.path_keys)
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Defines equal comparator between game states.
+
+        :param other: Another game state.
+        :return: True if both states are equal, False otherwise.
+        """
+        return (
+            isinstance(other, GameState)
+            and np.array_equal(self.values, other.values)
+            and np.array_equal(self.dots, other.dots)
+            and self.rng == other.rng
+            and self.paths == other.paths
+            and self.cached_paths == other.cached_paths
+            and self.path_keys == other.path_keys
+        )
+
+    __hash__ = None  # type: ignore  # mutable
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialises the game state (compressed with zlib).
+
+        :return: The binary game state.
+        """
+        version, internal_state, gauss_next = self.rng
+        buffer = bytearray(self.values.astype("<f8").tobytes())
+        buffer += struct.pack("<BHH", self.dots.ndim, *self.dots.shape) + self.dots.astype(np.uint8).tobytes()
+        buffer += struct.pack("<BH", version, len(internal_state))
+        buffer += np.array(internal_state, dtype="<u4").tobytes()
+        buffer += struct.pack("<?d", gauss_next is not None, gauss_next or 0.0)
+        for path, cached_path, path_key in zip(self.paths, self.cached_paths, self.path_keys):
+            _pack_cells(buffer, path)
+            _pack_cells(buffer, cached_path)
+            if path_key is None:
+                buffer.append(0)
+                continue
+            start, target, opened, blocked, pattern = path_key
+            buffer.append(1)
+            _pack_cells(buffer, (start, target))
+            _pack_cells(buffer, sorted(opened))
+            _pack_cells(buffer, sorted(blocked))
+            buffer.append(PATTERNS.index(pattern))
+        return MAGIC + bytes([VERSION]) + zlib.compress(bytes(buffer))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> GameState:
+        """
+        Deserialises a game state.
+
+        :param data: The binary game state created by to_bytes.
+        :return: The game state.
+        """
+        if data[: len(MAGIC)] != MAGIC or len(data) <= len(MAGIC) or data[len(MAGIC)] != VERSION:
+            raise ValueError("The data is not a game state of a supported version.")
+
+        try:
+            payload = zlib.decompress(data[len(MAGIC) + 1 :])
+            values = np.frombuffer(payload, dtype="<f8", count=SIZE).astype(np.float64)
+            offset = SIZE * 8
+            _, rows, cols = struct.unpack_from("<BHH", payload, offset)
+            offset += 5
+            dots = np.frombuffer(payload, dtype=np.uint8, count=rows * cols, offset=offset).reshape(rows, cols).copy()
+            offset += rows * cols
+            version, length = struct.unpack_from("<BH", payload, offset)
+            offset += 3
+            internal_state = tuple(int(v) for v in np.frombuffer(payload, dtype="<u4", count=length, offset=offset))
+            offset += 4 * length
+            has_gauss, gauss_next = struct.unpack_from("<?d", payload, offset)
+            offset += 9
+
+            paths, cached_paths, path_keys = [], [], []  # type: list[Any], list[Any], list[Any]
+            for _ in ENEMY_NAMES:
+                path, offset = _unpack_cells(payload, offset)
+                cached_path, offset = _unpack_cells(payload, offset)
+                paths.append(path)
+                cached_paths.append(cached_path)
+                offset += 1
+                if not payload[offset - 1]:
+                    path_keys.append(None)
+                    continue
+                cells, offset = _unpack_cells(payload, offset)
+                opened, offset = _unpack_cells(payload, offset)
+                blocked, offset = _unpack_cells(payload, offset)
+                if cells is None or len(cells) != 2 or opened is None or blocked is None:
+                    raise ValueError("The path key has no start and target.")
+                path_keys.append((cells[0], cells[1], frozenset(opened), frozenset(blocked), PATTERNS[payload[offset]]))
+                offset += 1
+            if offset != len(payload):
+                raise ValueError("The data has trailing bytes.")
+        except (zlib.error, struct.error, IndexError, ValueError) as exc:
+            raise ValueError("The game state is corrupted.") from exc
+
+        rng = (version, internal_state, gauss_next if has_gauss else None)
+        return cls(values, dots, rng, tuple(paths), tuple(cached_paths), tuple(path_keys))
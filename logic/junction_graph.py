@@ -0,0 +1,283 @@
+"""
+This module contains a compressed graph of a maze, whose nodes are junctions and whose edges are corridors.
+The ghosts search it for mazes with blocked cells or more than MAX_CELLS cells (see Enemy.get_path), since the path
+table and the flow fields are faster on the small static mazes.
+"""
+import heapq
+import math
+from functools import lru_cache
+
+from logic.flow_field import get_neighbours
+from logic.maze import Maze
+from logic.profiler import PROFILER
+
+# A search label: the cells (flat indexes) leading to a node, or from a node to the end of the path
+Route = tuple[int, list[int]]
+
+
+class JunctionGraph:
+    """
+    A class to represent the junction graph of a maze.
+    Nodes are intersections and dead ends, edges are the corridor runs between them (including the tunnel
+    wraparound). Searching the graph instead of the grid shrinks the search space to the number of junctions.
+    """
+
+    def __init__(self, maze: Maze) -> None:
+        """
+        Constructs the junction graph of the given maze (the blocked cells of the overlay are ignored).
+
+        :param maze: The maze (including its overlay).
+        """
+        self.rows, self.cols = maze.rows, maze.cols
+        walkable, opened, _ = maze.get_walkable()
+        size = self.rows * self.cols
+        self._walkable = [walkable[index] or index in opened for index in range(size)]
+        self._neighbours = [
+            [neighbour for neighbour in neighbours if self._walkable[neighbour]]
+            for neighbours in get_neighbours(self.rows, self.cols)
+        ]
+
+        # Every walkable cell which is not part of a straight or bent corridor is a node
+        self.nodes = {index for index in range(size) if self._walkable[index] and len(self._neighbours[index]) != 2}
+        self.edges = []  # type: list[tuple[int, int, list[int]]]
+        self._adjacent = {}  # type: dict[int, list[tuple[int, int, bool]]]
+        self._corridor = {}  # type: dict[int, tuple[int, int]]
+        self._followed = set()  # type: set[tuple[int, int]]
+
+        for node in sorted(self.nodes):
+            self._add_edges(node)
+        # Corridors which form a closed loop without any junction get an arbitrary node
+        for index in range(size):
+            if self._walkable[index] and index not in self.nodes and index not in self._corridor:
+                self.nodes.add(index)
+                self._add_edges(index)
+
+    def _add_edges(self, node: int) -> None:
+        """
+        Follows every corridor leaving the given node until the next node and adds it as an edge.
+
+        :param node: The flat index of the node.
+        :return: Nothing.
+        """
+        self._adjacent.setdefault(node, [])
+        for first in self._neighbours[node]:
+            if (node, first) in self._followed:
+                continue  # corridor already added from its other end
+
+            previous, current, cells = node, first, []
+            while current not in self.nodes:
+                cells.append(current)
+                previous, current = current, next(n for n in self._neighbours[current] if n != previous)
+
+            self._followed.update(((node, first), (current, previous)))
+            edge_id = len(self.edges)
+            self.edges.append((node, current, cells))
+            self._adjacent[node].append((edge_id, current, True))
+            self._adjacent.setdefault(current, []).append((edge_id, node, False))
+            for offset, cell in enumerate(cells):
+                self._corridor[cell] = (edge_id, offset)
+
+    def _index(self, position: tuple[int, int]) -> int:
+        """
+        Converts a (row, column) position into a flat cell index.
+
+        :param position: The position.
+        :return: The cell index.
+        """
+        return (position[0] % self.rows) * self.cols + position[1] % self.cols
+
+    def _heuristic(self, index: int, end: int) -> int:
+        """
+        Manhattan distance between two cells (taking the wraparound at the borders into account).
+
+        :param index: The flat index of the first cell.
+        :param end: The flat index of the second cell.
+        :return: The distance.
+        """
+        dy = abs(index // self.cols - end // self.cols)
+        dx = abs(index % self.cols - end % self.cols)
+        return min(dy, self.rows - dy) + min(dx, self.cols - dx)
+
+    def _exits(self, start: int, blocked: frozenset[int]) -> dict[int, Route]:
+        """
+        Gets the nodes which can be reached from a cell without crossing another node.
+
+        :param start: The flat index of a walkable cell.
+        :param blocked: The flat indexes of the blocked cells.
+        :return: The cost and the cells (without the start, but including the node) of reaching every exit node.
+        """
+        if start in self.nodes:
+            return {start: (0, [])}
+
+        edge_id, offset = self._corridor[start]
+        node_u, node_v, cells = self.edges[edge_id]
+        exits = {}  # type: dict[int, Route]
+        for node, route in ((node_v, cells[offset + 1 :] + [node_v]), (node_u, cells[:offset][::-1] + [node_u])):
+            if blocked.isdisjoint(route) and (node not in exits or len(route) < exits[node][0]):
+                exits[node] = (len(route), route)
+        return exits
+
+    def _entries(self, end: int, blocked: frozenset[int]) -> dict[int, Route]:
+        """
+        Gets the nodes from which a cell can be reached without crossing another node.
+
+        :param end: The flat index of a walkable cell.
+        :param blocked: The flat indexes of the blocked cells.
+        :return: The cost and the cells (without the node, but including the end) of leaving every entry node.
+        """
+        return {
+            node: (cost, route[-2::-1] + [end] if route else [])
+            for node, (cost, route) in self._exits(end, blocked).items()
+        }
+
+    def find_route(
+        self, start: tuple[int, int], end: tuple[int, int], blocked: frozenset[tuple[int, int]] = frozenset()
+    ) -> tuple[int, list[tuple[int, bool]], list[int], list[int]] | None:
+        """
+        Searches the graph with A* for a shortest route between two cells, without expanding the edges into cells.
+
+        :param start: The start position (row, column).
+        :param end: The end position (row, column).
+        :param blocked: The (row, column) positions of cells which must not be crossed.
+        :return: The length, the traversed edges (id and direction), the cells leading from the start to the first
+                 node (or to the end) and the cells leading from the last node to the end. None if there is no route.
+        """
+        s, e = self._index(start), self._index(end)
+        blocked_indexes = frozenset(self._index(cell) for cell in blocked)
+        if not self._walkable[e] or e in blocked_indexes:
+            return None
+
+        exits = self._exits(s, blocked_indexes)
+        entries = self._entries(e, blocked_indexes)
+        blocked_edges = {self._corridor[cell][0] for cell in blocked_indexes if cell in self._corridor}
+
+        # Start and end on the same corridor
+        best = None  # type: tuple[int, list[tuple[int, bool]], list[int], list[int]] | None
+        if s in self._corridor and e in self._corridor and self._corridor[s][0] == self._corridor[e][0]:
+            cells = self.edges[self._corridor[s][0]][2]
+            offset_s, offset_e = self._corridor[s][1], self._corridor[e][1]
+            direct = cells[offset_s + 1 : offset_e + 1] if offset_s < offset_e else cells[offset_e:offset_s][::-1]
+            if blocked_indexes.isdisjoint(direct):
+                best = (len(direct), [], direct, [])
+
+        # A* over the nodes, the heap holds (f, g, node) tuples
+        g_values = {}  # type: dict[int, int]
+        parents = {}  # type: dict[int, tuple[int, int, bool] | None]
+        open_list = []  # type: list[tuple[int, int, int]]
+        for node, (cost, _) in exits.items():
+            if node not in blocked_indexes or node == s:
+                g_values[node] = cost
+                parents[node] = None
+                heapq.heappush(open_list, (cost + self._heuristic(node, e), cost, node))
+
+        goal_cost, goal_node = math.inf, -1
+        closed = set()  # type: set[int]
+        while open_list:
+            f, g, node = heapq.heappop(open_list)
+            if best is not None and f >= best[0] or f >= goal_cost:
+                break
+            if node in closed or g > g_values[node]:
+                continue
+            closed.add(node)
+
+            if node in entries and g + entries[node][0] < goal_cost:
+                goal_cost, goal_node = g + entries[node][0], node
+
+            for edge_id, other, forward in self._adjacent[node]:
+                if edge_id in blocked_edges or other in blocked_indexes or other in closed:
+                    continue
+                child_g = g + len(self.edges[edge_id][2]) + 1
+                if child_g < g_values.get(other, child_g + 1):
+                    g_values[other] = child_g
+                    parents[other] = (node, edge_id, forward)
+                    heapq.heappush(open_list, (child_g + self._heuristic(other, e), child_g, other))
+
+        PROFILER.count("astar expansions", len(closed))
+        if goal_node != -1 and (best is None or goal_cost < best[0]):
+            edges = []  # type: list[tuple[int, bool]]
+            node = goal_node
+            parent = parents[node]
+            while parent is not None:
+                edges.append(parent[1:])
+                node = parent[0]
+                parent = parents[node]
+            best = (int(goal_cost), edges[::-1], exits[node][1], entries[goal_node][1])
+        return best
+
+    def expand(
+        self, start: tuple[int, int], route: tuple[int, list[tuple[int, bool]], list[int], list[int]]
+    ) -> list[tuple[int, int]]:
+        """
+        Expands a route of the graph into the list of cells it passes.
+
+        :param start: The start position (row, column).
+        :param route: A route found by find_route.
+        :return: The path as a list of (row, column) tuples (including the start and the end).
+        """
+        _, edges, head, tail = route
+        cells = list(head)
+        for edge_id, forward in edges:
+            node_u, node_v, corridor = self.edges[edge_id]
+            cells.extend(corridor + [node_v] if forward else corridor[::-1] + [node_u])
+        cells.extend(tail)
+        return [start] + [divmod(cell, self.cols) for cell in cells]
+
+    def get_path(
+        self, start: tuple[int, int], end: tuple[int, int], blocked: frozenset[tuple[int, int]] = frozenset()
+    ) -> list[tuple[int, int]] | None:
+        """
+        Returns a list of tuples as a shortest path from the given start to the given end (both included).
+
+        :param start: The start position (row, column).
+        :param end: The end position (row, column).
+        :param blocked: The (row, column) positions of cells which must not be crossed.
+        :return: The path, or None if the end is not reachable.
+        """
+        s = self._index(start)
+        if s == self._index(end):
+            return [start]
+
+        # A start inside a wall (e.g. the ghost house) first has to step onto a walkable neighbour
+        if not self._walkable[s]:
+            paths = [
+                self.get_path(divmod(neighbour, self.cols), end, blocked)
+                for neighbour in self._neighbours[s]
+                if divmod(neighbour, self.cols) not in blocked
+            ]
+            shortest = min((path for path in paths if path), key=len, default=None)
+            return [start] + shortest if shortest else None
+
+        with PROFILER.scope("astar"):
+            route = self.find_route(start, end, blocked)
+        return self.expand(start, route) if route is not None else None
+
+
+@lru_cache(maxsize=8)
+def _get_junction_graph(maze: Maze) -> JunctionGraph:
+    """
+    Builds the junction graph of a maze without blocked cells.
+
+    :param maze: The maze (including its opened cells).
+    :return: The junction graph.
+    """
+    return JunctionGraph(maze)
+
+
+def get_junction_graph(maze: Maze) -> JunctionGraph:
+    """
+    Gets the (cached) junction graph of the given maze. Blocked cells are checked per search, hence all overlays
+    with the same opened cells share a single graph.
+
+    :param maze: The maze (including its overlay).
+    :return: The junction graph.
+    """
+    return _get_junction_graph(maze.overlay(opened=maze.opened) if maze.blocked else maze)
+
+
+if __name__ == "__main__":
+    from level.grid import Grid
+
+    stock_maze = Grid().maze
+    graph = get_junction_graph(stock_maze)
+    print(f"{len(graph.nodes)} nodes and {len(graph.edges)} edges instead of {(stock_maze.walls == 0).sum()} cells")
+    print(graph.get_path((10, 18), (20, 1)))
@@ -0,0 +1,108 @@
+"""
+This module contains an implementation of an immutable maze with cheap per-query overlays.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+import numpy as np
+
+
+class Maze:
+    """
+    A class to represent a maze for path finding.
+    The walls are stored once in a read-only array, which is shared by all overlays of the maze.
+    An overlay only adds a (small) set of opened and blocked cells on top of these walls.
+    """
+
+    def __init__(
+        self,
+        walls: list[list[int]] | np.ndarray | Maze,
+        opened: Iterable[tuple[int, int]] = (),
+        blocked: Iterable[tuple[int, int]] = (),
+    ) -> None:
+        """
+        Constructs a maze object.
+
+        :param walls: A list of lists (or a 2D array), containing 0s and 1s, representing the walls of the maze,
+                      or another maze whose walls are shared.
+        :param opened: The (row, column) positions of walls which are walkable in this maze.
+        :param blocked: The (row, column) positions of corridors which are not walkable in this maze.
+        """
+        if isinstance(walls, Maze):
+            self.walls = walls.walls  # type: np.ndarray
+            self._base_key = walls._base_key  # type: tuple[tuple[int, ...], bytes]
+            self._walkable = walls._walkable  # type: list[bool]
+        else:
+            self.walls = np.array(walls, dtype=np.uint8)
+            self.walls.flags.writeable = False
+            self._base_key = (self.walls.shape, self.walls.tobytes())
+            self._walkable = (self.walls == 0).ravel().tolist()
+        self.rows, self.cols = self.walls.shape  # type: int, int
+
+        self.opened = frozenset((i % self.rows, j % self.cols) for i, j in opened)
+        self.blocked = frozenset((i % self.rows, j % self.cols) for i, j in blocked)
+        self.key = (self._base_key, self.opened, self.blocked)
+
+    def overlay(self, opened: Iterable[tuple[int, int]] = (), blocked: Iterable[tuple[int, int]] = ()) -> Maze:
+        """
+        Creates a maze with the same walls but different opened and blocked cells (without copying the walls).
+
+        :param opened: The (row, column) positions of walls which are walkable in the new maze.
+        :param blocked: The (row, column) positions of corridors which are not walkable in the new maze.
+        :return: The new maze.
+        """
+        return Maze(self, opened, blocked)
+
+    def is_wall(self, i: int, j: int) -> bool:
+        """
+        Checks whether the cell at the given position is a wall (or blocked) or not.
+
+        :param i: The vertical index (row).
+        :param j: The horizontal index (column).
+        :return: True if the cell is not walkable, False otherwise.
+        """
+        position = (i % self.rows, j % self.cols)
+        if position in self.blocked:
+            return True
+        return position not in self.opened and not self._walkable[position[0] * self.cols + position[1]]
+
+    def get_walkable(self) -> tuple[list[bool], frozenset[int], frozenset[int]]:
+        """
+        Gets the walkable cells of the walls by flat index (row * cols + column) and the overlay cells.
+
+        :return: The (shared) walkability list of the walls and the flat indexes of the opened and blocked cells.
+        """
+        opened = frozenset(i * self.cols + j for i, j in self.opened)
+        blocked = frozenset(i * self.cols + j for i, j in self.blocked)
+        return self._walkable, opened, blocked
+
+    def to_list(self) -> list[list[int]]:
+        """
+        Converts the maze (including the overlay) into a list of lists, containing 0s and 1s.
+
+        :return: The maze as a list of lists.
+        """
+        maze = self.walls.tolist()  # type: list[list[int]]
+        for i, j in self.opened:
+            maze[i][j] = 0
+        for i, j in self.blocked:
+            maze[i][j] = 1
+        return maze
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Defines equal comparator between mazes.
+
+        :param other: Another maze.
+        :return: True if both mazes have the same walls and overlay, False otherwise.
+        """
+        return isinstance(other, Maze) and self.key == other.key
+
+    def __hash__(self) -> int:
+        """
+        Hashes the maze based on its walls and overlay.
+
+        :return: The hash value.
+        """
+        return hash(self.key)
@@ -0,0 +1,141 @@
+"""
+This module contains a precomputed all-pairs shortest path table for a static maze.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from logic.maze import Maze
+
+# The table needs 4 bytes per pair of cells, hence larger mazes are searched on their junction graph instead
+MAX_CELLS = 2048
+
+# The neighbouring cells in the same order as used by the A* algorithm (left, right, up, down)
+ADJACENT_SQUARES = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+
+class PathTable:
+    """
+    A class to represent a distance and next-hop table between all cells of a maze.
+    Moving over the border of the maze wraps around to the opposite side (e.g. the tunnel on row 10).
+    """
+
+    def __init__(self, maze: list[list[int]]) -> None:
+        """
+        Constructs a path table by running a breadth-first search from every cell of the maze at once.
+
+        :param maze: A list of lists, containing 0s and 1s, representing the maze.
+        """
+        self.rows = len(maze)
+        self.cols = len(maze[0])
+        size = self.rows * self.cols
+
+        walkable = np.array(maze, dtype=np.uint8).ravel() == 0
+        indexes = np.arange(size).reshape(self.rows, self.cols)
+        neighbours = np.stack(
+            [np.roll(indexes, (-dy, -dx), axis=(0, 1)).ravel() for dy, dx in ADJACENT_SQUARES], axis=1
+        )
+
+        # Row t holds the distance (and next cell) from every cell to the target cell t
+        self._distance = np.full((size, size), -1, dtype=np.int16)
+        self._next = np.full((size, size), -1, dtype=np.int16)
+        np.fill_diagonal(self._distance, 0)
+
+        frontier = np.zeros((size, size), dtype=bool)
+        frontier[indexes.ravel(), indexes.ravel()] = walkable
+        distance = 0
+        while frontier.any():
+            distance += 1
+            reached = np.zeros((size, size), dtype=bool)
+            for k in range(len(ADJACENT_SQUARES)):
+                # A cell is reached if its k-th neighbour is on the frontier
+                new = frontier[:, neighbours[:, k]] & (self._distance == -1) & ~reached
+                self._distance[new] = distance
+                self._next[new] = np.broadcast_to(neighbours[:, k], (size, size))[new]
+                reached |= new
+            # Only walkable cells are expanded (walls can only be the start of a path)
+            frontier = reached & walkable
+
+    def _index(self, position: tuple[int, int]) -> int:
+        """
+        Converts a (row, column) position into a flat cell index.
+
+        :param position: The position.
+        :return: The cell index.
+        """
+        return (position[0] % self.rows) * self.cols + position[1] % self.cols
+
+    def get_distance(self, start: tuple[int, int], end: tuple[int, int]) -> int:
+        """
+        Gets the length of the shortest path between two cells.
+
+        :param start: The start position (row, column).
+        :param end: The end position (row, column).
+        :return: The number of steps, or -1 if the end is not reachable.
+        """
+        return int(self._distance[self._index(end), self._index(start)])
+
+    def get_next_cell(self, start: tuple[int, int], end: tuple[int, int]) -> tuple[int, int] | None:
+        """
+        Gets the next cell on a shortest path from the start towards the end position.
+
+        :param start: The start position (row, column).
+        :param end: The end position (row, column).
+        :return: The next cell, the start itself if it equals the end, or None if the end is not reachable.
+        """
+        s, e = self._index(start), self._index(end)
+        if s == e:
+            return start
+        if self._distance[e, s] < 0:
+            return None
+        return divmod(int(self._next[e, s]), self.cols)
+
+    def get_path(self, start: tuple[int, int], end: tuple[int, int]) -> list[tuple[int, int]] | None:
+        """
+        Returns a list of tuples as a shortest path from the given start to the given end (both included).
+
+        :param start: The start position (row, column).
+        :param end: The end position (row, column).
+        :return: The path, or None if the end is not reachable.
+        """
+        s, e = self._index(start), self._index(end)
+        if self._distance[e, s] < 0:
+            return None
+
+        path = [start]
+        next_cells = self._next[e]
+        while s != e:
+            s = int(next_cells[s])
+            path.append(divmod(s, self.cols))
+        return path
+
+    def get_next_indexes(self, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Gets the next cells on shortest paths between many pairs of cells at once.
+
+        :param starts: The flat indexes of the start cells.
+        :param ends: The flat indexes of the end cells (of the same shape as the starts).
+        :return: The flat index of every next cell, the start itself if it equals the end, or -1 if the end is not
+                 reachable.
+        """
+        indexes = np.where(starts == ends, starts, self._next[ends, starts])  # type: np.ndarray
+        return indexes
+
+
+@lru_cache(maxsize=8)
+def get_path_table(maze: Maze) -> PathTable:
+    """
+    Gets the (cached) path table of the given maze. The table is only built the first time a maze is seen.
+
+    :param maze: The maze (including its overlay).
+    :return: The path table.
+    """
+    return PathTable(maze.to_list())
+
+
+if __name__ == "__main__":
+    from level.grid import Grid
+
+    table = get_path_table(Grid().maze)
+    print(table.get_path((10, 18), (20, 1)))
+    print(table.get_distance((10, 18), (20, 1)), table.get_next_cell((10, 18), (20, 1)))
@@ -0,0 +1,197 @@
+"""
+This module contains a lightweight profiler, which measures the time spent in named scopes of the game loop per frame.
+The measurements can also be written to a trace file (see logic.trace).
+"""
+import time
+from collections import deque
+from contextlib import AbstractContextManager, nullcontext
+from typing import Any
+
+from logic.trace import TraceWriter
+
+_DISABLED = nullcontext()  # the (shared) scope of a disabled profiler
+
+
+class _Scope:
+    """
+    A class to represent a measured scope (a context manager adding its duration to the current frame).
+    """
+
+    __slots__ = ("_profiler", "_name", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        """
+        Constructs a scope object.
+
+        :param profiler: The profiler.
+        :param name: The name of the scope.
+        """
+        self._profiler = profiler
+        self._name = name
+        self._start = 0
+
+    def __enter__(self) -> None:
+        """
+        Starts the measurement.
+
+        :return: Nothing.
+        """
+        self._start = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """
+        Stops the measurement.
+
+        :param exc_info: The exception raised inside the scope (if any).
+        :return: Nothing.
+        """
+        duration = time.perf_counter_ns() - self._start
+        if self._profiler.enabled:
+            self._profiler.add(self._name, duration)
+        if self._profiler.tracer is not None:
+            self._profiler.tracer.add_span(self._name, self._start, duration)
+
+
+class Profiler:
+    """
+    A class to represent a profiler. The time spent in every named scope is summed up per frame and the last frames
+    are kept to report rolling percentiles. While a trace is recorded, every scope and frame is written to the trace
+    file as well. While the profiler is disabled (and no trace is recorded), every scope is a shared no-op context
+    manager, hence instrumented code runs at (almost) full speed.
+    """
+
+    def __init__(self, window: int = 120) -> None:
+        """
+        Constructs a profiler object.
+
+        :param window: The number of frames of the rolling statistics.
+        """
+        self.enabled = False
+        self.window = window
+        self._current = {}  # type: dict[str, int]  # ns per scope of the current frame
+        self._frames = {}  # type: dict[str, deque[int]]  # ns per scope of the last frames
+        self._frame_start = time.perf_counter_ns()
+        self.tracer = None  # type: TraceWriter | None
+        self.counters = {}  # type: dict[str, int]  # the sum of every counter while the profiler is enabled
+
+    @property
+    def active(self) -> bool:
+        """
+        Checks whether anything is recorded (i.e. the profiler is enabled or a trace is written).
+
+        :return: True if the profiler is active, False otherwise.
+        """
+        return self.enabled or self.tracer is not None
+
+    def scope(self, name: str) -> AbstractContextManager:
+        """
+        Gets a context manager, which measures the time spent inside it.
+
+        :param name: The name of the scope.
+        :return: The context manager.
+        """
+        if not self.active:
+            return _DISABLED
+        return _Scope(self, name)
+
+    def count(self, name: str, value: int) -> None:
+        """
+        Records a sample of a counter (written to the trace file and summed up while the profiler is enabled).
+
+        :param name: The name of the counter.
+        :param value: The value of the counter.
+        :return: Nothing.
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+        if self.tracer is not None:
+            self.tracer.add_counter(name, value)
+
+    def add(self, name: str, duration: int) -> None:
+        """
+        Adds a measured duration to a scope of the current frame.
+
+        :param name: The name of the scope.
+        :param duration: The duration in nanoseconds.
+        :return: Nothing.
+        """
+        self._current[name] = self._current.get(name, 0) + duration
+
+    def start_frame(self) -> None:
+        """
+        Starts a new frame (e.g. when the game loop is resumed), discarding the scopes measured since the last frame.
+
+        :return: Nothing.
+        """
+        self._frame_start = time.perf_counter_ns()
+        self._current = {}
+
+    def end_frame(self) -> None:
+        """
+        Completes the current frame (scopes which have not been entered during the frame count as zero).
+
+        :return: Nothing.
+        """
+        now = time.perf_counter_ns()
+        if self.tracer is not None:
+            self.tracer.add_span("frame", self._frame_start, now - self._frame_start)
+        self._frame_start = now
+        if not self.enabled:
+            return
+        for name in self._current.keys() - self._frames.keys():
+            self._frames[name] = deque(maxlen=self.window)
+        for name, frames in self._frames.items():
+            frames.append(self._current.get(name, 0))
+        self._current = {}
+
+    def toggle(self) -> None:
+        """
+        Enables or disables the profiler (the statistics are discarded).
+
+        :return: Nothing.
+        """
+        self.enabled = not self.enabled
+        self._current = {}
+        self._frames = {}
+        self.counters = {}
+
+    def start_trace(self, path: str) -> None:
+        """
+        Starts recording a trace file (a running recording is completed first).
+
+        :param path: The path of the trace file.
+        :return: Nothing.
+        """
+        self.stop_trace()
+        self.tracer = TraceWriter(path)
+        self._frame_start = time.perf_counter_ns()
+
+    def stop_trace(self) -> None:
+        """
+        Completes the recording of the trace file (if any).
+
+        :return: Nothing.
+        """
+        if self.tracer is not None:
+            self.tracer.close()
+            self.tracer = None
+
+    def get_stats(self) -> dict[str, tuple[float, float, float]]:
+        """
+        Gets the rolling statistics of every scope.
+
+        :return: The median, the 95th percentile and the maximum time per frame (in ms) of every scope.
+        """
+        stats = {}
+        for name, frames in self._frames.items():
+            durations = sorted(frames)
+            last = len(durations) - 1
+            stats[name] = (
+                durations[round(0.5 * last)] / 1e6,
+                durations[round(0.95 * last)] / 1e6,
+                durations[last] / 1e6,
+            )
+        return stats
+
+
+PROFILER = Profiler()  # the profiler of the game loop
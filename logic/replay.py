@@ -0,0 +1,311 @@
+"""
+This module contains deterministic replays: a compact recording of a game (its seed and the input of the player),
+a recorder and a player which re-runs the game headless and can seek by means of periodic state snapshots.
+"""
+import json
+import struct
+import time
+import zlib
+from typing import Any
+
+from level.level_file import Level, load_level
+from logic.controller import Controller, RandomController
+from logic.game import Game, new_params
+
+MAGIC = b"PMRP"
+VERSION = 2
+HEADER = struct.Struct("<QI8sH")  # seed, number of ticks, digest of the level, length of the move patterns
+HEADER_V1 = struct.Struct("<QIH")  # replays of version 1 have been recorded on the default level
+
+
+class ReplayError(Exception):
+    """A custom exception used to report invalid replay data"""
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    """
+    Appends an unsigned integer in a variable number of bytes (7 bits per byte).
+
+    :param buffer: The output buffer.
+    :param value: The integer.
+    :return: Nothing.
+    """
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    """
+    Reads an unsigned integer written by _write_varint.
+
+    :param data: The input data.
+    :param offset: The position of the integer.
+    :return: The integer and the position after it.
+    """
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+class Replay:
+    """
+    A class to represent the recording of a game. Since a game only depends on its seed and the input of the player,
+    only the changes of the requested direction are stored (as the number of ticks since the previous change).
+    """
+
+    def __init__(
+        self,
+        seed: int,
+        ticks: int = 0,
+        events: list[tuple[int, int]] | None = None,
+        patterns: dict[str, str] | None = None,
+        level: bytes | None = None,
+    ) -> None:
+        """
+        Constructs a replay object.
+
+        :param seed: The seed of the game.
+        :param ticks: The number of ticks of the game.
+        :param events: The tick and the new requested direction (-1 if none) of every change of the input.
+        :param patterns: The move pattern of every ghost (by default, every ghost uses its own pattern).
+        :param level: The digest of the level of the game (by default, the digest of the default level).
+        """
+        self.seed = seed
+        self.ticks = ticks
+        self.events = events if events else []
+        self.patterns = patterns if patterns else {}
+        self.level = level if level is not None else load_level().digest
+
+    def check_level(self, level: Level) -> None:
+        """
+        Checks whether the replay has been recorded on the given level (otherwise, the playback would diverge).
+
+        :param level: The level of the playback.
+        :return: Nothing.
+        """
+        if level.digest != self.level:
+            raise ReplayError("The replay has been recorded on another level.")
+
+    def get_directions(self) -> list[int]:
+        """
+        Gets the requested direction of every tick.
+
+        :return: A list of directions.
+        """
+        directions = [-1] * self.ticks
+        for (tick, direction), (next_tick, _) in zip(self.events, self.events[1:] + [(self.ticks, -1)]):
+            directions[tick:next_tick] = [direction] * (next_tick - tick)
+        return directions
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialises the replay (a header followed by the delta encoded events, compressed with zlib).
+
+        :return: The binary replay.
+        """
+        patterns = json.dumps(self.patterns, separators=(",", ":")).encode() if self.patterns else b""
+        buffer = bytearray(HEADER.pack(self.seed, self.ticks, self.level, len(patterns)))
+        buffer += patterns
+        previous = 0
+        for tick, direction in self.events:
+            _write_varint(buffer, tick - previous)
+            buffer.append(direction + 1)
+            previous = tick
+        return MAGIC + bytes([VERSION]) + zlib.compress(bytes(buffer), 9)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        """
+        Deserialises a replay.
+
+        :param data: The binary replay created by to_bytes.
+        :return: The replay.
+        """
+        if data[: len(MAGIC)] != MAGIC or len(data) <= len(MAGIC):
+            raise ReplayError("The data is not a replay.")
+        if data[len(MAGIC)] not in (1, VERSION):
+            raise ReplayError(f"Unsupported replay version {data[len(MAGIC)]}.")
+
+        try:
+            payload = zlib.decompress(data[len(MAGIC) + 1 :])
+            if data[len(MAGIC)] == 1:
+                level = None
+                seed, ticks, length = HEADER_V1.unpack_from(payload)
+                offset = HEADER_V1.size
+            else:
+                seed, ticks, level, length = HEADER.unpack_from(payload)
+                offset = HEADER.size
+            patterns = json.loads(payload[offset : offset + length]) if length else {}
+            offset += length
+            events = []
+            tick = 0
+            while offset < len(payload):
+                delta, offset = _read_varint(payload, offset)
+                tick += delta
+                events.append((tick, payload[offset] - 1))
+                offset += 1
+        except (zlib.error, struct.error, IndexError, ValueError) as exc:
+            raise ReplayError("The replay is corrupted.") from exc
+        return cls(seed, ticks, events, patterns, level)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the replay to a file.
+
+        :param path: The path of the file.
+        :return: Nothing.
+        """
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "Replay":
+        """
+        Reads a replay from a file.
+
+        :param path: The path of the file.
+        :return: The replay.
+        """
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+class ReplayRecorder(Controller):
+    """
+    A class to represent a controller, which records the directions requested by another controller.
+    """
+
+    def __init__(
+        self, controller: Controller, seed: int, patterns: dict[str, str] | None = None, level: Level | None = None
+    ) -> None:
+        """
+        Constructs a replay recorder.
+
+        :param controller: The recorded controller.
+        :param seed: The seed of the recorded game.
+        :param patterns: The move pattern of every ghost of the recorded game.
+        :param level: The level of the recorded game (the default level if it is not given).
+        """
+        self.controller = controller
+        self.replay = Replay(seed, patterns=patterns, level=level.digest if level is not None else None)
+        self._direction = -1
+
+    def get_direction(self) -> int:
+        """
+        Gets (and records) the direction of the recorded controller.
+
+        :return: The requested direction.
+        """
+        direction = self.controller.get_direction()
+        if direction != self._direction:
+            self.replay.events.append((self.replay.ticks, direction))
+            self._direction = direction
+        self.replay.ticks += 1
+        return direction
+
+
+class ReplayPlayer:
+    """
+    A class to represent the playback of a replay. The game state is saved every few ticks, hence seeking only
+    re-simulates the ticks after the closest saved state.
+    """
+
+    def __init__(self, replay: Replay, snapshot_interval: int = 600, level: Level | None = None) -> None:
+        """
+        Constructs a replay player.
+
+        :param replay: The replay.
+        :param snapshot_interval: The number of ticks between two saved game states.
+        :param level: The level on which the replay has been recorded (the default level if it is not given).
+        """
+        params = new_params(level)
+        replay.check_level(params["level"])
+        self.replay = replay
+        self.snapshot_interval = snapshot_interval
+        self.game = Game(params, replay.seed, replay.patterns)
+        self.tick = 0
+        self.state = "playing"
+        self._directions = replay.get_directions()
+        self._snapshots = {0: (self.state, self.game.snapshot())}
+
+    def is_finished(self) -> bool:
+        """
+        Checks whether the end of the replay (or the game) has been reached.
+
+        :return: True if the playback is finished, False otherwise.
+        """
+        return self.tick >= self.replay.ticks or self.state in ("won", "game_over")
+
+    def step(self) -> str:
+        """
+        Advances the game by a single tick of the replay.
+
+        :return: The state of the game after the tick.
+        """
+        direction = self._directions[self.tick] if self.tick < len(self._directions) else -1
+        self.state = self.game.step(direction)
+        self.tick += 1
+        if self.state == "life_lost":
+            self.game.new_life()
+
+        if self.tick % self.snapshot_interval == 0 and self.tick not in self._snapshots:
+            self._snapshots[self.tick] = (self.state, self.game.snapshot())
+        return self.state
+
+    def seek(self, tick: int) -> None:
+        """
+        Jumps to the given tick of the replay.
+
+        :param tick: The tick.
+        :return: Nothing.
+        """
+        tick = max(0, min(tick, self.replay.ticks))
+        start = max(t for t in self._snapshots if t <= tick)
+        if not start <= self.tick <= tick:  # otherwise, playing on from the current tick is faster
+            self.state, state = self._snapshots[start]
+            self.game.restore(state)
+            self.tick = start
+        while self.tick < tick and not self.is_finished():
+            self.step()
+
+    def run(self) -> dict[str, Any]:
+        """
+        Plays the rest of the replay as fast as possible.
+
+        :return: The result of the game.
+        """
+        while not self.is_finished():
+            self.step()
+        return {
+            "state": self.state,
+            "steps": self.tick,
+            "score": self.game.params["score"],
+            "lives": self.game.params["lives"],
+            "dots": len(self.game.params["dots"]),
+        }
+
+
+if __name__ == "__main__":
+    recorder = ReplayRecorder(RandomController(seed=0), seed=0)
+    game = Game(seed=recorder.replay.seed)
+    while (game_state := game.step(recorder.get_direction())) not in ("won", "game_over"):
+        if game_state == "life_lost":
+            game.new_life()
+    binary = recorder.replay.to_bytes()
+    print(f"{recorder.replay.ticks} ticks, {len(recorder.replay.events)} events, {len(binary)} bytes")
+
+    player = ReplayPlayer(Replay.from_bytes(binary))
+    start_time = time.perf_counter()
+    print(player.run(), game.params["score"])
+    print(f"{player.tick / (time.perf_counter() - start_time):.0f} ticks per second")
+
+    start_time = time.perf_counter()
+    player.seek(player.replay.ticks // 2)
+    print(f"Seeking to tick {player.tick} took {(time.perf_counter() - start_time) * 1000:.1f} ms")
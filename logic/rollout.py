@@ -0,0 +1,160 @@
+"""
+This module contains a parallel rollout runner, which plays many simulated games on a pool of processes
+(e.g. to compare variants of the ghost AI).
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import time
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from queue import Empty
+from typing import Any
+
+from logic.controller import RandomController
+from logic.game import simulate
+from logic.timer import TICKS_PER_SECOND
+
+# The move pattern of every ghost of a variant
+VARIANTS = {
+    "classic": {},
+    "blinky": {"blinky": "blinky", "pinky": "blinky", "inky": "blinky", "clyde": "blinky"},
+    "pinky": {"blinky": "pinky", "pinky": "pinky", "inky": "pinky", "clyde": "pinky"},
+    "inky": {"blinky": "blinky", "pinky": "inky", "inky": "inky", "clyde": "inky"},
+    "clyde": {"blinky": "clyde", "pinky": "clyde", "inky": "clyde", "clyde": "clyde"},
+}  # type: dict[str, dict[str, str]]
+POLL_INTERVAL = 0.5  # s (how often the workers are checked for errors while waiting for results)
+
+_WORKER = {}  # type: dict[str, Any]  # the state of a worker process (e.g. its result queue)
+
+
+def _init_worker(results: Any) -> None:
+    """
+    Initialises a worker process.
+
+    :param results: The queue to which the results of all games are sent.
+    :return: Nothing.
+    """
+    _WORKER["results"] = results
+
+
+def _play_games(variant: str, seeds: list[int], max_steps: int, interval: int) -> int:
+    """
+    Plays a chunk of games in a worker process and sends the result of every game to the result queue.
+
+    :param variant: The name of the ghost AI variant.
+    :param seeds: The seed of every game.
+    :param max_steps: The maximum number of ticks of a game.
+    :param interval: The number of ticks between two direction changes of the random player.
+    :return: The number of played games.
+    """
+    for seed in seeds:
+        result = simulate(RandomController(interval, seed), max_steps=max_steps, seed=seed, patterns=VARIANTS[variant])
+        deaths = result.pop("deaths")
+        result.update(
+            {
+                "seed": seed,
+                "variant": variant,
+                "time": result["steps"] / TICKS_PER_SECOND,
+                "lives_lost": len(deaths),
+                "cause": deaths[-1]
+                if result["state"] == "game_over"
+                else result["state"].replace("playing", "timeout"),
+                "deaths": deaths,
+            }
+        )
+        _WORKER["results"].put(result)
+    return len(seeds)
+
+
+def run_rollouts(
+    games: int,
+    variant: str = "classic",
+    workers: int | None = None,
+    seed: int = 0,
+    max_steps: int = 20_000,
+    interval: int = 30,
+    callback: Callable[[dict[str, Any]], None] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Plays simulated games in parallel. Every worker is a fresh (spawned) process with its own pygame state and the
+    games are seeded by their index, hence the results do not depend on the number of workers.
+
+    :param games: The number of games.
+    :param variant: The name of the ghost AI variant (see VARIANTS).
+    :param workers: The number of worker processes (by default, the number of CPUs).
+    :param seed: The seed of the first game.
+    :param max_steps: The maximum number of ticks of a game.
+    :param interval: The number of ticks between two direction changes of the random player.
+    :param callback: A function, which is called with the result of every game as soon as it is available.
+    :return: The results of all games (ordered by seed).
+    """
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown ghost AI variant '{variant}'.")
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(seed, seed + games))
+    chunk_size = max(1, min(16, games // (4 * workers)))
+    chunks = [seeds[k : k + chunk_size] for k in range(0, games, chunk_size)]
+
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    results = []  # type: list[dict[str, Any]]
+    with ProcessPoolExecutor(workers, context, _init_worker, (queue,)) as executor:
+        futures = [executor.submit(_play_games, variant, chunk, max_steps, interval) for chunk in chunks]
+        while len(results) < games:
+            # Raise the error of a failed worker (its games would never be sent to the queue)
+            for future in futures:
+                if future.done() and future.exception() is not None:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    future.result()
+            try:
+                result = queue.get(timeout=POLL_INTERVAL)
+            except Empty:
+                continue
+            results.append(result)
+            if callback:
+                callback(result)
+
+    return sorted(results, key=lambda r: r["seed"])
+
+
+def summarize(results: list[dict[str, Any]]) -> dict[str, Any]:
+    """
+    Aggregates the results of many games into summary statistics.
+
+    :param results: The results of the games.
+    :return: The mean, standard deviation, minimum and maximum of the score, time, lost lives and remaining dots,
+             the win rate and how often each ghost (or the time limit) ended a game.
+    """
+    summary = {"games": len(results)}  # type: dict[str, Any]
+    for key in ("score", "time", "lives_lost", "dots"):
+        values = [result[key] for result in results]
+        summary[key] = {
+            "mean": statistics.fmean(values),
+            "std": statistics.pstdev(values),
+            "min": min(values),
+            "max": max(values),
+        }
+    summary["win_rate"] = sum(result["state"] == "won" for result in results) / len(results)
+    summary["causes"] = dict(Counter(result["cause"] for result in results))
+    summary["deaths"] = dict(Counter(ghost for result in results for ghost in result["deaths"]))
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play many simulated games in parallel.")
+    parser.add_argument("--games", type=int, default=64, help="the number of games")
+    parser.add_argument("--variant", choices=VARIANTS.keys(), default="classic", help="the ghost AI variant")
+    parser.add_argument("--workers", type=int, default=None, help="the number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="the seed of the first game")
+    parser.add_argument("--max-steps", type=int, default=20_000, help="the maximum number of ticks of a game")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    all_results = run_rollouts(args.games, args.variant, args.workers, args.seed, args.max_steps)
+    elapsed = time.perf_counter() - start_time
+    for name, value in summarize(all_results).items():
+        print(f"{name}: {value}")
+    print(f"{args.games / elapsed * 60:.1f} games per minute")
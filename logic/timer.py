@@ -4,24 +4,81 @@ Code is based on: https://realpython.com/python-timer/
 """
 import time
 
+# The number of game updates (ticks) per second of game time
+TICKS_PER_SECOND = 60
+
 
 class TimerError(Exception):
     """A custom exception used to report errors in use of Timer class"""
 
 
+class TickClock:
+    """
+    A class to represent a game clock, which counts the game updates (ticks) instead of reading the wall-clock.
+    """
+
+    def __init__(self, ticks_per_second: int = TICKS_PER_SECOND) -> None:
+        """
+        Constructs a tick clock object.
+
+        :param ticks_per_second: The number of ticks per second of game time.
+        """
+        self.ticks_per_second = ticks_per_second
+        self._ticks = 0
+
+    def tick(self, ticks: int = 1) -> None:
+        """
+        Advances the clock.
+
+        :param ticks: The number of ticks to advance.
+        :return: Nothing.
+        """
+        self._ticks += ticks
+
+    def get_ticks(self) -> int:
+        """
+        Gets the number of ticks since the clock has been created.
+
+        :return: The number of ticks.
+        """
+        return self._ticks
+
+    def set_ticks(self, ticks: int) -> None:
+        """
+        Sets the clock to the given number of ticks (e.g. to restore a saved game state).
+
+        :param ticks: The number of ticks.
+        :return: Nothing.
+        """
+        self._ticks = ticks
+
+
 class Timer:
     """
     A class to represent a timer.
+    If a tick clock is given, the timer runs in tick mode: it measures the ticks of the clock instead of the
+    wall-clock time, hence it only advances while the game is updated.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, clock: TickClock | None = None) -> None:
         """
         Constructs a timer object.
+
+        :param clock: The tick clock of the timer (None to measure the wall-clock time).
         """
+        self._clock = clock
         self._running = False
         self._start_time = 0.0
         self._elapsed_time = 0.0
 
+    def _now(self) -> float:
+        """
+        Gets the current time of the timer's clock.
+
+        :return: The current number of ticks (in tick mode) or the current time in seconds.
+        """
+        return self._clock.get_ticks() if self._clock is not None else time.perf_counter()
+
     def start(self) -> None:
         """
         Starts a new timer.
@@ -31,7 +88,7 @@ class Timer:
         # if self._start_time is not None:
         #     raise TimerError(f"Timer is running. Use .stop() to stop it")
 
-        self._start_time = time.perf_counter()
+        self._start_time = self._now()
         self._running = True
 
     def pause(self) -> None:
@@ -40,7 +97,7 @@ class Timer:
 
         :return: Nothing.
         """
-        self._elapsed_time = self._elapsed_time + time.perf_counter() - self._start_time
+        self._elapsed_time = self._elapsed_time + self._now() - self._start_time
         self._start_time = 0.0
         self._running = False
 
@@ -50,7 +107,7 @@ class Timer:
 
         :return: Nothing.
         """
-        self._start_time = time.perf_counter() if not self._running else self._start_time
+        self._start_time = self._now() if not self._running else self._start_time
         self._running = True
 
     def stop(self) -> None:
@@ -71,9 +128,29 @@ class Timer:
         """
         Gets the elapsed time.
 
-        :return: The elapsed time.
+        :return: The elapsed time in seconds.
+        """
+        if self._clock is not None:
+            return self.get_elapsed_ticks() / self._clock.ticks_per_second
+        return self._get_elapsed()
+
+    def get_elapsed_ticks(self) -> int:
+        """
+        Gets the elapsed time in ticks (wall-clock timers convert their elapsed time into ticks).
+
+        :return: The number of elapsed ticks.
+        """
+        if self._clock is not None:
+            return int(self._get_elapsed())
+        return int(self._get_elapsed() * TICKS_PER_SECOND)
+
+    def _get_elapsed(self) -> float:
+        """
+        Gets the elapsed time in the unit of the timer's clock.
+
+        :return: The elapsed time (ticks or seconds).
         """
-        return time.perf_counter() - self._start_time + self._elapsed_time if self._running else self._elapsed_time
+        return self._now() - self._start_time + self._elapsed_time if self._running else self._elapsed_time
 
     def is_running(self) -> bool:
         """
@@ -83,6 +160,23 @@ class Timer:
         """
         return self._running
 
+    def get_state(self) -> tuple[bool, float, float]:
+        """
+        Gets the internal state of the timer (e.g. to save a game state).
+
+        :return: Whether the timer is running, its start time and the elapsed time before the last pause.
+        """
+        return self._running, self._start_time, self._elapsed_time
+
+    def set_state(self, state: tuple[bool, float, float]) -> None:
+        """
+        Sets the internal state of the timer.
+
+        :param state: The state returned by get_state.
+        :return: Nothing.
+        """
+        self._running, self._start_time, self._elapsed_time = state
+
 
 if __name__ == "__main__":
     timer = Timer()
@@ -101,3 +195,9 @@ if __name__ == "__main__":
     timer.pause()
     timer.stop()
     print(timer.is_running())
+
+    tick_clock = TickClock()
+    timer = Timer(tick_clock)
+    timer.start()
+    tick_clock.tick(90)
+    print(timer.get_elapsed_ticks(), timer.get_elapsed_time())
@@ -0,0 +1,116 @@
+"""
+This module contains a writer of trace files in the Chrome Trace Event format (JSON array format), which can be
+inspected with a trace viewer (e.g. chrome://tracing or https://ui.perfetto.dev).
+"""
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any
+
+# A buffered event: its phase ('X' for a span, 'C' for a counter), name, time (ns) and duration (ns) or value
+Event = tuple[str, str, int, int]
+
+
+class TraceWriter:
+    """
+    A class to represent a trace file. The events are collected in a buffer and handed over to a background thread
+    in batches, which formats and writes them. Hence, tracing hardly stalls the game loop. Since trace viewers accept
+    a missing closing bracket, the file remains readable even if the game is not closed properly.
+    """
+
+    def __init__(self, path: str, batch_size: int = 512) -> None:
+        """
+        Constructs a trace writer and starts its background thread.
+
+        :param path: The path of the trace file.
+        :param batch_size: The number of buffered events which are handed over to the background thread at once.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self._origin = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self._tid = threading.get_native_id()
+        self._buffer = []  # type: list[Event]
+        self._queue = queue.SimpleQueue()  # type: queue.SimpleQueue[list[Event] | None]
+
+        self._file = open(path, "w", encoding="utf-8")  # closed by close()
+        self._file.write("[\n")
+        self._write_event({"name": "thread_name", "ph": "M", "args": {"name": "game loop"}}, first=True)
+        self._thread = threading.Thread(target=self._run, name="TraceWriter", daemon=True)
+        self._thread.start()
+
+    def add_span(self, name: str, start: int, duration: int) -> None:
+        """
+        Adds a complete span.
+
+        :param name: The name of the span.
+        :param start: The start time (time.perf_counter_ns).
+        :param duration: The duration in nanoseconds.
+        :return: Nothing.
+        """
+        self._buffer.append(("X", name, start, duration))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def add_counter(self, name: str, value: int, timestamp: int | None = None) -> None:
+        """
+        Adds a sample of a counter.
+
+        :param name: The name of the counter.
+        :param value: The value of the counter.
+        :param timestamp: The time of the sample (time.perf_counter_ns, the current time by default).
+        :return: Nothing.
+        """
+        self._buffer.append(("C", name, time.perf_counter_ns() if timestamp is None else timestamp, value))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Hands the buffered events over to the background thread.
+
+        :return: Nothing.
+        """
+        if self._buffer:
+            self._queue.put(self._buffer)
+            self._buffer = []
+
+    def close(self) -> None:
+        """
+        Writes the remaining events, waits for the background thread and closes the file.
+
+        :return: Nothing.
+        """
+        self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        self._file.write("\n]\n")
+        self._file.close()
+
+    def _write_event(self, event: dict[str, Any], first: bool = False) -> None:
+        """
+        Writes a single event to the file.
+
+        :param event: The event (without process and thread id).
+        :param first: Whether the event is the first one of the file (i.e. without leading separator).
+        :return: Nothing.
+        """
+        event["pid"], event["tid"] = self._pid, self._tid
+        self._file.write(("" if first else ",\n") + json.dumps(event, separators=(",", ":")))
+
+    def _run(self) -> None:
+        """
+        Writes the batches of events until the writer is closed (runs in the background thread).
+
+        :return: Nothing.
+        """
+        while (events := self._queue.get()) is not None:
+            for phase, name, timestamp, value in events:
+                event = {"name": name, "ph": phase, "ts": (timestamp - self._origin) / 1000}  # type: dict[str, Any]
+                if phase == "X":
+                    event["dur"] = value / 1000
+                else:
+                    event["args"] = {"value": value}
+                self._write_event(event)
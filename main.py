@@ -3,14 +3,14 @@ This script is the main entry point to the game.
 """
 
 # Built-in
+import argparse
+import os
 import random
 import sys
 from collections import defaultdict
 from typing import Any, cast
 
 # Packages
-import numpy as np
-
 import yaml  # isort: split
 
 # Pygame
@@ -20,118 +20,145 @@ from pygame.locals import K_ESCAPE, KEYDOWN, QUIT, WINDOWCLOSE
 from pygame_menu.locals import ALIGN_LEFT, ALIGN_RIGHT
 
 # Modules
-from characters.enemy import Enemy
-from characters.player import Player
 from level.field import Field
-from level.grid import Grid
-from level.menu import blur_surface, draw_hud, draw_surface, paused
-from level.window import change_surface, create_window
-from logic import timer
+from level.level_file import load_level
+from level.menu import blur_surface, game_over, paused, update_score
+from level.renderer import HUD_HEIGHT, Renderer, render_profiler_overlay
+from level.window import create_window
+from logic.controller import KeyboardController, ScriptedController
+from logic.game import Game, new_params
+from logic.profiler import PROFILER
+from logic.replay import Replay, ReplayRecorder
+from logic.timer import TICKS_PER_SECOND
 
 # Based on: https://coderslegacy.com/python/pygame-platformer-game-development/
 
 pygame.init()
 
-HEIGHT = 440  # 22 * 20
+HEIGHT = 440  # 22 * 20 (the size of the menus and of the classic level)
 WIDTH = 380  # 19 * 20
-SPEED = 2  # The game breaks if the speed is not an integer.
 FPS = 60
+TICK_TIME = 1000 / TICKS_PER_SECOND  # ms
+MAX_FRAME_TIME = 250  # ms (frames taking longer are simulated slower than real time)
+REPLAY_PATH = os.path.join("resources", "last_game.replay")
+PROFILER_KEY = pygame.K_F3  # shows the profiler overlay
 
 FramePerSec = pygame.time.Clock()
-display_surface = pygame.display.set_mode((WIDTH, HEIGHT + 1.5 * 20))
+display_surface = pygame.display.set_mode((WIDTH, HEIGHT + HUD_HEIGHT))
 pygame.display.set_caption("Pacman")
 
 
-def get_move_pattern(enemy: str, is_feared: bool) -> str:
+class Session:
     """
-    Returns the string name of the enemy if the enemy is not feared. Otherwise, 'feared' will be returned
-
-    :param enemy: The name of the enemy.
-    :param is_feared: Whether the enemy is currently feared or not.
-    :return: The name of the enemy or 'feared'.
+    A class to represent a game (or replay) from its start until it is over.
+    The level resources (grid cells, renderer and ghost house door) are created once and reused across lives.
     """
-    return enemy if not is_feared else "feared"
 
+    def __init__(self, params: dict) -> None:
+        """
+        Constructs a game session
+
+        :param params: A dictionary of game parameters
+        """
+        self.params = params
+        self.game = Game(params, params["seed"])
+        self.controller = params["controller"]
+        self.clock = params.get("frame_clock", FramePerSec)  # the frame clock (e.g. an uncapped clock of a benchmark)
+        self.cells = self.game.grid.init_map()
+        level = self.game.grid.level
+        set_display_size(params["width"], params["height"])
+
+        # Ghost house door
+        door = {}  # type: dict
+        door_surface = pygame.Surface((20, 3))
+        door_surface.fill((255, 165, 0))
+        door["surface"] = door_surface
+        door["rectangle"] = door_surface.get_rect(center=(level.door[1] * 20 + 11, level.door[0] * 20 + 2))
+        self.renderer = Renderer(display_surface, self.cells, params["dots"], door)
+
+        # Initialise variables
+        self.character_sprites = pygame.sprite.Group()  # type: pygame.sprite.Group
+        self.previous_cell = (*self.game.grid.level.player_start, (0, 0, 0))
+        self.old_field = Field(-1, -1, (0, 0, 255))
+        self.matrix_version = -1
+        self.checkboxes = {"path_highlights": False}
+        self.accumulator = 0.0  # ms of real time which have not been simulated yet
+        self.previous_positions = {}  # type: dict[pygame.sprite.Sprite, pygame.math.Vector2]
+        self.final_score = 0
+        self.profiler_overlay = None  # type: pygame.Surface | None
+        self.profiler_frames = 0  # the number of frames since the profiler overlay has been rendered
+        self._start_life()
+
+    def _start_life(self) -> None:
+        """
+        Resets the variables of a life
+
+        :return: Nothing
+        """
+        self.character_sprites.empty()
+        self.character_sprites.add([self.game.player, *self.game.enemies.values()])
+        self.previous_cell = (*self.game.grid.level.player_start, (0, 0, 0))
+        self.old_field = Field(-1, -1, (0, 0, 255))
+        self.accumulator = 0.0
+        self.previous_positions = {}
+        self.renderer.invalidate()
+
+    def next_life(self) -> None:
+        """
+        Starts the next life (the highlights of the previous life are removed)
+
+        :return: Nothing
+        """
+        self.renderer.path_overlay.clear()
+        x, y = self.old_field.coordinates
+        self.cells[y][x].surf.fill(self.old_field.colour)
+        self.cells[y][x].dirty = True
+
+        self.game.new_life()
+        self._start_life()
+
+    def is_recorded(self) -> bool:
+        """
+        Checks whether the game is played (and recorded) or whether it is a replay
+
+        :return: True if the game is played, False otherwise
+        """
+        return isinstance(self.controller, ReplayRecorder)
+
+    def close(self) -> None:
+        """
+        Closes the second window (if it is open) and restores the size of the menus
+
+        :return: Nothing
+        """
+        if self.params["toggle"]:
+            self.params["window"].destroy()
+            self.params["toggle"] = False
+        set_display_size(WIDTH, HEIGHT)
+
+    def pause(self) -> str:
+        """
+        Shows the pause menu
+
+        :return: The next scene ('playing' or 'menu')
+        """
+        display_surface.blit(blur_surface(display_surface, 2), (0, 0))
+        self.checkboxes, exit_game = paused(
+            display_surface, self.clock, self.params["width"], self.params["height"], self.checkboxes
+        )
+        if exit_game:
+            return "menu"
+        self.renderer.invalidate()
+        return "playing"
 
-def run(params: dict = {}) -> None:
-    """
-    The main game loop
+    def _handle_events(self) -> str | None:
+        """
+        Handles the events of the windows
 
-    :param params: A dictionary of game parameters
-    :return: Nothing
-    """
+        :return: The next scene if the game is paused, None otherwise
+        """
+        params = self.params
 
-    if not params:
-        # Initialise parameters
-        params = {
-            "width": 380,
-            "height": 440,
-            "speed": SPEED,
-            "lives": 3,
-            "score": 0,
-            "timer": -1,
-            # 'display': display_surface, 'clock': FramePerSec,
-            # Initialise variables for the second window
-            "window": -1,
-            "renderer": -1,
-            "toggle": False,  # window will be created later
-        }
-
-    # Initialise Map
-    grid = Grid()
-    cells = grid.init_map()
-    pellets = [(1, 3), (17, 3), (1, 16), (17, 16)]
-    if "dots" not in params.keys():
-        params["dots"] = grid.init_dots(pellets)
-        params["max_points"] = (len(params["dots"]) - 1) * 100
-
-    # Matrix
-    base_matrix = np.array(Grid().walls)
-    old_matrix = np.copy(base_matrix)
-
-    # Create a player
-    player = Player()
-
-    # Create ghost(s)
-    blinky = Enemy(9 * 20 + 10, 9 * 20 + 10, "blinky", (255, 0, 0))
-    pinky = Enemy(9 * 20 + 10, 10 * 20 + 10, "pinky", (255, 105, 180))
-    inky = Enemy(8 * 20 + 10, 10 * 20 + 10, "inky", (0, 255, 255))
-    clyde = Enemy(10 * 20 + 10, 10 * 20 + 10, "clyde", (250, 185, 85))
-    enemies = {"blinky": blinky, "pinky": pinky, "inky": inky, "clyde": clyde}
-
-    # Create a sprite group
-    cell_sprites = pygame.sprite.Group()  # type: pygame.sprite.Group
-    for row in cells:
-        cell_sprites.add(row)
-
-    character_sprites = pygame.sprite.Group()  # type: pygame.sprite.Group
-    character_sprites.add([player, blinky, pinky, inky, clyde])
-
-    # Ghost house door
-    door = {}  # type: dict
-    door_surface = pygame.Surface((20, 3))
-    door_surface.fill((255, 165, 0))
-    door["surface"] = door_surface
-    door["rectangle"] = door_surface.get_rect(center=(9 * 20 + 11, 9 * 20 + 2))
-
-    # Initialise variables
-    previous_cell = (16, 9, (0, 0, 0))
-    next_move = False
-    direction = -1
-    old_field = Field(-1, -1, (0, 0, 255))
-    matrix = np.empty(0)
-    fear_duration = 5  # sec
-    fear_timer = timer.Timer()
-    release_times = dict(zip(["blinky", "pinky", "inky", "clyde"], sorted(random.sample(range(0, 10), 4))))
-    release_timer = timer.Timer()
-    release_timer.start()
-    if params["timer"] == -1:
-        params["timer"] = timer.Timer()
-        params["timer"].start()
-    checkboxes = {"path_highlights": False}
-
-    # Main Game Loop
-    while True:
         # Exit upon pressing ALT + F4
         keys = pygame.key.get_pressed()
         if keys[pygame.K_LALT] and keys[pygame.K_F4]:
@@ -153,94 +180,262 @@ def run(params: dict = {}) -> None:
                     params["window"].destroy()
             elif event.type == KEYDOWN:
                 if event.key == K_ESCAPE:  # pause game
-                    display_surface.blit(blur_surface(display_surface, 2), (0, 0))
-                    params["timer"].pause()
-                    release_timer.pause()
-                    if fear_timer.is_running():
-                        fear_timer.pause()
-                        checkboxes = paused(display_surface, FramePerSec, WIDTH, HEIGHT, checkboxes)
-                        fear_timer.resume()
-                    else:
-                        checkboxes = paused(display_surface, FramePerSec, WIDTH, HEIGHT, checkboxes)
-                    params["timer"].resume()
-                    release_timer.resume()
+                    return "paused"
                 # Close 2nd window if main window is currently in focus
-                elif event.key == pygame.K_t:
+                if event.key == pygame.K_t:
                     if params["toggle"]:
                         params["window"].destroy()
                     else:
-                        params["window"], params["renderer"] = create_window(matrix)  # type: ignore
+                        params["window"], params["renderer"] = create_window(self.game.matrix.data)  # type: ignore
                     params["toggle"] = not params["toggle"]
+                # Show or hide the profiler overlay
+                elif event.key == PROFILER_KEY:
+                    PROFILER.toggle()
+                    self.profiler_overlay = None
+                    self.renderer.invalidate()
             elif event.type == WINDOWCLOSE:
                 pygame.quit()
                 sys.exit(0)
-
-        # Draw surfaces
-        display_surface.fill((0, 0, 0))  # Initialise black background
-        draw_hud(display_surface, params["lives"], params["score"])
-        draw_surface(display_surface, cell_sprites)
-        draw_surface(display_surface, params["dots"].values())
-        draw_surface(display_surface, character_sprites)
-        display_surface.blit(door["surface"], door["rectangle"])
-
-        # Move player and ghosts
-        i, j, previous_cell, cells = player.highlight_player_cell(cells, previous_cell, grid)
-        next_move, direction, old_field, fear_state = player.move_player(
-            next_move, direction, grid, i, j, cells, old_field, params
-        )
-
-        # Fear timer
-        if fear_state:
-            fear_timer.start()
-
-        if fear_timer.get_elapsed_time() > fear_duration:
-            fear_timer.stop()
-        if fear_timer.is_running():
-            fear_state = True
-
-        for enemy_name, enemy in enemies.items():
-            if release_timer.get_elapsed_time() > release_times[enemy_name]:
-                position = blinky.pos if enemy_name == "inky" else None
-                enemy.move_enemy(
-                    cells,
-                    grid,
-                    player,
-                    params,
-                    get_move_pattern(enemy_name, fear_state),
-                    checkboxes["path_highlights"],
-                    cast(tuple[int, int], position),
-                )
+        return None
+
+    def _update(self) -> str | None:
+        """
+        Updates the game state in fixed ticks (catching up on slow frames)
+
+        :return: The next scene if a life has been lost or the game is over, None otherwise
+        """
+        params, game, cells = self.params, self.game, self.cells
+        grid, player, enemies = game.grid, game.player, game.enemies
+
+        self.accumulator += min(self.clock.tick(FPS), MAX_FRAME_TIME) * params.get("playback_speed", 1.0)
+        while self.accumulator >= TICK_TIME:
+            self.accumulator -= TICK_TIME
+            self.previous_positions = {
+                character: pygame.math.Vector2(character.pos) for character in self.character_sprites
+            }
+
+            # Move player and ghosts
+            i, j, self.previous_cell, cells = player.highlight_player_cell(cells, self.previous_cell, grid)
+            state = game.step(self.controller.get_direction())
+            self.old_field = player.highlight_next_cell(cells, self.old_field, grid, i, j)
+            for enemy in enemies.values():
+                enemy.highlight_path(self.renderer.path_overlay, self.checkboxes["path_highlights"])
+
+            match state:
+                case "won":
+                    self.final_score = update_score(params["score"], params["timer"])
+                    self.save_replay()
+                    return "game_over"
+                case "game_over":
+                    self.final_score = params["score"] - 420
+                    self.save_replay()
+                    return "game_over"
+                case "life_lost":
+                    return "life_lost"
 
         # Todo: Gradually increase enemy speed over time
         #       Investigate no path found bug when player is somewhere in lower half
         #       Investigate inky getting stuck in tunnel
+        return None
+
+    def _draw_profiler_overlay(self, dirty_rects: list[pygame.Rect]) -> None:
+        """
+        Draws the statistics of the profiler on top of the maze (refreshed twice per second)
+
+        :param dirty_rects: The changed rectangles of the display (the rectangle of the overlay is added)
+        :return: Nothing
+        """
+        self.profiler_frames += 1
+        if self.profiler_overlay is None or self.profiler_frames >= FPS // 2:
+            self.profiler_overlay = render_profiler_overlay(PROFILER.get_stats())
+            self.profiler_frames = 0
+        rect = display_surface.blit(self.profiler_overlay, (0, 0))
+        self.renderer.invalidate_rect(rect)  # restore the maze underneath in the next frame
+        dirty_rects.append(rect)
+
+    def play(self) -> str:
+        """
+        The main game loop (runs until the game is paused, a life is lost or the game is over)
+
+        :return: The next scene ('paused', 'life_lost' or 'game_over')
+        """
+        params, game = self.params, self.game
+        self.clock.tick()  # the game clock does not advance while the game is not played
+        PROFILER.start_frame()
+
+        # Main Game Loop
+        while True:
+            with PROFILER.scope("input"):
+                scene = self._handle_events()
+            if scene:
+                return scene
+
+            with PROFILER.scope("update"):
+                scene = self._update()
+            if scene:
+                return scene
+
+            # Draw the changed parts of the display (the characters are interpolated between the last two ticks)
+            with PROFILER.scope("render"):
+                dirty_rects = self.renderer.render(
+                    self.character_sprites,
+                    self.previous_positions,
+                    self.accumulator / TICK_TIME,
+                    params["lives"],
+                    params["score"],
+                )
 
-        # Update score
-        params["score"] = (
-            params["max_points"] - len(params["dots"]) * 100 + blinky.score + inky.score + pinky.score + clyde.score
-        )
+            # Update second window (only when the game matrix has changed)
+            with PROFILER.scope("window"):
+                if params["toggle"] and game.matrix.version != self.matrix_version:
+                    self.matrix_version = game.matrix.version
+                    params["renderer"].update(game.matrix.data)  # only redraws the changed cells
+
+            if PROFILER.enabled:
+                self._draw_profiler_overlay(dirty_rects)
+
+            # Game updates
+            with PROFILER.scope("display"):
+                pygame.display.update(dirty_rects)
+            PROFILER.end_frame()
+
+            # FPS
+            pygame.display.set_caption(f"Pacman (FPS: {self.clock.get_fps():.1f})")
+
+    def save_replay(self) -> None:
+        """
+        Saves the replay of a finished game (unless the game itself is a replay)
+
+        :return: Nothing
+        """
+        if self.is_recorded():
+            self.controller.replay.save(REPLAY_PATH)
 
-        # Update second window
-        base_matrix = np.array(Grid().walls)
-        for key in params["dots"]:
-            base_matrix[key[1]][key[0]] = 3 if key in pellets else 2
-        player_pos_x, player_pos_y = player.get_current_cell()
-        matrix = np.copy(base_matrix)
-        matrix[player_pos_y][player_pos_x] = 6
-        for enemy in enemies.values():
-            pos_x, pos_y = enemy.get_current_cell()
-            matrix[pos_y][pos_x] = 5 if fear_state and enemy.pos != enemy.home else 4
-        if params["toggle"]:
-            if not np.array_equal(old_matrix, matrix):
-                old_matrix = np.copy(matrix)
-                change_surface(params["window"].size, params["renderer"], matrix)
-
-        # Game updates
-        pygame.display.update()
-        FramePerSec.tick(FPS)
-
-        # FPS
-        pygame.display.set_caption(f"Pacman (FPS: {FramePerSec.get_fps():.1f})")
+
+def set_display_size(width: int, height: int) -> None:
+    """
+    Resizes the main display (e.g. to the size of a level) if its size differs
+
+    :param width: The width of the maze (or menu)
+    :param height: The height of the maze (or menu), below which the HUD is drawn
+    :return: Nothing
+    """
+    if display_surface.get_size() != (width, height + HUD_HEIGHT):
+        pygame.display.set_mode((width, height + HUD_HEIGHT))  # the display surface object is kept
+
+
+def get_params(replay: Replay | None = None, speed: float = 1.0, level_path: str | None = None) -> dict:
+    """
+    Creates the parameters of a new game or of a replay
+
+    :param replay: The replay to be shown (None to play a new game)
+    :param speed: The playback speed of the replay (relative to real time)
+    :param level_path: The path of the level file (None to play the default level)
+    :return: A dictionary of game parameters
+    """
+    params = new_params(load_level(level_path) if level_path else None)
+    # Initialise variables for the second window
+    params["window"] = -1
+    params["renderer"] = -1
+    params["toggle"] = False  # window will be created later
+
+    if replay is None:
+        # Record the game (its seed and the input of the player), so that it can be replayed
+        params["seed"] = random.randrange(2**32)
+        params["controller"] = ReplayRecorder(KeyboardController(), params["seed"], level=params["level"])
+    else:
+        replay.check_level(params["level"])
+        params["seed"] = replay.seed
+        params["patterns"] = replay.patterns
+        params["controller"] = ScriptedController(replay.get_directions(), repeat=False)
+        params["playback_speed"] = speed
+    return params
+
+
+def main(
+    replay_path: str | None = None, speed: float = 1.0, trace_path: str | None = None, level_path: str | None = None
+) -> None:
+    """
+    The top-level loop, which switches between the scenes of the application
+    (menu, credits, scores, playing, paused, life lost and game over)
+
+    :param replay_path: The path of a replay to be shown instead of the main menu
+    :param speed: The playback speed of the replay (relative to real time)
+    :param trace_path: The path of a trace file of the played frames (None to disable tracing)
+    :param level_path: The path of the level file of the games and replays (None to play the default level)
+    :return: Nothing
+    """
+    if trace_path:
+        PROFILER.start_trace(trace_path)
+    try:
+        run_scenes("replay" if replay_path else "menu", replay_path, speed, level_path)
+    finally:
+        PROFILER.stop_trace()  # also completes the trace file if the window is closed during the game
+
+    pygame.quit()
+
+
+def run_scenes(scene: str, replay_path: str | None, speed: float, level_path: str | None = None) -> None:
+    """
+    Switches between the scenes until the application is quit
+
+    :param scene: The first scene
+    :param replay_path: The path of the replay shown by the 'replay' scene
+    :param speed: The playback speed of the replay (relative to real time)
+    :param level_path: The path of the level file (None to play the default level)
+    :return: Nothing
+    """
+    session = None  # type: Session | None
+    while scene != "quit":
+        match scene:
+            case "menu":
+                if session is not None:
+                    session.close()
+                    session = None
+                scene = main_menu()
+            case "credits":
+                scene = credits_menu()
+            case "scores":
+                scene = score_menu()
+            case "new_game":
+                session = Session(get_params(level_path=level_path))
+                scene = "playing"
+            case "replay":
+                session = Session(get_params(Replay.load(cast(str, replay_path)), speed, level_path))
+                scene = "playing"
+            case "playing":
+                scene = cast(Session, session).play()
+            case "paused":
+                scene = cast(Session, session).pause()
+            case "life_lost":
+                cast(Session, session).next_life()
+                scene = "playing"
+            case "game_over":
+                if cast(Session, session).is_recorded():
+                    game_over(cast(Session, session).final_score)
+                scene = "menu"
+            case _:
+                sys.exit("Scene not found.")
+
+
+def show_menu(menu: pygame_menu.Menu, buttons: list[tuple[str, str]]) -> str:
+    """
+    Adds buttons to a menu and shows the menu until one of the buttons is pressed
+
+    :param menu: The menu
+    :param buttons: The title and the next scene of every button
+    :return: The next scene
+    """
+    selected = ["quit"]
+
+    def select(scene: str) -> None:
+        selected[0] = scene
+        menu.disable()
+
+    for title, scene in buttons:
+        menu.add.button(title, select, scene)
+    menu.mainloop(display_surface)
+    return selected[0]
 
 
 def get_theme() -> pygame_menu.themes.Theme:
@@ -256,23 +451,23 @@ def get_theme() -> pygame_menu.themes.Theme:
     return my_theme
 
 
-def main_menu() -> None:
+def main_menu() -> str:
     """
     Main menu
+
+    :return: The next scene
     """
 
     my_menu = pygame_menu.Menu("", WIDTH, HEIGHT, theme=get_theme())
     my_menu.add.label("Pacman", font_size=32, font_color=(130, 130, 130), font_shadow=True, margin=(0, 100))
-    my_menu.add.button("Play", run)
-    my_menu.add.button("Credits", credits_menu)
-    my_menu.add.button("Scores", score_menu)
-    my_menu.add.button("Quit", pygame_menu.events.EXIT)
-    my_menu.mainloop(display_surface)
+    return show_menu(my_menu, [("Play", "new_game"), ("Credits", "credits"), ("Scores", "scores"), ("Quit", "quit")])
 
 
-def credits_menu() -> None:
+def credits_menu() -> str:
     """
     Credits menu
+
+    :return: The next scene
     """
 
     my_credits = pygame_menu.Menu("", WIDTH, HEIGHT, theme=get_theme())
@@ -287,13 +482,14 @@ def credits_menu() -> None:
     my_credits.add.label("Playtester\t Dizzy", font_size=12, font_color=(200, 200, 200), margin=(-20, 0))
     my_credits.add.label("Producer\t Dizzy", font_size=12, font_color=(200, 200, 200), margin=(-8, 0))
     my_credits.add.label("Special Thanks\t Dizzy", font_size=12, font_color=(200, 200, 200), margin=(-38, 30))
-    my_credits.add.button("Back", main_menu)
-    my_credits.mainloop(display_surface)
+    return show_menu(my_credits, [("Back", "menu")])
 
 
-def score_menu() -> None:
+def score_menu() -> str:
     """
     High score menu
+
+    :return: The next scene
     """
 
     my_scores = pygame_menu.Menu("", WIDTH, HEIGHT, theme=get_theme())
@@ -362,12 +558,20 @@ def score_menu() -> None:
             )
 
     my_scores.add.label("", font_size=12, font_color=(200, 200, 200), margin=(0, 20))
-    my_scores.add.button("Back", main_menu)
-    my_scores.mainloop(display_surface)
+    return show_menu(my_scores, [("Back", "menu")])
 
 
 if __name__ == "__main__":
-    main_menu()
+    parser = argparse.ArgumentParser(description="Pacman")
+    parser.add_argument(
+        "--replay", nargs="?", const=REPLAY_PATH, help="play a recorded game (by default, the last one)"
+    )
+    parser.add_argument("--speed", type=float, default=1.0, help="the playback speed of a replay")
+    parser.add_argument("--trace", help="write a trace file of the played frames (Chrome Trace Event format)")
+    parser.add_argument("--level", help="the path of a level file (see level/level_file.py)")
+    args = parser.parse_args()
+
+    main(args.replay, args.speed, args.trace, args.level)
 
     # Press key (for AI):
     # https://stackoverflow.com/questions/55728777/how-to-simulate-key-press-event-in-python-on-another-program-running-in-python